@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Problem, Submission
+from .models import JudgeJob, PointsLedgerEntry, Problem, Submission, UserProblemProgress, UserScore
+from .search import search_ids
+
 
 @admin.register(Problem)
 class ProblemAdmin(admin.ModelAdmin):
@@ -8,8 +10,40 @@ class ProblemAdmin(admin.ModelAdmin):
     list_filter = ('difficulty',)
     search_fields = ('title', 'description')
 
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of LIKE '%...%' scans
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(id__in=search_ids(search_term, limit=None)), False
+
+
 @admin.register(Submission)
 class SubmissionAdmin(admin.ModelAdmin):
     # Changed 'submitted_at' to 'created_at' to match your model
     list_display = ('user', 'problem', 'status', 'language', 'created_at')
-    list_filter = ('status', 'language', 'created_at')
\ No newline at end of file
+    list_filter = ('status', 'language', 'created_at')
+    exclude = ('code_blob',)
+    readonly_fields = ('code',)
+
+
+@admin.register(UserProblemProgress)
+class UserProblemProgressAdmin(admin.ModelAdmin):
+    list_display = ('user', 'problem', 'first_solved_at', 'best_language', 'attempts')
+    list_filter = ('best_language',)
+
+
+@admin.register(PointsLedgerEntry)
+class PointsLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'problem', 'points', 'awarded_at')
+
+
+@admin.register(UserScore)
+class UserScoreAdmin(admin.ModelAdmin):
+    list_display = ('user', 'score', 'solved', 'updated_at')
+    ordering = ('-score', 'updated_at')
+
+
+@admin.register(JudgeJob)
+class JudgeJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'owner', 'problem', 'language', 'status', 'verdict', 'created_at')
+    list_filter = ('status', 'language')
@@ -0,0 +1,155 @@
+"""
+Native async versions of the challenge APIs, for ASGI deployments.
+
+They return the same JSON as their DRF counterparts in ``views.py`` but
+never block a thread while waiting on the compiler service or the
+database, so one uvicorn process can keep hundreds of judge requests in
+flight. Enabled with ``ASYNC_API = True`` (see ``dev_backend/urls.py``).
+"""
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+
+from .catalogue import (
+    FULL, SHAPES, accepts_gzip, current_state, get_snapshot, parse_difficulty,
+    snapshot_content, snapshot_etag,
+)
+from .conditional import not_modified, set_validators
+from .execution import ExecutionError
+from .models import Problem
+from .progress import ENCODINGS, IDS, compact_progress
+from .submissions import PROGRESS_VERSION, arecord_pass, progress_etag, solved_problems
+from .throttles import RUN, ExecuteModeThrottle, execution_mode
+from .verdicts import acached_judge
+
+
+def request_data(request):
+    """JSON body (what the frontend sends) or form data."""
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+    return request.POST
+
+
+class AsyncUserProgressAPI(View):
+    """
+    API to fetch user's completed problem IDs.
+    """
+    async def get(self, request):
+        clerk_id = request.GET.get('clerk_id')
+        encoding = request.GET.get('encoding', IDS)
+        if encoding not in ENCODINGS:
+            return JsonResponse({"error": "encoding must be 'ids', 'bitset' or 'ranges'"}, status=400)
+
+        if encoding != IDS:
+            payload, etag, last_modified = await sync_to_async(compact_progress)(clerk_id, encoding)
+            response = not_modified(request, etag, last_modified, private=True)
+            if response is None:
+                response = set_validators(JsonResponse(payload), etag, last_modified, private=True)
+            return response
+
+        if not clerk_id:
+            return JsonResponse({"completed": []})
+
+        version = await solved_problems(clerk_id).aaggregate(**PROGRESS_VERSION)
+        etag = progress_etag(version)
+        response = not_modified(request, etag, version['last_modified'], private=True)
+        if response is not None:
+            return response
+
+        completed_ids = [
+            problem_id async for problem_id in
+            solved_problems(clerk_id)
+            .values_list('problem_id', flat=True)
+        ]
+        response = JsonResponse({"completed": completed_ids})
+        return set_validators(response, etag, version['last_modified'], private=True)
+
+
+class AsyncProblemListAPI(View):
+    """
+    API to fetch the list of all problems for the frontend.
+    """
+    async def get(self, request):
+        difficulty = request.GET.get('difficulty')
+        if difficulty and parse_difficulty(difficulty) is None:
+            return JsonResponse({"error": "Unknown difficulty"}, status=400)
+        shape = request.GET.get('view', FULL)
+        if shape not in SHAPES:
+            return JsonResponse({"error": "view must be 'full' or 'summary'"}, status=400)
+
+        state = await sync_to_async(current_state)()
+        etag = snapshot_etag(state[0], parse_difficulty(difficulty), shape, accepts_gzip(request))
+        response = not_modified(request, etag, state[1])
+        if response is not None:
+            return response
+
+        snapshot = await sync_to_async(get_snapshot)(parse_difficulty(difficulty), shape, state)
+        body, headers = snapshot_content(request, snapshot)
+        response = HttpResponse(body, content_type='application/json', headers=headers)
+        etag = snapshot_etag(snapshot.version, parse_difficulty(difficulty), shape, accepts_gzip(request))
+        return set_validators(response, etag, snapshot.updated_at)
+
+
+class AsyncExecuteCodeAPI(View):
+    """
+    API to execute user code, provide smart hints, and SAVE progress.
+    """
+    async def post(self, request):
+        data = request_data(request)
+        if data is None:
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+        code = data.get('code')
+        language = data.get('language', 'python')
+        problem_id = data.get('problem_id')
+        mode = execution_mode(data)
+
+        # Same per-mode rate limits as the DRF view
+        throttle = ExecuteModeThrottle()
+        if not await sync_to_async(throttle.allow)(request, mode):
+            wait = throttle.wait()
+            headers = {'Retry-After': str(math.ceil(wait))} if wait is not None else {}
+            return JsonResponse({"detail": throttle.detail()}, status=429, headers=headers)
+
+        if mode is None:
+            return JsonResponse({"error": "mode must be 'run' or 'submit'"}, status=400)
+
+        try:
+            problem = await Problem.objects.aget(id=problem_id)
+        except (Problem.DoesNotExist, ValueError, TypeError):
+            return JsonResponse({"error": "Problem not found"}, status=404)
+
+        test_cases = problem.sample_cases if mode == RUN else problem.test_cases
+        try:
+            results, all_passed, _cached = await acached_judge(problem.id, test_cases, code, language)
+        except ExecutionError:
+            return JsonResponse({"status": "Error", "message": "Compiler Service Unavailable"}, status=503)
+
+        if mode == RUN:
+            return JsonResponse({
+                "status": "Success" if all_passed else "Failed",
+                "mode": RUN,
+                "results": results
+            })
+
+        if all_passed:
+            earned_points = await arecord_pass(
+                problem, code, language,
+                clerk_id=data.get('clerk_id'),
+                email=data.get('email'),
+            )
+            return JsonResponse({
+                "status": "Success",
+                "results": results,
+                "points": earned_points
+            })
+        return JsonResponse({
+            "status": "Failed",
+            "results": results
+        })
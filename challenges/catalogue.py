@@ -0,0 +1,145 @@
+"""
+Pre-serialized problem catalogue snapshots.
+
+The catalogue only changes when problems are imported, generated or edited,
+so ``ProblemListAPI`` serves gzip-compressed JSON built once per catalogue
+version instead of querying and serializing every problem per request.
+
+The version lives in the single CatalogueState row and is bumped by the
+``Problem`` save/delete signals (bulk writes that skip signals must call
+``bump_version()`` themselves). Every worker process checks the version
+with one primary-key lookup and rebuilds its snapshot lazily when another
+worker has changed the catalogue.
+"""
+import gzip
+import threading
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.functions import Substr
+from django.utils import timezone
+from rest_framework.settings import api_settings
+
+from .conditional import make_etag
+from .middleware import choose_encoding
+from .models import CatalogueState, Problem
+from .serializers import ProblemSerializer, ProblemSummarySerializer
+
+# Accepted values for the ?difficulty= filter
+DIFFICULTY_ALIASES = {
+    'beginner': 'BEG',
+    'intermediate': 'INT',
+    'advanced': 'ADV',
+    'pro': 'PRO',
+}
+
+# Length of the description excerpt in catalogue entries
+EXCERPT_LENGTH = 160
+
+FULL = 'full'
+SUMMARY = 'summary'
+SHAPES = (FULL, SUMMARY)
+
+STATE_ID = 1
+
+# Old versions are never read again; let the shared cache expire them
+SNAPSHOT_TIMEOUT = 24 * 60 * 60
+
+Snapshot = namedtuple('Snapshot', ['version', 'updated_at', 'body'])
+
+
+def parse_difficulty(value):
+    """Map 'BEG' / 'beginner' etc. to a difficulty code; None if unknown."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.upper() in dict(Problem.DIFFICULTY_CHOICES):
+        return value.upper()
+    return DIFFICULTY_ALIASES.get(value.lower())
+
+
+def summary_queryset():
+    """Problems with only the catalogue columns and a description excerpt."""
+    return (
+        Problem.objects.only('id', 'title', 'difficulty')
+        .annotate(excerpt=Substr('description', 1, EXCERPT_LENGTH))
+    )
+
+
+def current_state():
+    """(version, updated_at) of the catalogue as seen by every worker."""
+    state = CatalogueState.objects.filter(pk=STATE_ID).values_list('version', 'updated_at').first()
+    return state or (0, None)
+
+
+def bump_version():
+    """Mark every cached snapshot, in every process, as stale."""
+    updated = CatalogueState.objects.filter(pk=STATE_ID).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+    if not updated:
+        CatalogueState.objects.get_or_create(pk=STATE_ID)
+
+
+def render(difficulty=None, shape=FULL):
+    """Serialize the (filtered) catalogue to JSON bytes."""
+    if shape == SUMMARY:
+        problems, serializer_class = summary_queryset(), ProblemSummarySerializer
+    else:
+        problems, serializer_class = Problem.objects.all(), ProblemSerializer
+    if difficulty:
+        problems = problems.filter(difficulty=difficulty)
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return renderer.render(serializer_class(problems.order_by('id'), many=True).data)
+
+
+_snapshots = {}
+_build_lock = threading.Lock()
+
+
+def get_snapshot(difficulty=None, shape=FULL, state=None):
+    """
+    Return the current Snapshot for this difficulty and view shape.
+
+    Snapshots are kept in this process and in the default Django cache,
+    so with a shared cache only one worker pays for each rebuild. Pass
+    ``state`` when the caller already fetched ``current_state()``.
+    """
+    version, updated_at = state or current_state()
+    key = (difficulty or 'all', shape)
+    snapshot = _snapshots.get(key)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _build_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        cache_key = f'catalogue:{version}:{key[0]}:{shape}'
+        body = cache.get(cache_key)
+        if body is None:
+            # mtime=0 keeps the bytes identical for identical content
+            body = gzip.compress(render(difficulty, shape), mtime=0)
+            cache.set(cache_key, body, SNAPSHOT_TIMEOUT)
+        snapshot = Snapshot(version, updated_at, body)
+        _snapshots[key] = snapshot
+        return snapshot
+
+
+def snapshot_etag(version, difficulty, shape, gzipped):
+    """Strong ETag; the gzip and identity bodies are different bytes."""
+    return make_etag('catalogue', version, difficulty or 'all', shape, 'gz' if gzipped else 'id')
+
+
+def accepts_gzip(request):
+    """Whether the client accepts gzip, honouring q-values (``gzip;q=0`` refuses it)."""
+    return choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), ['gzip']) == 'gzip'
+
+
+def snapshot_content(request, snapshot):
+    """Response body and extra headers for serving ``snapshot``."""
+    if accepts_gzip(request):
+        return snapshot.body, {'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'}
+    return gzip.decompress(snapshot.body), {'Vary': 'Accept-Encoding'}
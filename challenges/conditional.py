@@ -0,0 +1,38 @@
+"""
+Conditional GET support (ETag / Last-Modified).
+
+Views compute a cheap version for their payload first and return 304 Not
+Modified when the client's copy is current, before running the main query
+or touching a serializer.
+"""
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """Strong ETag from version parts, e.g. ``"catalogue-12-BEG-full"``."""
+    return quote_etag('-'.join(str(part) for part in parts))
+
+
+def set_validators(response, etag, last_modified=None, private=False):
+    """Add ETag/Last-Modified and make clients revalidate before reuse."""
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    if private:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def not_modified(request, etag, last_modified=None, private=False):
+    """The 304 (or 412) response for a conditional request, or None."""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified, private)
+    return response
@@ -0,0 +1,57 @@
+"""
+Code execution layer used by the judge and the problem generators.
+
+The backend is chosen with ``settings.EXECUTION_BACKEND``: ``'piston'``
+(the public Piston API), ``'local'`` (rlimit-sandboxed subprocesses on
+this machine), ``'prefork'`` (``'local'`` plus warm pre-forked Python
+workers) or a dotted path to a ``BaseExecutor`` subclass.
+
+Results use the Piston response shape: ``{"run": {"stdout", "stderr",
+"code", "signal", "output"}}`` plus a ``"compile"`` stage for compiled
+languages.
+"""
+import os
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .base import BaseExecutor, ExecutionError
+from .piston import get_client
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _build_executor(backend):
+    if backend == 'piston':
+        return get_client()
+    if backend == 'local':
+        from .local import LocalExecutor
+        return LocalExecutor.from_settings()
+    if backend == 'prefork':
+        from .prefork import PreforkExecutor
+        return PreforkExecutor.from_settings()
+    executor_class = import_string(backend)
+    if hasattr(executor_class, 'from_settings'):
+        return executor_class.from_settings()
+    return executor_class()
+
+
+def get_executor():
+    """Return this process's configured executor."""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = _build_executor(settings.EXECUTION_BACKEND)
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def execute(language, code, stdin='', version='*'):
+    """Run ``code`` once with ``stdin`` and return the result dict."""
+    return get_executor().execute(language, code, stdin, version)
+
+
+__all__ = ['BaseExecutor', 'ExecutionError', 'execute', 'get_client', 'get_executor']
@@ -0,0 +1,141 @@
+"""
+Size-bounded, on-disk LRU cache of compiled submissions.
+
+An entry is a directory named after the artifact key (a SHA-256 of the
+language, toolchain version, build command and source). It holds the
+build output plus ``compile.json`` with the compile stage result, so
+compile errors are cached too; compiles killed by a timeout or a signal
+are not, as they may succeed on a retry. Entries are built in a temporary
+directory and renamed into place, which keeps concurrent builds from
+several judge threads or gunicorn workers safe. Recency is tracked through the mtime of
+``compile.json``.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from functools import lru_cache
+
+RESULT_FILE = 'compile.json'
+
+
+@lru_cache(maxsize=None)
+def toolchain_version(command):
+    """First line of ``<command> --version`` (cached per process)."""
+    flag = '-version' if command in ('javac', 'java') else '--version'
+    try:
+        proc = subprocess.run([command, flag], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+    output = (proc.stdout or proc.stderr).strip()
+    return output.splitlines()[0] if output else 'unknown'
+
+
+def artifact_key(language, toolchain, build_cmd, code):
+    digest = hashlib.sha256()
+    for part in (language, toolchain, ' '.join(build_cmd or []), code):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def is_deterministic(compiled):
+    """
+    Whether a compile result will repeat for the same source: no compile
+    step, or the compiler ran to completion and chose its exit code. A
+    wall-clock kill or a signal under load is not, and must not be cached.
+    """
+    return compiled is None or (compiled['signal'] is None and compiled['code'] is not None)
+
+
+def _dir_size(path):
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ArtifactCache:
+    """Directory-per-key build cache with LRU eviction by total size."""
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """Return (path, compile_result) for a cached entry, or None."""
+        path = self.path(key)
+        result_path = os.path.join(path, RESULT_FILE)
+        try:
+            with open(result_path, encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(result_path)  # mark as recently used
+        except (OSError, ValueError):
+            return None
+        return path, result
+
+    def get_or_build(self, key, build):
+        """
+        Return (path, compile_result, cached).
+
+        ``build(workdir)`` fills ``workdir`` and returns the compile stage
+        result; it is only called on a cache miss. A result that is not
+        deterministic (see ``is_deterministic``) is returned but not kept:
+        its path no longer exists and the next request rebuilds.
+        """
+        entry = self.get(key)
+        if entry:
+            return entry + (True,)
+
+        workdir = tempfile.mkdtemp(prefix='.build-', dir=self.root)
+        try:
+            result = build(workdir)
+            if not is_deterministic(result):
+                shutil.rmtree(workdir, ignore_errors=True)
+                return workdir, result, False
+            with open(os.path.join(workdir, RESULT_FILE), 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            try:
+                os.rename(workdir, self.path(key))
+            except OSError:
+                # Someone else built the same key first; theirs wins
+                shutil.rmtree(workdir, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(workdir, ignore_errors=True)
+            raise
+
+        self.evict()
+        return self.path(key), result, False
+
+    def evict(self):
+        """Drop least recently used entries until under ``max_bytes``."""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.root):
+                if name.startswith('.'):
+                    continue
+                path = self.path(name)
+                try:
+                    used = os.path.getmtime(os.path.join(path, RESULT_FILE))
+                except OSError:
+                    continue
+                entries.append((used, _dir_size(path), path))
+
+            total = sum(size for _used, size, _path in entries)
+            for _used, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
@@ -0,0 +1,69 @@
+"""
+Shared pieces of the code-execution layer.
+"""
+from asgiref.sync import sync_to_async
+
+
+class ExecutionError(Exception):
+    """The code-execution backend could not run the submission."""
+
+
+class BaseExecutor:
+    """
+    Interface every execution backend implements.
+
+    ``execute`` must return a Piston-shaped dict, so callers can keep
+    reading ``result['run']['stdout']`` whatever backend is configured.
+    """
+
+    def execute(self, language, code, stdin='', version='*'):
+        raise NotImplementedError
+
+    def prepare(self, language, code, version='*'):
+        """Return a ``Program`` whose ``run(stdin)`` executes ``code``."""
+        return Program(self, language, code, version)
+
+    async def aexecute(self, language, code, stdin='', version='*'):
+        """Async ``execute``; by default the sync one runs in a worker thread."""
+        return await sync_to_async(self.execute, thread_sensitive=False)(language, code, stdin, version)
+
+    async def aprepare(self, language, code, version='*'):
+        return await sync_to_async(self.prepare, thread_sensitive=False)(language, code, version)
+
+    def close(self):
+        pass
+
+
+def stage_result(stdout='', stderr='', code=None, signal=None):
+    """Build one Piston-style stage (``run`` or ``compile``) dict."""
+    return {
+        "stdout": stdout,
+        "stderr": stderr,
+        "output": stdout + stderr,
+        "code": code,
+        "signal": signal,
+    }
+
+
+class Program:
+    """
+    A submission prepared for running against many inputs.
+
+    The default implementation just calls ``execute`` for every input;
+    backends that can compile once override ``BaseExecutor.prepare``.
+    """
+
+    def __init__(self, executor, language, code, version='*'):
+        self.executor = executor
+        self.language = language
+        self.code = code
+        self.version = version
+
+    def run(self, stdin=''):
+        return self.executor.execute(self.language, self.code, stdin, self.version)
+
+    async def arun(self, stdin=''):
+        return await self.executor.aexecute(self.language, self.code, stdin, self.version)
+
+    def close(self):
+        pass
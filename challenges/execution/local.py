@@ -0,0 +1,340 @@
+"""
+Local executor: judge submissions in subprocesses on this machine.
+
+Every run gets its own scratch directory and is started with rlimits for
+CPU time, address space, output file size, process count and open files,
+plus a wall-clock timeout that kills the whole process group. stdout and
+stderr are written to files inside the scratch directory so the output
+limit is enforced by the kernel (RLIMIT_FSIZE).
+
+The limits are applied by an exec wrapper (``prlimit``, or a tiny Python
+shim) rather than ``preexec_fn``, which is unsafe from the judge's threads.
+
+rlimits bound resource usage only. They do not hide the filesystem or the
+network, so production deployments should run the server as a dedicated,
+unprivileged user (or inside a container). The process limit
+(``PROCESS_LIMIT``, RLIMIT_NPROC) counts every process of the uid, so it
+is only meaningful with such a dedicated sandbox uid: under the server's
+own uid busy workers make forks fail spuriously, and root ignores it. It
+is off (0) by default.
+"""
+import os
+import re
+import resource
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .artifacts import ArtifactCache, artifact_key, toolchain_version
+from .base import BaseExecutor, ExecutionError, Program, stage_result
+
+MB = 1024 * 1024
+
+# Source file, build command and run command for every language. Builds
+# run inside the artifact directory; runs get their own scratch directory
+# and reach the build output through ``{artifact}``. ``{class}`` is the
+# Java public class name.
+LANGUAGES = {
+    'python': {
+        'source': 'main.py',
+        'toolchain': 'python3',
+        'compile': None,
+        'run': ['python3', '-I', '{artifact}/main.py'],
+    },
+    'c': {
+        'source': 'main.c',
+        'toolchain': 'gcc',
+        'compile': ['gcc', '-O2', '-std=c11', '-pipe', '-o', 'main', 'main.c', '-lm'],
+        'run': ['{artifact}/main'],
+    },
+    'cpp': {
+        'source': 'main.cpp',
+        'toolchain': 'g++',
+        'compile': ['g++', '-O2', '-std=c++17', '-pipe', '-o', 'main', 'main.cpp'],
+        'run': ['{artifact}/main'],
+    },
+    'java': {
+        'source': '{class}.java',
+        'toolchain': 'javac',
+        'compile': ['javac', '-J-Xmx{compile_memory}m', '{class}.java'],
+        'run': ['java', '-Xss64m', '-XX:+UseSerialGC', '-Xmx{memory}m', '-cp', '{artifact}', '{class}'],
+    },
+}
+
+# Piston-style aliases accepted from the frontend
+ALIASES = {
+    'python3': 'python',
+    'py': 'python',
+    'c++': 'cpp',
+    'gcc': 'c',
+    'g++': 'cpp',
+}
+
+# util-linux prlimit applies rlimits and execs the command; without it, a
+# minimal Python shim does the same
+PRLIMIT = shutil.which('prlimit')
+PRLIMIT_OPTIONS = {
+    resource.RLIMIT_CPU: 'cpu',
+    resource.RLIMIT_FSIZE: 'fsize',
+    resource.RLIMIT_NPROC: 'nproc',
+    resource.RLIMIT_CORE: 'core',
+    resource.RLIMIT_NOFILE: 'nofile',
+    resource.RLIMIT_AS: 'as',
+}
+LIMIT_SHIM = (
+    'import os, resource, sys\n'
+    'args = sys.argv[1:]\n'
+    'while args[0] != "--":\n'
+    '    which, soft, hard = map(int, args[:3])\n'
+    '    resource.setrlimit(which, (soft, hard))\n'
+    '    args = args[3:]\n'
+    'os.execvp(args[1], args[1:])\n'
+)
+
+JAVA_CLASS_RE = re.compile(r'public\s+(?:final\s+)?class\s+([A-Za-z_]\w*)')
+
+
+def normalize_language(language):
+    """Map a frontend/Piston language name onto a LANGUAGES key."""
+    language = (language or '').lower()
+    return ALIASES.get(language, language)
+
+
+def java_class_name(code):
+    match = JAVA_CLASS_RE.search(code)
+    return match.group(1) if match else 'Main'
+
+
+def _format(args, **values):
+    return [arg.format(**values) for arg in args]
+
+
+class UnsupportedProgram(Program):
+    """Same behaviour as Piston: an unknown language produces no output."""
+
+    def __init__(self, language):
+        self.language = language
+
+    def run(self, stdin=''):
+        return {"message": f"{self.language} is not supported", "run": stage_result(code=1)}
+
+    async def arun(self, stdin=''):
+        return self.run(stdin)
+
+
+def limited_command(cmd, limits):
+    """
+    ``cmd`` behind an exec wrapper that sets ``limits`` first. This replaces
+    ``preexec_fn``, which Python documents as unsafe in threaded programs
+    (the judge starts cases from a thread pool): the child may deadlock.
+    """
+    if PRLIMIT:
+        options = [f'--{PRLIMIT_OPTIONS[which]}={soft}:{hard}' for which, (soft, hard) in limits]
+        return [PRLIMIT, *options, '--', *cmd]
+    numbers = [str(n) for which, (soft, hard) in limits for n in (which, soft, hard)]
+    return [sys.executable, '-I', '-S', '-c', LIMIT_SHIM, *numbers, '--', *cmd]
+
+
+def _read_limited(path, limit):
+    """Read at most ``limit`` bytes of a captured output file."""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(limit).decode('utf-8', errors='replace')
+    except FileNotFoundError:
+        return ''
+
+
+class LocalProgram(Program):
+    """A built artifact that every test case runs against."""
+
+    def __init__(self, executor, language, artifact, compiled, values, version):
+        self.executor = executor
+        self.language = language
+        self.artifact = artifact
+        self.compiled = compiled
+        self.values = dict(values, artifact=artifact)
+        self.version = version
+
+    def run(self, stdin=''):
+        result = {"language": self.language, "version": self.version}
+        if self.compiled is not None:
+            result['compile'] = self.compiled
+            if self.compiled['code'] != 0:
+                return result
+
+        spec = LANGUAGES[self.language]
+        cmd = _format(spec['run'], **self.values)
+        with tempfile.TemporaryDirectory(prefix='judge-', dir=self.executor.scratch_dir) as workdir:
+            result['run'] = self.executor.run(cmd, workdir, stdin, self.language)
+        return result
+
+    async def arun(self, stdin=''):
+        return await sync_to_async(self.run, thread_sensitive=False)(stdin)
+
+
+class LocalExecutor(BaseExecutor):
+    """Run python/c/cpp/java submissions as limited local subprocesses."""
+
+    def __init__(self, cpu_time=2, wall_time=5, memory=256, output=1 * MB,
+                 processes=0, compile_time=10, compile_memory=1024,
+                 scratch_dir=None, artifact_dir=None, artifact_cache_bytes=256 * MB):
+        self.cpu_time = cpu_time
+        self.wall_time = wall_time
+        self.memory = memory
+        self.output = output
+        self.processes = processes
+        self.compile_time = compile_time
+        self.compile_memory = compile_memory
+        self.scratch_dir = scratch_dir
+        self.artifacts = ArtifactCache(
+            artifact_dir or os.path.join(tempfile.gettempdir(), 'devsutra-artifacts'),
+            artifact_cache_bytes,
+        )
+
+    @classmethod
+    def from_settings(cls):
+        return cls(**cls.settings_options())
+
+    @staticmethod
+    def settings_options():
+        """Constructor keyword arguments taken from ``LOCAL_EXECUTOR``."""
+        options = settings.LOCAL_EXECUTOR
+        return dict(
+            cpu_time=options['CPU_TIME_LIMIT'],
+            wall_time=options['WALL_TIME_LIMIT'],
+            memory=options['MEMORY_LIMIT_MB'],
+            output=options['OUTPUT_LIMIT_BYTES'],
+            processes=options['PROCESS_LIMIT'],
+            compile_time=options['COMPILE_TIME_LIMIT'],
+            compile_memory=options['COMPILE_MEMORY_LIMIT_MB'],
+            scratch_dir=options['SCRATCH_DIR'],
+            artifact_dir=options['ARTIFACT_DIR'],
+            artifact_cache_bytes=options['ARTIFACT_CACHE_MB'] * MB,
+        )
+
+    def execute(self, language, code, stdin='', version='*'):
+        return self.prepare(language, code, version).run(stdin)
+
+    def prepare(self, language, code, version='*'):
+        """
+        Build ``code`` once (or fetch the cached build) and return a program
+        that runs it. Identical resubmissions skip compilation entirely.
+        """
+        language = normalize_language(language)
+        spec = LANGUAGES.get(language)
+        if spec is None:
+            return UnsupportedProgram(language)
+
+        values = {'class': java_class_name(code), 'memory': self.memory, 'compile_memory': self.compile_memory}
+        source = spec['source'].format(**values)
+        build_cmd = _format(spec['compile'], **values) if spec['compile'] else None
+
+        def build(workdir):
+            with open(os.path.join(workdir, source), 'w', encoding='utf-8') as f:
+                f.write(code)
+            if build_cmd is None:
+                return None
+            compiled = self.compile(build_cmd, workdir, language)
+            for name in ('.stdin', '.stdout', '.stderr'):
+                os.remove(os.path.join(workdir, name))
+            return compiled
+
+        key = artifact_key(language, toolchain_version(spec['toolchain']), build_cmd, code)
+        artifact, compiled, _cached = self.artifacts.get_or_build(key, build)
+        return LocalProgram(self, language, artifact, compiled, values, version)
+
+    def compile(self, cmd, workdir, language):
+        """Compile inside ``workdir`` with the (looser) compile limits."""
+        # javac is a JVM too: no RLIMIT_AS, its heap is capped with -J-Xmx
+        is_java = language == 'java'
+        return self._spawn(
+            cmd, workdir, stdin='',
+            cpu_time=self.compile_time,
+            wall_time=self.compile_time * 2,
+            memory=None if is_java else self.compile_memory,
+            processes=self.processes * 4 if is_java else self.processes,
+        )
+
+    def run(self, cmd, workdir, stdin, language):
+        """Run a built program from ``workdir`` with the run limits."""
+        # The JVM reserves far more address space than it uses and needs
+        # extra threads; its heap is capped with -Xmx instead.
+        is_java = language == 'java'
+        return self._spawn(
+            cmd, workdir, stdin=stdin,
+            cpu_time=self.cpu_time,
+            wall_time=self.wall_time,
+            memory=None if is_java else self.memory,
+            processes=self.processes * 4 if is_java else self.processes,
+        )
+
+    def _limits(self, cpu_time, memory, processes):
+        limits = [
+            (resource.RLIMIT_CPU, (cpu_time, cpu_time + 1)),
+            (resource.RLIMIT_FSIZE, (self.output, self.output)),
+            (resource.RLIMIT_CORE, (0, 0)),
+            (resource.RLIMIT_NOFILE, (64, 64)),
+        ]
+        if processes:
+            # Counts every process of the uid, not just this run's
+            limits.append((resource.RLIMIT_NPROC, (processes, processes)))
+        if memory:
+            limits.append((resource.RLIMIT_AS, (memory * MB, memory * MB)))
+        return limits
+
+    def _spawn(self, cmd, workdir, stdin, cpu_time, wall_time, memory, processes):
+        limits = self._limits(cpu_time, memory, processes)
+
+        stdin_path = os.path.join(workdir, '.stdin')
+        stdout_path = os.path.join(workdir, '.stdout')
+        stderr_path = os.path.join(workdir, '.stderr')
+        with open(stdin_path, 'w', encoding='utf-8') as f:
+            f.write(stdin or '')
+
+        env = {
+            'PATH': os.environ.get('PATH', '/usr/bin:/bin'),
+            'HOME': workdir,
+            'LANG': 'C.UTF-8',
+            'PYTHONDONTWRITEBYTECODE': '1',
+        }
+        # The wrapper would report a missing program as a failed run
+        if shutil.which(cmd[0], path=env['PATH']) is None:
+            raise ExecutionError(f"Could not start {cmd[0]}: not found")
+        try:
+            with open(stdin_path, 'rb') as fin, \
+                    open(stdout_path, 'wb') as fout, \
+                    open(stderr_path, 'wb') as ferr:
+                proc = subprocess.Popen(
+                    limited_command(cmd, limits), cwd=workdir, env=env,
+                    stdin=fin, stdout=fout, stderr=ferr,
+                    start_new_session=True,
+                )
+        except OSError as e:
+            raise ExecutionError(f"Could not start {cmd[0]}: {e}") from e
+
+        timed_out = False
+        try:
+            proc.wait(timeout=wall_time)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+        finally:
+            # Kill the whole group so forked children cannot outlive the run
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            proc.wait()
+
+        stdout = _read_limited(stdout_path, self.output)
+        stderr = _read_limited(stderr_path, self.output)
+        if timed_out:
+            return stage_result(stdout, stderr + '\nTime Limit Exceeded', signal='SIGKILL')
+        if proc.returncode < 0:
+            return stage_result(stdout, stderr, signal=signal.Signals(-proc.returncode).name)
+        return stage_result(stdout, stderr, code=proc.returncode)
+
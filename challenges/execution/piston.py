@@ -0,0 +1,158 @@
+"""
+Pooled, keep-alive HTTP client for the Piston execution API.
+
+One client (and one connection pool) is kept per process, so test cases
+reuse TCP+TLS connections instead of handshaking on every request. The
+async path (``aexecute``) uses an ``httpx.AsyncClient`` per event loop
+when httpx is installed.
+"""
+import asyncio
+import os
+import random
+import threading
+import weakref
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .base import BaseExecutor, ExecutionError
+
+try:
+    import httpx
+except ImportError:  # async views fall back to the sync client in a thread
+    httpx = None
+
+# Statuses worth retrying: rate limiting and transient gateway errors
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class PistonClient(BaseExecutor):
+    """Thin wrapper around a ``requests.Session`` tuned for Piston."""
+
+    def __init__(self, url, connect_timeout, read_timeout, max_retries,
+                 backoff_factor, backoff_jitter, pool_size, async_max_connections=100):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_jitter = backoff_jitter
+        self.async_max_connections = async_max_connections
+        self._async_clients = weakref.WeakKeyDictionary()
+
+        # Executions have no side effects, so POST is safe to retry.
+        # Read timeouts are not retried: a hung run would only hang again.
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            allowed_methods=frozenset({'POST'}),
+            status_forcelist=RETRY_STATUSES,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @staticmethod
+    def payload(language, code, stdin, version):
+        return {
+            "language": language,
+            "version": version,
+            "files": [{"content": code}],
+            "stdin": stdin
+        }
+
+    @staticmethod
+    def decode(response):
+        """Return the JSON body of a requests/httpx response or raise."""
+        if response.status_code in RETRY_STATUSES or response.status_code >= 500:
+            raise ExecutionError(f"Piston returned HTTP {response.status_code}")
+
+        # 4xx bodies (e.g. unknown language) are still returned to the caller
+        try:
+            return response.json()
+        except ValueError as e:
+            raise ExecutionError("Piston returned invalid JSON") from e
+
+    def execute(self, language, code, stdin='', version='*'):
+        """POST one execution request and return the decoded JSON."""
+        payload = self.payload(language, code, stdin, version)
+        try:
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise ExecutionError(f"Piston request failed: {e}") from e
+        return self.decode(response)
+
+    def _async_client(self):
+        """The httpx client for the running event loop (one pool per loop)."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            connect_timeout, read_timeout = self.timeout
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.async_max_connections,
+                    max_keepalive_connections=self.async_max_connections,
+                ),
+                # Connection failures are retried by the transport itself
+                transport=httpx.AsyncHTTPTransport(retries=self.max_retries),
+            )
+            self._async_clients[loop] = client
+        return client
+
+    async def aexecute(self, language, code, stdin='', version='*'):
+        """Non-blocking ``execute`` for async views."""
+        if httpx is None:
+            return await super().aexecute(language, code, stdin, version)
+
+        client = self._async_client()
+        payload = self.payload(language, code, stdin, version)
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.post(self.url, json=payload)
+            except httpx.HTTPError as e:
+                raise ExecutionError(f"Piston request failed: {e}") from e
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+            delay = self.backoff_factor * (2 ** attempt) + random.uniform(0, self.backoff_jitter)
+            await asyncio.sleep(delay)
+        return self.decode(response)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return this process's shared client (re-created after a fork)."""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = PistonClient(
+                url=settings.PISTON_URL,
+                connect_timeout=settings.PISTON_CONNECT_TIMEOUT,
+                read_timeout=settings.PISTON_READ_TIMEOUT,
+                max_retries=settings.PISTON_MAX_RETRIES,
+                backoff_factor=settings.PISTON_BACKOFF_FACTOR,
+                backoff_jitter=settings.PISTON_BACKOFF_JITTER,
+                pool_size=settings.PISTON_POOL_SIZE,
+                async_max_connections=settings.PISTON_ASYNC_MAX_CONNECTIONS,
+            )
+            _client_pid = os.getpid()
+        return _client
@@ -0,0 +1,126 @@
+"""
+Local executor with a pool of warm, pre-forked Python sandbox workers.
+
+Python runs go to a long-lived zygote process (see ``zygote.py``) that
+forks a fresh, rlimited child per test case, so each case skips
+interpreter start-up. C, C++ and Java run exactly as in LocalExecutor.
+"""
+import atexit
+import json
+import os
+import queue
+import subprocess
+import threading
+
+from django.conf import settings
+
+from .base import ExecutionError, stage_result
+from .local import LocalExecutor, _read_limited
+
+ZYGOTE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'zygote.py')
+
+
+class Zygote:
+    """One warm worker process speaking the JSON-lines protocol."""
+
+    def __init__(self, python='python3'):
+        self.proc = subprocess.Popen(
+            [python, '-I', ZYGOTE_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            start_new_session=True,
+            env={'PATH': os.environ.get('PATH', '/usr/bin:/bin'), 'LANG': 'C.UTF-8',
+                 'PYTHONDONTWRITEBYTECODE': '1'},
+        )
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def request(self, payload):
+        try:
+            self.proc.stdin.write(json.dumps(payload) + '\n')
+            line = self.proc.stdout.readline()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise ExecutionError(f"Python worker died: {e}") from e
+        if not line:
+            raise ExecutionError("Python worker exited unexpectedly")
+        return json.loads(line)
+
+    def close(self):
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+
+
+class PreforkExecutor(LocalExecutor):
+    """LocalExecutor that runs Python through a pool of zygote workers."""
+
+    def __init__(self, python_workers=4, python='python3', **options):
+        super().__init__(**options)
+        self.python = python
+        self.size = python_workers
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(python_workers=settings.LOCAL_EXECUTOR['PYTHON_WORKERS'], **cls.settings_options())
+
+    def _acquire(self):
+        """Take an idle zygote, starting the pool on first use."""
+        with self._lock:
+            if not self._all:
+                for _ in range(self.size):
+                    zygote = Zygote(self.python)
+                    self._all.append(zygote)
+                    self._idle.put(zygote)
+        return self._idle.get()
+
+    def _release(self, zygote):
+        if not zygote.alive():
+            with self._lock:
+                zygote.close()
+                self._all.remove(zygote)
+                zygote = Zygote(self.python)
+                self._all.append(zygote)
+        self._idle.put(zygote)
+
+    def run(self, cmd, workdir, stdin, language):
+        if language != 'python':
+            return super().run(cmd, workdir, stdin, language)
+
+        with open(os.path.join(workdir, '.stdin'), 'w', encoding='utf-8') as f:
+            f.write(stdin or '')
+        payload = {
+            "script": cmd[-1],
+            "workdir": workdir,
+            "wall_time": self.wall_time,
+            "limits": [[which, soft, hard] for which, (soft, hard) in
+                       self._limits(self.cpu_time, self.memory, self.processes)],
+        }
+
+        zygote = self._acquire()
+        try:
+            reply = zygote.request(payload)
+        finally:
+            self._release(zygote)
+
+        stdout = _read_limited(os.path.join(workdir, '.stdout'), self.output)
+        stderr = _read_limited(os.path.join(workdir, '.stderr'), self.output)
+        if reply['timed_out']:
+            return stage_result(stdout, stderr + '\nTime Limit Exceeded', signal='SIGKILL')
+        return stage_result(stdout, stderr, code=reply['code'], signal=reply['signal'])
+
+    def close(self):
+        with self._lock:
+            for zygote in self._all:
+                zygote.close()
+            self._all = []
+            self._idle = queue.LifoQueue()
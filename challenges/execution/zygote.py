@@ -0,0 +1,145 @@
+"""
+Warm Python sandbox worker ("zygote") used by the prefork executor.
+
+Run as a standalone script (``python3 -I zygote.py``); it must not import
+Django or anything from this project. The zygote never runs user code
+itself: for every request it forks a fresh child that applies the
+rlimits, wires stdin/stdout/stderr to files in the run's scratch
+directory and executes the script. Nothing leaks between submissions,
+and each run skips interpreter start-up and the imports preloaded here.
+
+Protocol: one JSON request per line on stdin, one JSON reply per line on
+stdout::
+
+    {"script": ".../main.py", "workdir": "...", "wall_time": 5,
+     "limits": [[resource, soft, hard], ...]}
+    {"code": 0, "signal": null, "timed_out": false}
+"""
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import time
+import types
+
+# Warm the modules submissions commonly import
+import bisect  # noqa: F401
+import collections  # noqa: F401
+import functools  # noqa: F401
+import heapq  # noqa: F401
+import itertools  # noqa: F401
+import math  # noqa: F401
+import re  # noqa: F401
+import string  # noqa: F401
+
+
+def run_child(request):
+    """Runs in the forked child; never returns."""
+    code = 1
+    try:
+        os.chdir(request['workdir'])
+        for which, soft, hard in request['limits']:
+            resource.setrlimit(which, (soft, hard))
+
+        for fd, name, flags in ((0, '.stdin', os.O_RDONLY),
+                                (1, '.stdout', os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+                                (2, '.stderr', os.O_WRONLY | os.O_CREAT | os.O_TRUNC)):
+            new_fd = os.open(name, flags, 0o600)
+            os.dup2(new_fd, fd)
+            os.close(new_fd)
+        sys.stdin = open(0, 'r', encoding='utf-8', closefd=False)
+        sys.stdout = open(1, 'w', encoding='utf-8', closefd=False)
+        sys.stderr = open(2, 'w', encoding='utf-8', closefd=False)
+
+        with open(request['script'], encoding='utf-8') as f:
+            source = f.read()
+        main = types.ModuleType('__main__')
+        main.__file__ = 'main.py'
+        sys.modules['__main__'] = main
+        sys.argv = ['main.py']
+
+        try:
+            exec(compile(source, 'main.py', 'exec'), main.__dict__)
+            code = 0
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException as e:
+            import traceback
+            # Skip this frame so the traceback starts in the user's main.py
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            code = 1
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except (OSError, ValueError):
+            code = code or 1
+    finally:
+        os._exit(code)
+
+
+def wait_child(pid, wall_time):
+    """Wait up to ``wall_time`` seconds; returns (status, timed_out)."""
+    deadline = time.monotonic() + wall_time
+    try:
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        pidfd = None
+
+    try:
+        while True:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                return status, False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if pidfd is not None:
+                select.select([pidfd], [], [], remaining)
+            else:
+                time.sleep(min(remaining, 0.002))
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    _done, status = os.waitpid(pid, 0)
+    return status, True
+
+
+def main():
+    for line in sys.stdin:
+        request = json.loads(line)
+        pid = os.fork()
+        if pid == 0:
+            os.setsid()
+            run_child(request)
+
+        status, timed_out = wait_child(pid, request['wall_time'])
+        # Reap anything the child left behind in its session
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+        if os.WIFSIGNALED(status):
+            reply = {"code": None, "signal": signal.Signals(os.WTERMSIG(status)).name}
+        else:
+            reply = {"code": os.WEXITSTATUS(status), "signal": None}
+        reply["timed_out"] = timed_out
+        sys.stdout.write(json.dumps(reply) + '\n')
+        sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,439 @@
+"""
+Shared helpers for loading problem data files (``challenges/data``).
+
+Used by the ``import_problems`` and ``sync_problems`` commands. Besides the
+JSON arrays in ``challenges/data`` they read JSON Lines, and the dumps of
+``export_problems``: JSON Lines or msgpack, optionally gzip or zstd
+compressed, starting with a header record and with repeated starter code
+moved into template records.
+"""
+import collections
+import gzip
+import io
+import itertools
+import json
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .catalogue import bump_version
+from .models import Problem
+from .search import index_problems, rebuild_index
+from .verdicts import get_verdict_cache, test_set_hash
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Map difficulty names to codes
+DIFFICULTY_FILES = {
+    'beginner': ('problems_beginner.json', 'BEG'),
+    'intermediate': ('problems_intermediate.json', 'INT'),
+    'advanced': ('problems_advanced.json', 'ADV'),
+    'pro': ('problems_pro.json', 'PRO'),
+}
+
+REQUIRED_FIELDS = ['title', 'description', 'starter_code', 'solutions', 'test_cases']
+DIFFICULTY_CODES = {code for code, _label in Problem.DIFFICULTY_CHOICES}
+
+# export_problems dumps
+EXPORT_FORMAT = 'devsutra-problems'
+EXPORT_VERSION = 1
+EXPORT_FIELDS = ['title', 'difficulty', *(f for f in Problem.CONTENT_FIELDS if f != 'difficulty')]
+MSGPACK_SUFFIXES = ('.msgpack', '.mpk')
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+# truncated or corrupt compressed input
+DECOMPRESSION_ERRORS = (EOFError, gzip.BadGzipFile, zlib.error)
+if zstandard is not None:
+    DECOMPRESSION_ERRORS += (zstandard.ZstdError,)
+
+
+def files_for(difficulty):
+    """[(filename, difficulty code)] for 'beginner' ... 'pro' or 'all'; None if unknown."""
+    if difficulty == 'all':
+        return list(DIFFICULTY_FILES.values())
+    if difficulty in DIFFICULTY_FILES:
+        return [DIFFICULTY_FILES[difficulty]]
+    return None
+
+
+READ_SIZE = 1 << 16  # characters per read
+CHUNK_BYTES = 8 << 20  # JSON Lines files are split into parts of about this size
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'\s*')
+
+
+class _Stream:
+    """A read buffer over a text file that holds at most one entry plus a chunk."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def more(self, size=READ_SIZE):
+        """Append up to ``size`` characters, dropping what was consumed; False at EOF."""
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """The next non-whitespace character, or '' at end of file."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.more():
+                return ''
+
+    def truncated(self, error):
+        """Whether a decode error may just be the end of the buffer."""
+        # An unterminated string always runs to the end of the buffer and
+        # reports where it starts; a cut escape ("\\u12") fails a few
+        # characters before the end. Anything else stops at the end itself.
+        return (
+            error.msg.startswith('Unterminated string')
+            or error.pos >= len(self.buffer) - len('\\uXXXX')
+        )
+
+    def value(self):
+        self.peek()
+        size = READ_SIZE
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Only an entry cut off by the end of the buffer needs more
+                # input: read it (doubling, so a huge entry is not re-parsed
+                # O(n) times). A real syntax error fails here, not at EOF.
+                if not self.truncated(e) or not self.more(size):
+                    raise
+                size *= 2
+                continue
+            # a bare number ending here may continue in the next chunk
+            # ("-1.5" of "-1.5e+3"): check with more input
+            if end >= len(self.buffer) - len('e+') and not self.eof and self.more(size):
+                continue
+            self.pos = end
+            return value
+
+
+def _values(f):
+    stream = _Stream(f)
+    if stream.peek() != '[':
+        # JSON Lines (or any whitespace-separated values)
+        while stream.peek():
+            yield stream.value()
+        return
+
+    stream.pos += 1
+    if stream.peek() == ']':
+        stream.pos += 1
+    else:
+        while True:
+            yield stream.value()
+            separator = stream.peek()
+            stream.pos += 1
+            if separator == ']':
+                break
+            if separator != ',':
+                raise ValueError(f"expected ',' or ']' after an entry, got {separator!r}")
+    if stream.peek():
+        raise ValueError('unexpected data after the top-level array')
+
+
+def open_binary(path):
+    """The file's bytes, decompressed if it starts with a gzip or zstd header."""
+    f = open(path, 'rb')
+    magic = f.read(4)
+    f.seek(0)
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=f, mode='rb')
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            f.close()
+            raise ValueError('zstd-compressed file, but the zstandard module is not installed')
+        return zstandard.ZstdDecompressor().stream_reader(f, closefd=True)
+    return f
+
+
+def _records(stream, path):
+    """Raw records of a (decompressed) file: msgpack by suffix, else JSON."""
+    name = path
+    for suffix in ('.gz', '.zst'):
+        name = name.removesuffix(suffix)
+    if name.endswith(MSGPACK_SUFFIXES):
+        if msgpack is None:
+            raise ValueError('msgpack file, but the msgpack module is not installed')
+        try:
+            yield from msgpack.Unpacker(stream, raw=False)
+        except msgpack.UnpackException as e:
+            raise ValueError(f'invalid msgpack: {e}') from e
+        return
+    yield from _values(io.TextIOWrapper(stream, encoding='utf-8'))
+
+
+def expand_templates(records):
+    """
+    Drop export header records and resolve starter-code templates: a
+    ``{"template": n, "starter_code": {...}}`` record defines template ``n``
+    and later entries refer to it with ``"starter_code": n``.
+    """
+    templates = {}
+    for record in records:
+        if isinstance(record, dict):
+            if 'format' in record:
+                if record['format'] != EXPORT_FORMAT or record.get('version', 0) > EXPORT_VERSION:
+                    raise ValueError(f"unsupported export {record['format']!r} v{record.get('version')}")
+                continue
+            if 'template' in record:
+                templates[record['template']] = record['starter_code']
+                continue
+            if isinstance(record.get('starter_code'), int):
+                if record['starter_code'] not in templates:
+                    raise ValueError(f"unknown starter code template {record['starter_code']}")
+                record['starter_code'] = templates[record['starter_code']]
+        yield record
+
+
+def iter_problems(path, limit=None):
+    """
+    Yield the entries of a data file one at a time, without loading the file:
+    a top-level JSON array, JSON Lines or an ``export_problems`` dump.
+    Reading stops after ``limit`` entries. Raises ValueError on malformed
+    input, after yielding the entries before it.
+    """
+    with open_binary(path) as stream:
+        try:
+            for count, problem in enumerate(expand_templates(_records(stream, path)), start=1):
+                yield problem
+                if limit and count >= limit:
+                    return
+        except DECOMPRESSION_ERRORS as e:
+            raise ValueError(f'cannot decompress: {e}') from e
+
+
+def difficulty_of(problem, default):
+    """The entry's own difficulty code (export dumps carry one), else ``default``; None if invalid."""
+    code = problem.get('difficulty') or default
+    return code if code in DIFFICULTY_CODES else None
+
+
+def other_difficulty(problem, difficulty):
+    """
+    True if a single ``difficulty`` was requested and the entry names another
+    one: ``beginner --file dump.jsonl`` only imports a full dump's beginner
+    problems. Such entries are left out rather than counted as invalid.
+    """
+    code = problem.get('difficulty')
+    return bool(difficulty and code and code != difficulty)
+
+
+def missing_fields(problem):
+    if not isinstance(problem, dict):
+        return REQUIRED_FIELDS
+    return [field for field in REQUIRED_FIELDS if field not in problem]
+
+
+def build_problem(problem, difficulty):
+    """Unsaved Problem for a data-file entry, with its content hash set."""
+    instance = Problem(
+        title=problem['title'],
+        description=problem['description'],
+        difficulty=difficulty,
+        real_life_context=problem.get('real_life_context', ''),
+        explanation=problem.get('explanation', ''),
+        starter_code=problem.get('starter_code', {}),
+        solutions=problem.get('solutions', {}),
+        test_cases=problem.get('test_cases', []),
+        tags=problem.get('tags', []),
+    )
+    # bulk_create/bulk_update skip save(), which normally sets it
+    instance.content_hash = instance.compute_content_hash()
+    return instance
+
+
+def parse_entries(entries, difficulty):
+    """(Problems built from the valid entries, number of invalid ones)."""
+    problems, invalid = [], 0
+    for problem in entries:
+        if missing_fields(problem):
+            invalid += 1
+            continue
+        if other_difficulty(problem, difficulty):
+            continue
+        code = difficulty_of(problem, difficulty)
+        if code is None:
+            invalid += 1
+        else:
+            problems.append(build_problem(problem, code))
+    return problems, invalid
+
+
+def iter_chunks(path, difficulty, size, limit=None):
+    """Stream a file as validated ``(problems, invalid)`` chunks of ``size`` entries."""
+    entries = iter_problems(path, limit)
+    while True:
+        chunk = list(itertools.islice(entries, size))
+        if not chunk:
+            return
+        yield parse_entries(chunk, difficulty)
+
+
+def _is_record_line(line):
+    """Whether ``line`` (bytes) holds exactly one complete JSON value."""
+    try:
+        text = line.decode('utf-8').strip()
+        _value, end = _decoder.raw_decode(text)
+    except ValueError:  # includes UnicodeDecodeError
+        return False
+    return end == len(text)
+
+
+def split_file(path, chunk_bytes=CHUNK_BYTES):
+    """
+    Byte ranges ``(start, end)`` of a JSON Lines file, cut at line ends. Any
+    other file is one range ``(0, None)``, as is one smaller than
+    ``chunk_bytes``: a JSON array or pretty-printed objects cannot be cut
+    without parsing them.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        first = f.readline()
+        # only one record per line: not arrays, pretty-printed, compressed or
+        # msgpack files, nor export dumps (templates precede their users)
+        if (size <= chunk_bytes or not first.startswith(b'{') or first.startswith(b'{"format":')
+                or not _is_record_line(first)):
+            return [(0, None)]
+        ranges, start = [], 0
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = f.tell()
+            # the next part must start with a whole record, or the file is
+            # not strictly line-delimited after all
+            if end < size and not _is_record_line(f.readline()):
+                return [(0, None)]
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_part(path, start, end, difficulty, limit=None):
+    """
+    Process pool task: parse and validate one range of a file (``end`` None:
+    the whole file). Returns ``(problems, invalid, error)``.
+    """
+    try:
+        if end is None:
+            return (*parse_entries(iter_problems(path, limit), difficulty), None)
+        with open(path, 'rb') as f:
+            f.seek(start)
+            text = f.read(end - start).decode('utf-8')
+        return (*parse_entries(_values(io.StringIO(text)), difficulty), None)
+    except ValueError as e:
+        return [], 0, str(e)
+
+
+def _part_results(results, count):
+    for index in range(count):
+        problems, invalid, error = next(results)
+        if error:
+            # skip the rest of this file so the next one starts in step
+            for _ in range(count - index - 1):
+                next(results)
+            raise ValueError(error)
+        yield problems, invalid
+
+
+def pool_ranges(path, limit=None, chunk_bytes=CHUNK_BYTES):
+    """
+    The parts of a file to parse in the process pool, or None to stream it
+    in the writer process instead. A part is materialised as a whole in a
+    worker, so only parts of about ``chunk_bytes`` go to the pool: a larger
+    file that cannot be split (a JSON array, pretty-printed or compressed)
+    keeps the bounded memory of a sequential import.
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    if magic.startswith(GZIP_MAGIC) or magic == ZSTD_MAGIC:
+        return None
+    small = os.path.getsize(path) <= chunk_bytes
+    if limit:
+        # the first N entries must come from one reader
+        return [(0, None)] if small else None
+    ranges = split_file(path, chunk_bytes)
+    if ranges == [(0, None)] and not small:
+        return None
+    return ranges
+
+
+def parallel_chunks(files, workers, size, limit=None, chunk_bytes=CHUNK_BYTES):
+    """
+    Parse and validate ``[(path, difficulty)]`` in a pool of ``workers``
+    processes. Yields ``(path, chunks)`` in file order, where ``chunks``
+    yields each part's ``(problems, invalid)`` in order and raises
+    ValueError for a part with a syntax error; consume each ``chunks``
+    before taking the next file. Files ``pool_ranges`` keeps out of the
+    pool are streamed here in chunks of ``size`` entries.
+    """
+    plans = [(path, difficulty, pool_ranges(path, limit, chunk_bytes)) for path, difficulty in files]
+    tasks = [
+        (path, start, end, difficulty, limit)
+        for path, difficulty, ranges in plans if ranges
+        for start, end in ranges
+    ]
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        results = _ordered_results(pool, tasks, window=2 * workers)
+        for path, difficulty, ranges in plans:
+            if ranges is None:
+                yield path, iter_chunks(path, difficulty, size, limit)
+            else:
+                yield path, _part_results(results, len(ranges))
+
+
+def _ordered_results(pool, tasks, window):
+    """Like pool.map, but with at most ``window`` parsed parts waiting in memory."""
+    pending = collections.deque()
+    for task in tasks:
+        pending.append(pool.submit(parse_part, *task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def refresh_derived(created_ids=(), updated_ids=()):
+    """
+    Do what the Problem signals do, after bulk writes that skip them: bump
+    the catalogue version, reindex for search and drop stale verdicts.
+    """
+    created_ids, updated_ids = list(created_ids), list(updated_ids)
+    bump_version()
+    if all(created_ids):
+        index_problems([*created_ids, *updated_ids])
+    else:
+        # bulk_create returned no pks (e.g. SQLite < 3.35): reindex everything
+        rebuild_index()
+    cache = get_verdict_cache()
+    if cache is not None and updated_ids:
+        for pk, test_cases in Problem.objects.filter(id__in=updated_ids).values_list('id', 'test_cases'):
+            cache.invalidate_problem(pk, test_set_hash(test_cases))
@@ -0,0 +1,257 @@
+"""
+Asynchronous judge queue backed by the JudgeJob table.
+
+``enqueue`` stores a job and returns immediately; judge workers claim jobs
+and write per-case results back as they finish, so clients can poll
+``/api/jobs/<id>/``. Workers run either as threads inside the web process
+(``JUDGE_QUEUE['WORKERS']``) or in a dedicated process started with
+``python manage.py run_judge_workers``. Jobs are claimed with a
+compare-and-swap UPDATE, which works on SQLite and Postgres alike and
+needs no Redis.
+
+Fairness: the depth of the queue and the number of jobs per owner are
+bounded, and a worker always picks the oldest job of the owner with the
+fewest jobs currently running.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Avg, Count, F, Min
+from django.utils import timezone
+
+from .execution import ExecutionError
+from .judge import client_result
+from .models import JudgeJob
+from .submissions import record_pass
+from .verdicts import cached_judge, get_verdict_cache
+
+logger = logging.getLogger(__name__)
+
+# How many of the oldest queued jobs are considered when picking fairly
+CLAIM_WINDOW = 50
+
+# Postgres advisory lock key held while enqueueing ("judgeq")
+QUEUE_LOCK_ID = 0x6A75646765
+
+
+class QueueFull(Exception):
+    """The queue (or this owner's share of it) has no room for another job."""
+
+
+def lock_queue():
+    """
+    Serialise enqueues until the end of the transaction, so that the limit
+    checks and the insert act as one: concurrent requests cannot all pass
+    the checks before any of them has inserted.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [QUEUE_LOCK_ID])
+    else:
+        # SQLite: any write, even of no rows, takes the single writer lock
+        JudgeJob.objects.filter(id__isnull=True).update(status=JudgeJob.QUEUED)
+
+
+def enqueue(problem, code, language, owner, clerk_id='', email=''):
+    """Add a job to the queue and wake the local workers."""
+    options = settings.JUDGE_QUEUE
+    with transaction.atomic():
+        lock_queue()
+        active = JudgeJob.objects.filter(status__in=[JudgeJob.QUEUED, JudgeJob.RUNNING])
+        if active.filter(status=JudgeJob.QUEUED).count() >= options['MAX_DEPTH']:
+            raise QueueFull("The judge queue is full, please retry shortly.")
+        if active.filter(owner=owner).count() >= options['MAX_PER_OWNER']:
+            raise QueueFull("You already have the maximum number of submissions in the queue.")
+
+        job = JudgeJob.objects.create(
+            problem=problem,
+            owner=owner,
+            clerk_id=clerk_id or '',
+            email=email or '',
+            code=code,
+            language=language,
+        )
+    ensure_workers()
+    _wakeup.set()
+    return job
+
+
+def queue_position(job):
+    """Number of queued jobs ahead of ``job`` (0 once it has started)."""
+    if job.status != JudgeJob.QUEUED:
+        return 0
+    return JudgeJob.objects.filter(status=JudgeJob.QUEUED, created_at__lt=job.created_at).count()
+
+
+def requeue_stale():
+    """Put back jobs whose worker died mid-run."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JUDGE_QUEUE['STALE_AFTER'])
+    return JudgeJob.objects.filter(status=JudgeJob.RUNNING, started_at__lt=cutoff).update(
+        status=JudgeJob.QUEUED, started_at=None, results=[]
+    )
+
+
+def claim_next():
+    """Atomically claim the next job to run, or return None."""
+    max_running = settings.JUDGE_QUEUE['MAX_RUNNING_PER_OWNER']
+    while True:
+        candidates = list(
+            JudgeJob.objects.filter(status=JudgeJob.QUEUED)
+            .order_by('created_at')
+            .values_list('id', 'owner')[:CLAIM_WINDOW]
+        )
+        if not candidates:
+            return None
+
+        running = dict(
+            JudgeJob.objects.filter(status=JudgeJob.RUNNING)
+            .values_list('owner')
+            .annotate(n=Count('id'))
+        )
+        eligible = [
+            (running.get(owner, 0), position, job_id)
+            for position, (job_id, owner) in enumerate(candidates)
+            if running.get(owner, 0) < max_running
+        ]
+        if not eligible:
+            return None
+
+        _running, _position, job_id = min(eligible)
+        claimed = JudgeJob.objects.filter(id=job_id, status=JudgeJob.QUEUED).update(
+            status=JudgeJob.RUNNING, started_at=timezone.now()
+        )
+        if claimed:
+            return JudgeJob.objects.select_related('problem').get(id=job_id)
+        # Another worker took it first; look again
+
+
+def run_job(job):
+    """Judge a claimed job, saving per-case results as they finish."""
+    finished = {}
+
+    def on_result(idx, result):
+        finished[idx] = result
+        JudgeJob.objects.filter(id=job.id).update(
+            results=[client_result(finished[i], i) for i in sorted(finished)]
+        )
+
+    try:
+        results, all_passed, _cached = cached_judge(
+            job.problem_id, job.problem.test_cases, job.code, job.language, on_result=on_result
+        )
+    except ExecutionError as e:
+        JudgeJob.objects.filter(id=job.id).update(
+            status=JudgeJob.ERROR, error=str(e) or "Compiler Service Unavailable",
+            finished_at=timezone.now(),
+        )
+        return
+
+    points = None
+    if all_passed:
+        points = record_pass(job.problem, job.code, job.language, job.clerk_id, job.email)
+
+    JudgeJob.objects.filter(id=job.id).update(
+        status=JudgeJob.DONE,
+        verdict="Success" if all_passed else "Failed",
+        results=[client_result(result, idx) for idx, result in enumerate(results)],
+        points=points,
+        finished_at=timezone.now(),
+    )
+
+
+def purge_finished():
+    """Delete finished jobs older than the retention window."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JUDGE_QUEUE['RETENTION'])
+    JudgeJob.objects.filter(
+        status__in=[JudgeJob.DONE, JudgeJob.ERROR], finished_at__lt=cutoff
+    ).delete()
+
+
+def work_once():
+    """Claim and run one job. Returns False when nothing was runnable."""
+    close_old_connections()
+    try:
+        job = claim_next()
+        if job is None:
+            return False
+        try:
+            run_job(job)
+        except Exception as e:
+            logger.exception("Judge job %s crashed", job.id)
+            JudgeJob.objects.filter(id=job.id).update(
+                status=JudgeJob.ERROR, error=str(e), finished_at=timezone.now()
+            )
+        return True
+    finally:
+        close_old_connections()
+
+
+def work_forever(stop_event=None):
+    """Worker loop: drain the queue, then sleep until woken or polled."""
+    poll_interval = settings.JUDGE_QUEUE['POLL_INTERVAL']
+    last_maintenance = 0
+    while stop_event is None or not stop_event.is_set():
+        if time.monotonic() - last_maintenance > 60:
+            last_maintenance = time.monotonic()
+            try:
+                requeue_stale()
+                purge_finished()
+            except Exception:
+                # e.g. "database is locked": tried again next time round
+                logger.exception("Judge queue maintenance failed")
+        try:
+            busy = work_once()
+        except Exception:
+            logger.exception("Judge worker error")
+            busy = False
+        if not busy:
+            _wakeup.wait(poll_interval)
+            _wakeup.clear()
+
+
+def queue_stats():
+    """Queue length, running jobs and wait/run times (seconds)."""
+    now = timezone.now()
+    queued = JudgeJob.objects.filter(status=JudgeJob.QUEUED)
+    oldest = queued.aggregate(oldest=Min('created_at'))['oldest']
+    recent = JudgeJob.objects.filter(
+        status__in=[JudgeJob.DONE, JudgeJob.ERROR],
+        finished_at__gte=now - timedelta(minutes=15),
+    ).aggregate(
+        wait=Avg(F('started_at') - F('created_at')),
+        run=Avg(F('finished_at') - F('started_at')),
+        count=Count('id'),
+    )
+    verdict_cache = get_verdict_cache()
+    return {
+        "queued": queued.count(),
+        "running": JudgeJob.objects.filter(status=JudgeJob.RUNNING).count(),
+        "oldest_wait": (now - oldest).total_seconds() if oldest else 0.0,
+        "finished_last_15m": recent['count'],
+        "avg_wait_last_15m": recent['wait'].total_seconds() if recent['wait'] else 0.0,
+        "avg_run_last_15m": recent['run'].total_seconds() if recent['run'] else 0.0,
+        "max_depth": settings.JUDGE_QUEUE['MAX_DEPTH'],
+        "workers": len(_workers),
+        "verdict_cache": verdict_cache.stats() if verdict_cache else None,
+    }
+
+
+_wakeup = threading.Event()
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def ensure_workers():
+    """Start the in-process worker threads (once per process)."""
+    count = settings.JUDGE_QUEUE['WORKERS']
+    with _workers_lock:
+        if _workers or count <= 0:
+            return
+        for n in range(count):
+            thread = threading.Thread(target=work_forever, name=f'judge-worker-{n}', daemon=True)
+            thread.start()
+            _workers.append(thread)
@@ -0,0 +1,230 @@
+"""
+Judging helpers: run a submission against a problem's test cases.
+
+Test cases are sent to the compiler service in parallel on a bounded,
+process-wide thread pool. Results always come back in ``test_cases`` order.
+"""
+import asyncio
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from .execution import get_executor
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the shared judge thread pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=settings.JUDGE_MAX_WORKERS,
+                thread_name_prefix='judge',
+            )
+        return _pool
+
+
+def check_output(user_output, expected_output):
+    """Compare outputs and return (passed, feedback) with a smart hint."""
+    passed = (user_output == expected_output)
+    feedback = None
+
+    # --- SMART HINT LOGIC ---
+    if not passed:
+        if user_output.lower() == expected_output.lower():
+            feedback = "⚠️ Case Mismatch: Check your capitalization!"
+        elif user_output.replace(" ", "") == expected_output.replace(" ", ""):
+            feedback = "⚠️ Spacing Issue: Check for extra spaces or newlines."
+    # ------------------------
+
+    return passed, feedback
+
+
+def run_case(program, case):
+    """Run a prepared program on a single test case and build its result entry."""
+    return build_result(case, program.run(case['input']))
+
+
+# Piston stage statuses caused by the runner: TO (wall-clock timeout), XX (internal error)
+TRANSIENT_STATUSES = ('TO', 'XX')
+
+
+def is_transient(data):
+    """
+    Whether an execution result may not repeat for the same code: a stage
+    killed with SIGKILL (the wall-clock limit, which load can trigger) or a
+    runner error body with no stages at all (e.g. a Piston 4xx).
+    """
+    stages = [data[name] for name in ('compile', 'run') if data.get(name)]
+    if not stages:
+        return True
+    return any(
+        stage.get('signal') == 'SIGKILL' or stage.get('status') in TRANSIENT_STATUSES
+        for stage in stages
+    )
+
+
+def build_result(case, data):
+    """Turn an execution result into the per-case entry sent to the client."""
+    # Clean outputs
+    user_output = data.get('run', {}).get('stdout', '').strip()
+    expected_output = case['output'].strip()
+    passed, feedback = check_output(user_output, expected_output)
+
+    result = {
+        "input": case['input'],
+        "expected": expected_output,
+        "actual": user_output,
+        "passed": passed,
+        "feedback": feedback
+    }
+    if is_transient(data):
+        # may pass on a retry: never cached. Internal, see client_result()
+        result["transient"] = True
+    return result
+
+
+def client_result(result, index):
+    """A per-case result as streamed to clients: with its index, without internal markers."""
+    result = dict(result, index=index)
+    result.pop("transient", None)
+    return result
+
+
+def iter_judge(code, language, test_cases, fail_fast=None):
+    """
+    Yield (index, result) pairs as test cases finish, in completion order.
+
+    In fail-fast mode, cases after the first failing one are cancelled and
+    never yielded once the failure is known. Errors from the compiler
+    service propagate to the caller.
+    """
+    if fail_fast is None:
+        fail_fast = settings.JUDGE_FAIL_FAST
+
+    # Compiled languages are built once here, not once per test case
+    program = get_executor().prepare(language, code)
+    pool = get_pool()
+    futures = {
+        pool.submit(run_case, program, case): idx
+        for idx, case in enumerate(test_cases)
+    }
+    pending = set(futures)
+    first_failure = None
+
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=futures.get):
+                idx = futures[future]
+                if future.cancelled():
+                    continue
+                if first_failure is not None and idx > first_failure:
+                    continue
+
+                result = future.result()
+                yield idx, result
+
+                if fail_fast and not result['passed']:
+                    first_failure = idx
+                    # Cases after the failure are no longer needed
+                    for other in pending:
+                        if futures[other] > idx:
+                            other.cancel()
+                    pending = {f for f in pending if futures[f] < idx}
+    finally:
+        for future in pending:
+            future.cancel()
+        program.close()
+
+
+def judge(code, language, test_cases, fail_fast=None, on_result=None):
+    """
+    Run all test cases and return (results, all_passed).
+
+    ``results`` matches what a sequential run would produce: it is ordered
+    like ``test_cases`` and, in fail-fast mode, stops at the first failure.
+    ``on_result(index, result)`` is called as each case finishes.
+    """
+    if fail_fast is None:
+        fail_fast = settings.JUDGE_FAIL_FAST
+
+    finished = {}
+    for idx, result in iter_judge(code, language, test_cases, fail_fast):
+        finished[idx] = result
+        if on_result is not None:
+            on_result(idx, result)
+
+    return collect_results(finished, len(test_cases), fail_fast)
+
+
+def collect_results(finished, total, fail_fast):
+    """
+    Turn ``{index: result}`` from ``iter_judge`` into (results, all_passed),
+    ordered and truncated exactly like a sequential run.
+    """
+    results = []
+    for idx in range(total):
+        result = finished.get(idx)
+        if result is None:
+            continue
+        results.append(result)
+        if fail_fast and not result['passed']:
+            break
+
+    all_passed = len(results) == total and all(r['passed'] for r in results)
+    return results, all_passed
+
+
+async def ajudge(code, language, test_cases, fail_fast=None):
+    """
+    Async ``judge()``: test cases run as tasks on the event loop instead of
+    pool threads, with at most JUDGE_MAX_WORKERS in flight per submission.
+    """
+    if fail_fast is None:
+        fail_fast = settings.JUDGE_FAIL_FAST
+
+    program = await get_executor().aprepare(language, code)
+    semaphore = asyncio.Semaphore(settings.JUDGE_MAX_WORKERS)
+
+    async def run(case):
+        async with semaphore:
+            return build_result(case, await program.arun(case['input']))
+
+    index = {
+        asyncio.ensure_future(run(case)): idx
+        for idx, case in enumerate(test_cases)
+    }
+    pending = set(index)
+    finished = {}
+    first_failure = None
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=index.get):
+                idx = index[task]
+                if task.cancelled():
+                    continue
+                if first_failure is not None and idx > first_failure:
+                    continue
+
+                result = task.result()
+                finished[idx] = result
+
+                if fail_fast and not result['passed']:
+                    first_failure = idx
+                    for other in pending:
+                        if index[other] > idx:
+                            other.cancel()
+                    pending = {t for t in pending if index[t] < idx}
+    finally:
+        for task in pending:
+            task.cancel()
+        program.close()
+
+    return collect_results(finished, len(test_cases), fail_fast)
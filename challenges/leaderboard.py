@@ -0,0 +1,118 @@
+"""
+Points ledger and leaderboard.
+
+The first accepted solution of a problem credits its points once, as a
+PointsLedgerEntry, and adds them to the user's UserScore row in the same
+transaction (see ``save_pass()``). Leaderboard reads only touch UserScore:
+the top N is an index scan on ``(-score, updated_at)`` and a user's rank
+is one indexed COUNT of the users scoring more.
+
+``python manage.py rebuild_leaderboard`` recomputes both tables from
+UserProblemProgress.
+"""
+from django.db.models import Count, F, Max, Sum
+
+from .models import PointsLedgerEntry, UserProblemProgress, UserScore
+
+
+def credit(user, problem, points):
+    """Record points for a newly solved problem; call inside the pass transaction."""
+    entry, created = PointsLedgerEntry.objects.get_or_create(
+        user=user, problem=problem, defaults={'points': points}
+    )
+    if not created:
+        return 0
+
+    score, _created = UserScore.objects.select_for_update().get_or_create(user=user)
+    UserScore.objects.filter(pk=score.pk).update(
+        score=F('score') + points, solved=F('solved') + 1, updated_at=entry.awarded_at
+    )
+    return points
+
+
+def debit(entry):
+    """Take back a removed ledger entry (e.g. its problem was deleted)."""
+    UserScore.objects.filter(user_id=entry.user_id).update(
+        score=F('score') - entry.points, solved=F('solved') - 1
+    )
+
+
+def ranked(rows):
+    """Add competition ranks ("1, 2, 2, 4") to rows ordered by score."""
+    rank, previous = 0, None
+    for position, row in enumerate(rows, start=1):
+        if row['score'] != previous:
+            rank, previous = position, row['score']
+        row['rank'] = rank
+    return rows
+
+
+def top(limit=10):
+    rows = list(
+        UserScore.objects.filter(score__gt=0)
+        .order_by('-score', 'updated_at')
+        .values('user__username', 'score', 'solved')[:limit]
+    )
+    return ranked([
+        {"user": row['user__username'], "score": row['score'], "solved": row['solved']}
+        for row in rows
+    ])
+
+
+def rank_of(clerk_id):
+    """The user's score and rank, or None if they have not scored yet."""
+    row = (
+        UserScore.objects.filter(user__username=clerk_id, score__gt=0)
+        .values('score', 'solved')
+        .first()
+    )
+    if row is None:
+        return None
+    return {
+        "user": clerk_id,
+        "score": row['score'],
+        "solved": row['solved'],
+        "rank": UserScore.objects.filter(score__gt=row['score']).count() + 1,
+    }
+
+
+def rebuild():
+    """
+    Credit every solved problem that has no ledger entry yet, then recompute
+    all UserScore rows from the ledger. Returns (new entries, users).
+    """
+    from .submissions import points_for  # submissions imports this module
+
+    existing = set(PointsLedgerEntry.objects.values_list('user_id', 'problem_id'))
+    missing = [
+        PointsLedgerEntry(
+            user_id=progress.user_id,
+            problem_id=progress.problem_id,
+            points=points_for(progress.problem),
+            awarded_at=progress.first_solved_at,
+        )
+        for progress in UserProblemProgress.objects.select_related('problem').only(
+            'user_id', 'problem_id', 'first_solved_at', 'problem__difficulty'
+        ).iterator()
+        if (progress.user_id, progress.problem_id) not in existing
+    ]
+    PointsLedgerEntry.objects.bulk_create(missing, batch_size=1000, ignore_conflicts=True)
+
+    totals = (
+        PointsLedgerEntry.objects.values('user')
+        .annotate(score=Sum('points'), solved=Count('id'), last=Max('awarded_at'))
+        .order_by()
+    )
+    scores = [
+        UserScore(user_id=row['user'], score=row['score'], solved=row['solved'], updated_at=row['last'])
+        for row in totals.iterator()
+    ]
+    UserScore.objects.exclude(user__in=PointsLedgerEntry.objects.values('user')).delete()
+    UserScore.objects.bulk_create(
+        scores,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['score', 'solved', 'updated_at'],
+    )
+    return len(missing), len(scores)
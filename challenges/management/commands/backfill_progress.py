@@ -0,0 +1,69 @@
+"""
+Build UserProblemProgress rows from existing passed submissions.
+
+Safe to re-run: rows are upserted, so first_solved_at, best_language and
+attempts are recomputed from the submission history each time. The
+per-user progress bitsets are rebuilt from the result.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Min, OuterRef, Subquery
+
+from challenges.models import Submission, UserProblemProgress
+from challenges.progress import rebuild_blobs
+
+
+class Command(BaseCommand):
+    help = 'Backfill per-user solved-problem progress from passed submissions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows written per INSERT'
+        )
+
+    def handle(self, *args, **kwargs):
+        batch_size = kwargs['batch_size']
+        passed = Submission.objects.filter(status="Passed")
+        latest_language = (
+            passed.filter(user=OuterRef('user'), problem=OuterRef('problem'))
+            .order_by('-created_at', '-id')
+            .values('language')[:1]
+        )
+        solved = (
+            passed.values('user', 'problem')
+            .annotate(
+                first_solved_at=Min('created_at'),
+                attempts=Count('id'),
+                best_language=Subquery(latest_language),
+            )
+            .order_by('user', 'problem')
+        )
+
+        self.stdout.write("📋 Collecting solved problems from submissions...")
+        rows = [
+            UserProblemProgress(
+                user_id=row['user'],
+                problem_id=row['problem'],
+                first_solved_at=row['first_solved_at'],
+                best_language=row['best_language'],
+                attempts=row['attempts'],
+            )
+            for row in solved.iterator()
+        ]
+
+        with transaction.atomic():
+            UserProblemProgress.objects.bulk_create(
+                rows,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['user', 'problem'],
+                update_fields=['first_solved_at', 'best_language', 'attempts'],
+            )
+            blobs = rebuild_blobs()
+
+        users = len({row.user_id for row in rows})
+        self.stdout.write(self.style.SUCCESS(f'✅ {len(rows)} solved problems backfilled for {users} users'))
+        self.stdout.write(self.style.SUCCESS(f'🧮 {blobs} progress bitsets rebuilt'))
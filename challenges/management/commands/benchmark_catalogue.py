@@ -0,0 +1,97 @@
+"""
+Benchmark catalogue payload size and render time on challenges/data.
+
+Renders the full problem list the way ProblemListAPI does (ProblemSerializer
+shape) with DRF's stdlib JSONRenderer and the orjson renderer, then
+compresses it with every encoding CompressionMiddleware can produce.
+"""
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from challenges.middleware import COMPRESSORS, compress
+from challenges.renderers import ORJSONRenderer, orjson
+
+DATA_FILES = [
+    ('problems_beginner.json', 'BEG'),
+    ('problems_intermediate.json', 'INT'),
+    ('problems_advanced.json', 'ADV'),
+    ('problems_pro.json', 'PRO'),
+]
+
+FIELDS = ['title', 'description', 'starter_code', 'real_life_context', 'explanation', 'solutions', 'test_cases']
+
+
+def load_catalogue(data_dir):
+    """The data files as ProblemSerializer would return them."""
+    problems = []
+    for filename, difficulty in DATA_FILES:
+        with open(os.path.join(data_dir, filename), encoding='utf-8') as f:
+            for problem in json.load(f):
+                entry = {'id': len(problems) + 1, 'difficulty': difficulty}
+                entry.update({field: problem.get(field, '') for field in FIELDS})
+                problems.append(entry)
+    return problems
+
+
+def timed(func, iterations):
+    """(result, average milliseconds) over ``iterations`` calls."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = func()
+    return result, (time.perf_counter() - start) / iterations * 1000
+
+
+class Command(BaseCommand):
+    help = 'Benchmark catalogue JSON rendering and response compression'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=10,
+            help='Runs per measurement'
+        )
+
+    def handle(self, *args, **kwargs):
+        iterations = kwargs['iterations']
+        data_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'data'))
+        problems = load_catalogue(data_dir)
+
+        self.stdout.write("\n" + "=" * 60)
+        self.stdout.write(f"📊 CATALOGUE BENCHMARK ({len(problems)} problems, {iterations} runs each)")
+        self.stdout.write("=" * 60)
+
+        self.stdout.write("\n🧾 Rendering")
+        body, baseline_ms = timed(lambda: JSONRenderer().render(problems), iterations)
+        self.stdout.write(f"  JSONRenderer (stdlib)   {len(body):>10,} bytes  {baseline_ms:8.2f} ms")
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("  ORJSONRenderer          orjson not installed - skipped"))
+        else:
+            fast_body, fast_ms = timed(lambda: ORJSONRenderer().render(problems), iterations)
+            same = json.loads(fast_body) == json.loads(body)
+            self.stdout.write(
+                f"  ORJSONRenderer          {len(fast_body):>10,} bytes  {fast_ms:8.2f} ms"
+                f"  ({baseline_ms / fast_ms:.1f}x faster, {'same' if same else 'DIFFERENT'} output)"
+            )
+
+        self.stdout.write("\n🗜️ Compression")
+        self.stdout.write(f"  identity                {len(body):>10,} bytes")
+        levels = settings.COMPRESSION['LEVELS']
+        for encoding in ('gzip', 'br', 'zstd'):
+            if encoding not in COMPRESSORS:
+                self.stdout.write(self.style.WARNING(f"  {encoding:<23} module not installed - skipped"))
+                continue
+            compressed, ms = timed(lambda: compress(body, encoding, levels), iterations)
+            self.stdout.write(
+                f"  {encoding + ' (level ' + str(levels[encoding]) + ')':<23} {len(compressed):>10,} bytes"
+                f"  {ms:8.2f} ms  ({len(body) / len(compressed):.1f}x smaller)"
+            )
+
+        self.stdout.write("\n" + "=" * 60)
+        self.stdout.write(self.style.SUCCESS("✅ Benchmark complete"))
+        self.stdout.write("=" * 60)
@@ -0,0 +1,92 @@
+"""
+Run EXPLAIN on every hot query and fail if one falls back to a full scan.
+
+SQLite reports a full scan as ``SCAN <table>`` (an index scan reads
+``SCAN <table> USING ... INDEX``); Postgres as ``Seq Scan``. On Postgres
+sequential scans are disabled for the check, so a small development
+table does not hide a missing index: a Seq Scan in the plan then means
+no index can serve the query.
+"""
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+
+from challenges.models import (
+    JudgeJob, PointsLedgerEntry, Problem, Submission, UserProblemProgress, UserScore,
+)
+
+# (name, queryset factory) for the queries behind the hot endpoints
+HOT_QUERIES = [
+    ('catalogue by difficulty',
+     lambda: Problem.objects.filter(difficulty='BEG', id__gt=0).order_by('id').values('id', 'title')[:50]),
+    ('user passed submissions',
+     lambda: Submission.objects.filter(user_id=1, status='Passed').values_list('problem_id', flat=True)),
+    ('problem passed count',
+     lambda: Submission.objects.filter(problem_id=1, status='Passed').values('problem_id').annotate(n=Count('id'))),
+    ('user history of a problem',
+     lambda: Submission.objects.filter(user_id=1, problem_id=1, status='Passed').order_by('created_at')),
+    ('admin recent submissions',
+     lambda: Submission.objects.order_by('-created_at')[:100]),
+    ('user progress',
+     lambda: UserProblemProgress.objects.filter(user_id=1).values_list('problem_id', flat=True)),
+    ('points ledger lookup',
+     lambda: PointsLedgerEntry.objects.filter(user_id=1, problem_id=1)),
+    ('leaderboard top',
+     lambda: UserScore.objects.filter(score__gt=0).order_by('-score', 'updated_at')[:10]),
+    ('leaderboard rank',
+     lambda: UserScore.objects.filter(score__gt=100).values('score')),  # COUNT(*) of users above
+    ('judge queue claim',
+     lambda: JudgeJob.objects.filter(status=JudgeJob.QUEUED).order_by('created_at')[:50]),
+]
+
+
+def explain(queryset_factory):
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset_factory().explain()
+
+
+def full_scans(plan):
+    """Plan lines that read a whole table."""
+    scans = []
+    for line in plan.splitlines():
+        # SQLite rows are "<id> <parent> <notused> <detail>"
+        text = re.sub(r'^\d+ \d+ \d+ ', '', line.strip(' -|`'))
+        if connection.vendor == 'sqlite':
+            if text.startswith('SCAN ') and ' USING ' not in text:
+                scans.append(text)
+        elif 'Seq Scan' in text:
+            scans.append(text)
+    return scans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot queries and fail if any does a full table scan'
+
+    def handle(self, *args, **kwargs):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'Query plan checks support SQLite and Postgres, not {connection.vendor}')
+
+        self.stdout.write(f"\n🔍 Checking {len(HOT_QUERIES)} hot query plans on {connection.vendor}\n")
+        failures = []
+        for name, factory in HOT_QUERIES:
+            plan = explain(factory)
+            scans = full_scans(plan)
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"  ❌ {name}: full scan"))
+                for scan in scans:
+                    self.stdout.write(f"      {scan}")
+            else:
+                self.stdout.write(self.style.SUCCESS(f"  ✅ {name}"))
+            if kwargs['verbosity'] > 1:
+                for line in plan.splitlines():
+                    self.stdout.write(f"      {line}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries regressed to a full scan: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("\n✅ All hot queries use an index"))
@@ -0,0 +1,150 @@
+"""
+Dump the Problem table to a compact file that ``import_problems --file``
+reads back.
+
+Rows are streamed with ``.iterator()``, so memory does not grow with the
+catalogue. The dump is JSON Lines (or msgpack, if installed): a header
+record, then one record per problem. Identical starter code is written
+once, as a ``{"template": n, "starter_code": {...}}`` record, and problems
+refer to it with ``"starter_code": n``. ``--compress`` adds gzip, or zstd
+when the zstandard module is installed.
+"""
+import gzip
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from challenges.ingest import (
+    EXPORT_FIELDS, EXPORT_FORMAT, EXPORT_VERSION, MSGPACK_SUFFIXES, files_for, msgpack, zstandard,
+)
+from challenges.models import Problem
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COMPRESSIONS = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+
+def jsonl_encoder():
+    if orjson is not None:
+        return lambda record: orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return lambda record: (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def msgpack_encoder():
+    packer = msgpack.Packer(use_bin_type=True)
+    return packer.pack
+
+
+def open_output(path, compression, level):
+    f = open(path, 'wb')
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=f, mode='wb', compresslevel=level or 6, mtime=0)
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=level or 3).stream_writer(f, closefd=True)
+    return f
+
+
+class Command(BaseCommand):
+    help = 'Export problems to a compact JSON Lines or msgpack file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output',
+            type=str,
+            help='File to write; the format and compression follow its suffix unless given'
+        )
+        parser.add_argument(
+            '--difficulty',
+            type=str,
+            default='all',
+            help='Difficulty level to export: beginner, intermediate, advanced, pro, or all'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['jsonl', 'msgpack'],
+            default=None,
+            help='Record encoding (default: msgpack for .msgpack/.mpk, else jsonl)'
+        )
+        parser.add_argument(
+            '--compress',
+            choices=list(COMPRESSIONS),
+            default=None,
+            help='Compression (default: gzip for .gz, zstd for .zst, else none)'
+        )
+        parser.add_argument(
+            '--level',
+            type=int,
+            default=None,
+            help='Compression level (gzip 1-9, default 6; zstd 1-22, default 3)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows fetched per database round trip'
+        )
+
+    def handle(self, *args, **kwargs):
+        output = kwargs['output']
+        files = files_for(kwargs['difficulty'].lower())
+        if files is None:
+            raise CommandError(
+                f"Invalid difficulty: {kwargs['difficulty']}. Use: beginner, intermediate, advanced, pro, or all"
+            )
+
+        compression = kwargs['compress']
+        if compression is None:
+            compression = next((name for name, suffix in COMPRESSIONS.items() if suffix and output.endswith(suffix)), 'none')
+        name = output.removesuffix(COMPRESSIONS[compression]) if COMPRESSIONS[compression] else output
+        fmt = kwargs['format'] or ('msgpack' if name.endswith(MSGPACK_SUFFIXES) else 'jsonl')
+
+        if fmt == 'msgpack':
+            if msgpack is None:
+                raise CommandError('msgpack output needs the msgpack module: pip install msgpack')
+            if not name.endswith(MSGPACK_SUFFIXES):
+                # import_problems picks the decoder by suffix
+                raise CommandError(f"msgpack output must be named *.msgpack or *.mpk, got {output}")
+            encode = msgpack_encoder()
+        else:
+            if name.endswith(MSGPACK_SUFFIXES):
+                raise CommandError(f"{output} would be read back as msgpack; use --format msgpack or another name")
+            encode = jsonl_encoder()
+        if compression == 'zstd' and zstandard is None:
+            raise CommandError('zstd compression needs the zstandard module: pip install zstandard')
+
+        queryset = Problem.objects.order_by('id').values_list(*EXPORT_FIELDS)
+        if len(files) == 1:
+            queryset = queryset.filter(difficulty=files[0][1])
+
+        started = time.perf_counter()
+        templates = {}
+        exported = 0
+        with open_output(output, compression, kwargs['level']) as out:
+            out.write(encode({
+                'format': EXPORT_FORMAT,
+                'version': EXPORT_VERSION,
+                'exported_at': timezone.now().isoformat(),
+            }))
+            for row in queryset.iterator(chunk_size=kwargs['batch_size']):
+                record = dict(zip(EXPORT_FIELDS, row))
+                key = json.dumps(record['starter_code'], sort_keys=True)
+                template = templates.get(key)
+                if template is None:
+                    template = templates[key] = len(templates)
+                    out.write(encode({'template': template, 'starter_code': record['starter_code']}))
+                record['starter_code'] = template
+                out.write(encode(record))
+                exported += 1
+
+        size = os.path.getsize(output)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {exported} problems exported to {output} '
+            f'({fmt}, {compression}, {size / 1024:.1f} KB, {len(templates)} starter code templates) '
+            f'in {time.perf_counter() - started:.2f}s'
+        ))
@@ -1,8 +1,8 @@
 import json
 import time
-import requests
 import google.generativeai as genai
 from django.core.management.base import BaseCommand
+from challenges.execution import execute
 from challenges.models import Problem
 
 # --- CONFIGURATION ---
@@ -24,13 +24,8 @@ class Command(BaseCommand):
             return False, "Empty code"
 
         for case in test_cases:
-            payload = {
-                "language": "python", "version": "3.10.0",
-                "files": [{"content": code}], "stdin": case['input']
-            }
             try:
-                response = requests.post('https://emkc.org/api/v2/piston/execute', json=payload)
-                result = response.json()
+                result = execute("python", code, case['input'], version="3.10.0")
                 
                 if result.get('run', {}).get('stderr'):
                      return False, f"Syntax Error: {result['run']['stderr']}"
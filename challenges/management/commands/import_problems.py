@@ -1,6 +1,11 @@
-import json
 import os
+import time
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from challenges.ingest import (
+    DATA_DIR, difficulty_of, files_for, iter_chunks, iter_problems, missing_fields, other_difficulty,
+    parallel_chunks, refresh_derived,
+)
 from challenges.models import Problem
 
 
@@ -26,47 +31,60 @@ class Command(BaseCommand):
             action='store_true',
             help='Validate JSON without importing'
         )
+        parser.add_argument(
+            '--file',
+            type=str,
+            default=None,
+            help='Import this JSON, JSON Lines or export_problems file instead of challenges/data'
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Fast path: validate in memory, bulk insert in one transaction'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Parse and validate in N processes (implies --bulk); files over 8 MB that cannot be '
+                 'split into JSON Lines parts are still streamed by the writer process'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Problems per INSERT in --bulk mode'
+        )
 
     def handle(self, *args, **kwargs):
         difficulty = kwargs['difficulty'].lower()
         limit = kwargs['limit']
         dry_run = kwargs['dry_run']
 
-        # Map difficulty names to codes
-        difficulty_map = {
-            'beginner': 'BEG',
-            'intermediate': 'INT',
-            'advanced': 'ADV',
-            'pro': 'PRO',
-            'all': None
-        }
-
-        if difficulty not in difficulty_map:
+        files_to_import = files_for(difficulty)
+        if files_to_import is None:
             self.stdout.write(self.style.ERROR(
                 f'Invalid difficulty: {difficulty}. Use: beginner, intermediate, advanced, pro, or all'
             ))
             return
 
-        # Get data directory path
-        data_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
-        data_dir = os.path.normpath(data_dir)
+        data_dir = DATA_DIR
+        if kwargs['file']:
+            # with 'all', every entry must name its difficulty, as export dumps do
+            default_code = files_to_import[0][1] if len(files_to_import) == 1 else None
+            data_dir, filename = os.path.split(os.path.abspath(kwargs['file']))
+            files_to_import = [(filename, default_code)]
+            if default_code is None:
+                self.stdout.write(self.style.WARNING('Importing with all: entries without a difficulty are skipped'))
 
         if not os.path.exists(data_dir):
             self.stdout.write(self.style.ERROR(f'Data directory not found: {data_dir}'))
             return
 
-        # Determine which files to import
-        if difficulty == 'all':
-            files_to_import = [
-                ('problems_beginner.json', 'BEG'),
-                ('problems_intermediate.json', 'INT'),
-                ('problems_advanced.json', 'ADV'),
-                ('problems_pro.json', 'PRO'),
-            ]
-        else:
-            files_to_import = [
-                (f'problems_{difficulty}.json', difficulty_map[difficulty])
-            ]
+        if kwargs['bulk'] or kwargs['workers'] > 1:
+            return self.bulk_import(
+                data_dir, files_to_import, limit, dry_run, kwargs['batch_size'], kwargs['workers']
+            )
 
         total_imported = 0
         total_skipped = 0
@@ -81,76 +99,189 @@ class Command(BaseCommand):
 
             self.stdout.write(f'\n📂 Processing: {filename}')
 
+            # Streamed: --limit stops reading, rows before a syntax error are kept
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    problems_data = json.load(f)
-            except json.JSONDecodeError as e:
+                for idx, problem in enumerate(iter_problems(filepath, limit=limit)):
+                    # Validate required fields
+                    missing = missing_fields(problem)
+                
+                    if missing:
+                        self.stdout.write(self.style.WARNING(
+                            f'  ⚠️ Problem {idx+1}: Missing fields: {missing} - skipping'
+                        ))
+                        total_errors += 1
+                        continue
+                    if other_difficulty(problem, diff_code):
+                        continue
+                    code = difficulty_of(problem, diff_code)
+                    if code is None:
+                        self.stdout.write(self.style.WARNING(
+                            f'  ⚠️ Problem {idx+1}: No valid difficulty - skipping'
+                        ))
+                        total_errors += 1
+                        continue
+
+                    # Check for duplicate title
+                    if Problem.objects.filter(title=problem['title']).exists():
+                        self.stdout.write(self.style.WARNING(
+                            f'  ⏭️ Duplicate: "{problem["title"][:40]}..." - skipping'
+                        ))
+                        total_skipped += 1
+                        continue
+
+                    if dry_run:
+                        self.stdout.write(self.style.SUCCESS(
+                            f'  ✓ Valid: "{problem["title"][:50]}..."'
+                        ))
+                        total_imported += 1
+                        continue
+
+                    # Create the problem
+                    try:
+                        Problem.objects.create(
+                            title=problem['title'],
+                            description=problem['description'],
+                            difficulty=code,
+                            real_life_context=problem.get('real_life_context', ''),
+                            explanation=problem.get('explanation', ''),
+                            starter_code=problem.get('starter_code', {}),
+                            solutions=problem.get('solutions', {}),
+                            test_cases=problem.get('test_cases', []),
+                            tags=problem.get('tags', [])
+                        )
+                        total_imported += 1
+                        self.stdout.write(self.style.SUCCESS(
+                            f'  ✅ Imported: "{problem["title"][:50]}..."'
+                        ))
+                    except Exception as e:
+                        self.stdout.write(self.style.ERROR(
+                            f'  ❌ Error importing "{problem["title"][:30]}...": {e}'
+                        ))
+                        total_errors += 1
+            except ValueError as e:
                 self.stdout.write(self.style.ERROR(f'Invalid JSON in {filename}: {e}'))
                 total_errors += 1
-                continue
 
-            if not isinstance(problems_data, list):
-                self.stdout.write(self.style.ERROR(f'{filename} should contain a JSON array'))
-                total_errors += 1
-                continue
+        # Summary
+        self.stdout.write('\n' + '='*50)
+        action = 'validated' if dry_run else 'imported'
+        self.stdout.write(self.style.SUCCESS(f'✅ {total_imported} problems {action}'))
+        self.stdout.write(self.style.WARNING(f'⏭️ {total_skipped} duplicates skipped'))
+        self.stdout.write(self.style.ERROR(f'❌ {total_errors} errors'))
+        self.stdout.write('='*50)
 
-            # Apply limit if specified
-            if limit:
-                problems_data = problems_data[:limit]
+    def bulk_import(self, data_dir, files_to_import, limit, dry_run, batch_size, workers=1):
+        """
+        Load titles once, stream each file into batches of ``batch_size``
+        bulk inserts, all in one transaction. Only one batch is held in
+        memory; a file with a syntax error is rolled back as a whole.
 
-            for idx, problem in enumerate(problems_data):
-                # Validate required fields
-                required_fields = ['title', 'description', 'starter_code', 'solutions', 'test_cases']
-                missing = [f for f in required_fields if f not in problem]
-                
-                if missing:
-                    self.stdout.write(self.style.WARNING(
-                        f'  ⚠️ Problem {idx+1}: Missing fields: {missing} - skipping'
-                    ))
-                    total_errors += 1
-                    continue
+        With ``workers`` > 1, files (and parts of large JSON Lines files) are
+        parsed and validated in a process pool; this process stays the only
+        writer and takes their results in file order, so duplicate checks
+        and the inserted order match a sequential run. Large files that
+        cannot be split are streamed here, keeping memory bounded.
+        """
+        timings = {}
+        started = time.perf_counter()
 
-                # Check for duplicate title
-                if Problem.objects.filter(title=problem['title']).exists():
-                    self.stdout.write(self.style.WARNING(
-                        f'  ⏭️ Duplicate: "{problem["title"][:40]}..." - skipping'
-                    ))
-                    total_skipped += 1
-                    continue
+        # 1. Existing titles, one query
+        t = time.perf_counter()
+        seen_titles = set(Problem.objects.values_list('title', flat=True))
+        timings['load titles'] = time.perf_counter() - t
 
-                if dry_run:
-                    self.stdout.write(self.style.SUCCESS(
-                        f'  ✓ Valid: "{problem["title"][:50]}..."'
-                    ))
-                    total_imported += 1
-                    continue
+        files = []
+        for filename, diff_code in files_to_import:
+            filepath = os.path.join(data_dir, filename)
+            if not os.path.exists(filepath):
+                self.stdout.write(self.style.WARNING(f'File not found: {filename} - skipping'))
+                continue
+            files.append((filepath, diff_code))
+        if workers > 1:
+            sources = parallel_chunks(files, workers, batch_size, limit)
+        else:
+            sources = (
+                (filepath, iter_chunks(filepath, diff_code, batch_size, limit))
+                for filepath, diff_code in files
+            )
+
+        # 2. Parse, validate and insert, one savepoint per file
+        created_ids = []
+        total_new = 0
+        total_skipped = 0
+        total_errors = 0
+        batches = 0
+        timings['parse'] = timings['insert'] = 0.0
+        with transaction.atomic():
+            for filepath, chunks in sources:
+                filename = os.path.basename(filepath)
 
-                # Create the problem
+                file_started = time.perf_counter()
+                insert_time = 0.0
+                file_titles = set()
+                file_ids = []
+                batch = []
+                file_batches = valid = skipped = errors = 0
                 try:
-                    Problem.objects.create(
-                        title=problem['title'],
-                        description=problem['description'],
-                        difficulty=diff_code,
-                        real_life_context=problem.get('real_life_context', ''),
-                        explanation=problem.get('explanation', ''),
-                        starter_code=problem.get('starter_code', {}),
-                        solutions=problem.get('solutions', {}),
-                        test_cases=problem.get('test_cases', [])
-                    )
-                    total_imported += 1
-                    self.stdout.write(self.style.SUCCESS(
-                        f'  ✅ Imported: "{problem["title"][:50]}..."'
-                    ))
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(
-                        f'  ❌ Error importing "{problem["title"][:30]}...": {e}'
-                    ))
+                    with transaction.atomic():
+                        for problems, invalid in chunks:
+                            errors += invalid
+                            for problem in problems:
+                                if problem.title in seen_titles or problem.title in file_titles:
+                                    skipped += 1
+                                    continue
+                                file_titles.add(problem.title)
+                                batch.append(problem)
+                                valid += 1
+                                if len(batch) >= batch_size:
+                                    file_batches += 1
+                                    insert_time += self.insert_batch(batch, batches + file_batches, file_ids, dry_run)
+                                    batch = []
+                        if batch:
+                            file_batches += 1
+                            insert_time += self.insert_batch(batch, batches + file_batches, file_ids, dry_run)
+                except ValueError as e:  # includes json.JSONDecodeError
+                    self.stdout.write(self.style.ERROR(f'Invalid JSON in {filename}: {e}'))
                     total_errors += 1
+                    continue
+
+                timings['insert'] += insert_time
+                timings['parse'] += time.perf_counter() - file_started - insert_time
+                batches += file_batches
+                seen_titles |= file_titles
+                created_ids.extend(file_ids)
+                total_new += valid
+                total_skipped += skipped
+                total_errors += errors
+                self.stdout.write(
+                    f'📂 {filename}: {valid} new, {skipped} duplicates, {errors} invalid'
+                )
+
+            # bulk_create skips the model signals: refresh what they maintain
+            if created_ids:
+                t = time.perf_counter()
+                refresh_derived(created_ids=created_ids)
+                timings['index'] = time.perf_counter() - t
+        timings['total'] = time.perf_counter() - started
 
         # Summary
         self.stdout.write('\n' + '='*50)
         action = 'validated' if dry_run else 'imported'
-        self.stdout.write(self.style.SUCCESS(f'✅ {total_imported} problems {action}'))
+        self.stdout.write(self.style.SUCCESS(f'✅ {total_new} problems {action}'))
         self.stdout.write(self.style.WARNING(f'⏭️ {total_skipped} duplicates skipped'))
         self.stdout.write(self.style.ERROR(f'❌ {total_errors} errors'))
+        self.stdout.write('⏱️ ' + ', '.join(f'{step} {seconds:.2f}s' for step, seconds in timings.items()))
         self.stdout.write('='*50)
+
+    def insert_batch(self, batch, number, ids, dry_run):
+        """bulk_create one batch, collecting the new ids; returns the seconds taken."""
+        if dry_run:
+            return 0.0
+        t = time.perf_counter()
+        Problem.objects.bulk_create(batch)
+        ids.extend(problem.pk for problem in batch)
+        elapsed = time.perf_counter() - t
+        self.stdout.write(self.style.SUCCESS(
+            f'  📦 Batch {number}: {len(batch)} problems inserted ({elapsed:.2f}s)'
+        ))
+        return elapsed
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from challenges.leaderboard import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Credit missing ledger points and recompute every UserScore'
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("📋 Rebuilding the points ledger and leaderboard...")
+        with transaction.atomic():
+            credited, users = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'✅ {credited} missing ledger entries credited'))
+        self.stdout.write(self.style.SUCCESS(f'🏆 Scores recomputed for {users} users'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from challenges.models import Problem
+from challenges.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text problem search index'
+
+    def handle(self, *args, **kwargs):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'🔎 Search index rebuilt for {Problem.objects.count()} problems'))
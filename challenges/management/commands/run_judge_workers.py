@@ -0,0 +1,36 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from challenges.jobs import work_forever
+
+
+class Command(BaseCommand):
+    help = 'Run judge workers that drain the asynchronous judge queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of worker threads'
+        )
+
+    def handle(self, *args, **kwargs):
+        workers = kwargs['workers']
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=work_forever, args=(stop,), name=f'judge-worker-{n}', daemon=True)
+            for n in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        self.stdout.write(self.style.SUCCESS(f'⚙️ {workers} judge workers running (Ctrl+C to stop)'))
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            stop.set()
+            self.stdout.write('\n🛑 Stopping judge workers...')
@@ -0,0 +1,156 @@
+"""
+Bring the Problem table in line with the data files.
+
+Each Problem stores a hash of its content (``Problem.content_hash``). The
+sync hashes every file entry, reads ``(title, id, content_hash)`` for the
+existing rows in one query and only writes what differs: new titles are
+bulk inserted, changed ones bulk updated and, with ``--prune``, rows of
+the synced difficulties that are no longer in the files are deleted. An
+unchanged catalogue costs that one scan and no writes.
+"""
+import os
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from challenges.ingest import DATA_DIR, build_problem, files_for, iter_problems, missing_fields, refresh_derived
+from challenges.models import Problem
+
+
+class Command(BaseCommand):
+    help = 'Upsert problems from the JSON files, writing only rows whose content changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'difficulty',
+            type=str,
+            nargs='?',
+            default='all',
+            help='Difficulty level to sync: beginner, intermediate, advanced, pro, or all'
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete problems of the synced difficulties that are missing from the files'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the diff without writing'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Problems per INSERT/UPDATE'
+        )
+
+    def handle(self, *args, **kwargs):
+        difficulty = kwargs['difficulty'].lower()
+        dry_run = kwargs['dry_run']
+        batch_size = kwargs['batch_size']
+
+        files_to_sync = files_for(difficulty)
+        if files_to_sync is None:
+            self.stdout.write(self.style.ERROR(
+                f'Invalid difficulty: {difficulty}. Use: beginner, intermediate, advanced, pro, or all'
+            ))
+            return
+
+        # 1. Desired state, keyed by title (the first entry of a title wins)
+        desired = {}
+        total_errors = 0
+        synced_codes = []
+        for filename, diff_code in files_to_sync:
+            filepath = os.path.join(DATA_DIR, filename)
+            if not os.path.exists(filepath):
+                self.stdout.write(self.style.WARNING(f'File not found: {filename} - skipping'))
+                continue
+            file_problems = {}
+            file_errors = 0
+            try:
+                for problem in iter_problems(filepath):
+                    if missing_fields(problem):
+                        file_errors += 1
+                    elif problem['title'] not in desired:
+                        file_problems.setdefault(problem['title'], build_problem(problem, diff_code))
+            except ValueError as e:
+                # leave the whole file out, so --prune cannot drop its rows
+                self.stdout.write(self.style.ERROR(f'Invalid JSON in {filename}: {e}'))
+                total_errors += 1
+                continue
+            synced_codes.append(diff_code)
+            desired.update(file_problems)
+            total_errors += file_errors
+
+        # 2. One scan of the existing hashes
+        existing = {
+            title: (pk, content_hash)
+            for title, pk, content_hash in Problem.objects.values_list('title', 'id', 'content_hash')
+        }
+
+        added, changed, unchanged = [], [], 0
+        for title, problem in desired.items():
+            if title not in existing:
+                added.append(problem)
+                continue
+            pk, content_hash = existing[title]
+            if content_hash == problem.content_hash:
+                unchanged += 1
+                continue
+            problem.pk = pk
+            changed.append(problem)
+
+        removed = []
+        if kwargs['prune'] and synced_codes:
+            removed = list(
+                Problem.objects.filter(difficulty__in=synced_codes)
+                .exclude(title__in=desired.keys())
+                .values_list('id', 'title')
+            )
+
+        # Which fields changed, read only for the rows being updated
+        changed_fields = {}
+        if changed:
+            old_rows = Problem.objects.filter(id__in=[p.pk for p in changed]).values('id', *Problem.CONTENT_FIELDS)
+            old_by_id = {row['id']: row for row in old_rows}
+            for problem in changed:
+                old = old_by_id[problem.pk]
+                changed_fields[problem.pk] = [
+                    field for field in Problem.CONTENT_FIELDS
+                    if getattr(problem, field) != old[field]
+                ]
+
+        # 3. Write only the difference, in one transaction
+        if not dry_run and (added or changed or removed):
+            with transaction.atomic():
+                Problem.objects.bulk_create(added, batch_size=batch_size)
+                Problem.objects.bulk_update(
+                    changed, Problem.CONTENT_FIELDS + ['content_hash'], batch_size=batch_size
+                )
+                if removed:
+                    # a real delete(), so the signals clean up search, verdicts and points
+                    Problem.objects.filter(id__in=[pk for pk, _title in removed]).delete()
+                # bulk writes skip the model signals: refresh what they maintain
+                refresh_derived(
+                    created_ids=[problem.pk for problem in added],
+                    updated_ids=[problem.pk for problem in changed],
+                )
+
+        # Summary
+        self.stdout.write('\n' + '='*50)
+        if dry_run:
+            self.stdout.write('🔎 Dry run - nothing written')
+        self.stdout.write(self.style.SUCCESS(f'➕ {len(added)} added'))
+        for problem in added[:20]:
+            self.stdout.write(f'    + {problem.title}')
+        self.stdout.write(self.style.WARNING(f'✏️ {len(changed)} updated'))
+        for problem in changed[:20]:
+            self.stdout.write(f"    ~ {problem.title} ({', '.join(changed_fields[problem.pk]) or 'hash'})")
+        self.stdout.write(f'⏸️ {unchanged} unchanged')
+        if kwargs['prune']:
+            self.stdout.write(self.style.ERROR(f'➖ {len(removed)} removed'))
+            for _pk, title in removed[:20]:
+                self.stdout.write(f'    - {title}')
+        self.stdout.write(self.style.ERROR(f'❌ {total_errors} errors'))
+        self.stdout.write('='*50)
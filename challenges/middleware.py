@@ -0,0 +1,116 @@
+"""
+Content-negotiated response compression.
+
+Works like Django's GZipMiddleware, but picks the best encoding the client
+accepts among zstd and brotli (when their modules are installed) and gzip.
+Small, streaming and already-encoded responses are left alone, so the SSE
+stream and the pre-compressed catalogue snapshots pass straight through.
+
+Configured with ``settings.COMPRESSION``.
+"""
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _gzip(data, level):
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _brotli(data, level):
+    return brotli.compress(data, quality=level)
+
+
+def _zstd(data, level):
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+# Encodings this process can produce
+COMPRESSORS = {'gzip': _gzip}
+if brotli is not None:
+    COMPRESSORS['br'] = _brotli
+if zstandard is not None:
+    COMPRESSORS['zstd'] = _zstd
+
+
+def parse_accept_encoding(header):
+    """{'gzip': 1.0, 'br': 0.5, ...} from an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header, preference):
+    """Best available encoding the client accepts, or None."""
+    accepted = parse_accept_encoding(header)
+    candidates = []
+    for rank, name in enumerate(preference):
+        if name not in COMPRESSORS:
+            continue
+        q = accepted.get(name, accepted.get('*', 0.0))
+        if q > 0:
+            candidates.append((q, -rank, name))
+    return max(candidates)[2] if candidates else None
+
+
+def compress(data, encoding, levels=None):
+    level = (levels or settings.COMPRESSION['LEVELS'])[encoding]
+    return COMPRESSORS[encoding](data, level)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress response bodies above ``COMPRESSION['MIN_SIZE']`` bytes."""
+
+    skip_content_types = ('text/event-stream',)
+
+    def process_response(self, request, response):
+        options = settings.COMPRESSION
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < options['MIN_SIZE']
+            or response.get('Content-Type', '').startswith(self.skip_content_types)
+            or 'no-transform' in response.get('Cache-Control', '')
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), options['ENCODINGS'])
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding, options['LEVELS'])
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The encoded bytes differ, so a strong ETag must become weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
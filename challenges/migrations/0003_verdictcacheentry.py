@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0002_rename_submitted_at_submission_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VerdictCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('test_set_hash', models.CharField(max_length=64)),
+                ('language', models.CharField(max_length=50)),
+                ('results', models.JSONField(default=list)),
+                ('all_passed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='challenges.problem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['problem', 'test_set_hash'], name='challenges__problem_deb1a0_idx'), models.Index(fields=['created_at'], name='challenges__created_499f62_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:38
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0003_verdictcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JudgeJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('owner', models.CharField(max_length=150)),
+                ('clerk_id', models.CharField(blank=True, max_length=150)),
+                ('email', models.CharField(blank=True, max_length=254)),
+                ('code', models.TextField()),
+                ('language', models.CharField(max_length=50)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('error', 'Error')], default='queued', max_length=10)),
+                ('verdict', models.CharField(blank=True, max_length=20)),
+                ('results', models.JSONField(default=list)),
+                ('points', models.IntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='challenges.problem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='challenges__status_77800b_idx'), models.Index(fields=['owner', 'status'], name='challenges__owner_2e2a40_idx')],
+            },
+        ),
+    ]
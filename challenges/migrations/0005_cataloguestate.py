@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:44
+
+from django.db import migrations, models
+
+
+def create_state(apps, schema_editor):
+    CatalogueState = apps.get_model('challenges', 'CatalogueState')
+    CatalogueState.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0004_judgejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogueState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_state, migrations.RunPython.noop),
+    ]
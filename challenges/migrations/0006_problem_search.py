@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:49
+
+from django.db import migrations, models
+
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE challenges_problem_fts USING fts5("
+    "title, tags, real_life_context, description, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "INSERT INTO challenges_problem_fts (rowid, title, tags, real_life_context, description) "
+    "SELECT id, title, tags, coalesce(real_life_context, ''), description FROM challenges_problem",
+]
+SQLITE_BACKWARD = ["DROP TABLE IF EXISTS challenges_problem_fts"]
+
+PG_FORWARD = [
+    "ALTER TABLE challenges_problem ADD COLUMN search_vector tsvector",
+    "UPDATE challenges_problem SET search_vector = "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(tags::text, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(real_life_context, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'D')",
+    "CREATE INDEX challenges_problem_search_gin ON challenges_problem USING GIN (search_vector)",
+]
+PG_BACKWARD = [
+    "DROP INDEX IF EXISTS challenges_problem_search_gin",
+    "ALTER TABLE challenges_problem DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def run(statements):
+    """Run the statements for the current database vendor (see challenges/search.py)."""
+    def operation(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, []):
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0005_cataloguestate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='tags',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD, 'postgresql': PG_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD, 'postgresql': PG_BACKWARD}),
+        ),
+    ]
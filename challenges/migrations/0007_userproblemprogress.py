@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery
+
+
+def backfill_progress(apps, schema_editor):
+    """Rows for problems solved before this table existed (as backfill_progress does)."""
+    Submission = apps.get_model('challenges', 'Submission')
+    UserProblemProgress = apps.get_model('challenges', 'UserProblemProgress')
+    passed = Submission.objects.filter(status="Passed")
+    latest_language = (
+        passed.filter(user=OuterRef('user'), problem=OuterRef('problem'))
+        .order_by('-created_at', '-id')
+        .values('language')[:1]
+    )
+    solved = (
+        passed.values('user', 'problem')
+        .annotate(
+            first_solved_at=Min('created_at'),
+            attempts=Count('id'),
+            best_language=Subquery(latest_language),
+        )
+        .order_by('user', 'problem')
+    )
+    UserProblemProgress.objects.bulk_create([
+        UserProblemProgress(
+            user_id=row['user'],
+            problem_id=row['problem'],
+            first_solved_at=row['first_solved_at'],
+            best_language=row['best_language'],
+            attempts=row['attempts'],
+        )
+        for row in solved.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0006_problem_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProblemProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_solved_at', models.DateTimeField()),
+                ('best_language', models.CharField(max_length=50)),
+                ('attempts', models.PositiveIntegerField(default=1)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='challenges.problem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'problem'), name='unique_user_problem_progress')],
+            },
+        ),
+        migrations.RunPython(backfill_progress, migrations.RunPython.noop),
+    ]
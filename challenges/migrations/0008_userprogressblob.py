@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_blobs(apps, schema_editor):
+    """Bitsets for progress recorded before blobs existed."""
+    UserProblemProgress = apps.get_model('challenges', 'UserProblemProgress')
+    UserProgressBlob = apps.get_model('challenges', 'UserProgressBlob')
+    solved = {}
+    for user_id, problem_id in UserProblemProgress.objects.values_list('user_id', 'problem_id'):
+        solved[user_id] = solved.get(user_id, 0) | 1 << problem_id
+    UserProgressBlob.objects.bulk_create([
+        UserProgressBlob(
+            user_id=user_id,
+            bits=value.to_bytes((value.bit_length() + 7) // 8, 'little'),
+            solved_count=value.bit_count(),
+        )
+        for user_id, value in solved.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('challenges', '0007_userproblemprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProgressBlob',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('bits', models.BinaryField(default=b'')),
+                ('solved_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_blobs, migrations.RunPython.noop),
+    ]
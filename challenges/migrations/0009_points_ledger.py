@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Points per difficulty when this migration was written
+POINTS_MAP = {'BEG': 10, 'INT': 20, 'ADV': 35, 'PRO': 50}
+
+
+def credit_existing_progress(apps, schema_editor):
+    """Ledger entries and scores for problems solved before the ledger existed."""
+    UserProblemProgress = apps.get_model('challenges', 'UserProblemProgress')
+    PointsLedgerEntry = apps.get_model('challenges', 'PointsLedgerEntry')
+    UserScore = apps.get_model('challenges', 'UserScore')
+
+    scores = {}
+    entries = []
+    for progress in UserProblemProgress.objects.select_related('problem'):
+        points = POINTS_MAP.get(progress.problem.difficulty, 10)
+        entries.append(PointsLedgerEntry(
+            user_id=progress.user_id, problem_id=progress.problem_id,
+            points=points, awarded_at=progress.first_solved_at,
+        ))
+        score = scores.setdefault(progress.user_id, UserScore(
+            user_id=progress.user_id, updated_at=progress.first_solved_at,
+        ))
+        score.score += points
+        score.solved += 1
+        score.updated_at = max(score.updated_at, progress.first_solved_at)
+    PointsLedgerEntry.objects.bulk_create(entries, batch_size=1000)
+    UserScore.objects.bulk_create(scores.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('challenges', '0008_userprogressblob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserScore',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('score', models.IntegerField(default=0)),
+                ('solved', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score', 'updated_at'], name='userscore_rank_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PointsLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.IntegerField()),
+                ('awarded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('problem', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='challenges.problem')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'problem'), name='unique_user_problem_points')],
+            },
+        ),
+        migrations.RunPython(credit_existing_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0010_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeBlob',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='code_blob',
+            field=models.ForeignKey(db_column='code_hash', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='submissions', to='challenges.codeblob'),
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='code',
+            field=models.TextField(default=''),
+        ),
+    ]
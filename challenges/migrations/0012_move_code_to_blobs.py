@@ -0,0 +1,58 @@
+import hashlib
+import zlib
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def move_code_to_blobs(apps, schema_editor):
+    """Store each distinct source once and point submissions at it."""
+    Submission = apps.get_model('challenges', 'Submission')
+    CodeBlob = apps.get_model('challenges', 'CodeBlob')
+
+    batch = []
+    known = set()
+
+    def flush():
+        blobs = {}
+        for submission in batch:
+            raw = (submission.code or '').encode('utf-8')
+            digest = hashlib.sha256(raw).hexdigest()
+            submission.code_blob_id = digest
+            if digest not in known:
+                known.add(digest)
+                blobs[digest] = CodeBlob(hash=digest, data=zlib.compress(raw, 6), size=len(raw))
+        CodeBlob.objects.bulk_create(blobs.values(), ignore_conflicts=True)
+        Submission.objects.bulk_update(batch, ['code_blob'])
+        batch.clear()
+
+    for submission in Submission.objects.only('id', 'code').iterator(chunk_size=BATCH_SIZE):
+        batch.append(submission)
+        if len(batch) >= BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+
+
+def restore_code(apps, schema_editor):
+    Submission = apps.get_model('challenges', 'Submission')
+    batch = []
+    for submission in Submission.objects.select_related('code_blob').iterator(chunk_size=BATCH_SIZE):
+        submission.code = zlib.decompress(bytes(submission.code_blob.data)).decode('utf-8')
+        batch.append(submission)
+        if len(batch) >= BATCH_SIZE:
+            Submission.objects.bulk_update(batch, ['code'])
+            batch.clear()
+    Submission.objects.bulk_update(batch, ['code'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0011_codeblob'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_code_to_blobs, restore_code),
+    ]
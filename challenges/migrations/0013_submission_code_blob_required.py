@@ -0,0 +1,21 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0012_move_code_to_blobs'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='submission',
+            name='code',
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='code_blob',
+            field=models.ForeignKey(db_column='code_hash', on_delete=django.db.models.deletion.PROTECT, related_name='submissions', to='challenges.codeblob'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:57
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+# Problem.CONTENT_FIELDS / compute_content_hash() when this migration was written
+CONTENT_FIELDS = [
+    'description', 'difficulty', 'real_life_context', 'explanation',
+    'starter_code', 'solutions', 'test_cases', 'tags',
+]
+
+
+def fill_content_hashes(apps, schema_editor):
+    Problem = apps.get_model('challenges', 'Problem')
+    problems = list(Problem.objects.only('id', *CONTENT_FIELDS))
+    for problem in problems:
+        content = {field: getattr(problem, field) for field in CONTENT_FIELDS}
+        payload = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        problem.content_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    Problem.objects.bulk_update(problems, ['content_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('challenges', '0013_submission_code_blob_required'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(fill_content_hashes, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,10 @@
+import hashlib
+import json
+import uuid
+import zlib
+
 from django.db import models
+from django.utils import timezone
 
 class Problem(models.Model):
     DIFFICULTY_CHOICES = [
@@ -20,17 +26,253 @@ class Problem(models.Model):
     # Stores correct solution for: python, c, cpp, java
     solutions = models.JSONField(default=dict)
     
-    # Stores input/output cases
+    # Stores input/output cases. A case may carry "sample": true or
+    # "hidden": true; unmarked problems use their first few cases as samples.
     test_cases = models.JSONField(default=list)
 
+    # Topic tags, e.g. ["arrays", "two-pointers"]; searchable
+    tags = models.JSONField(default=list, blank=True)
+
+    # SHA-256 of CONTENT_FIELDS, so sync_problems can skip unchanged rows
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+
+    DEFAULT_SAMPLE_COUNT = 2
+    CONTENT_FIELDS = [
+        'description', 'difficulty', 'real_life_context', 'explanation',
+        'starter_code', 'solutions', 'test_cases', 'tags',
+    ]
+
+    class Meta:
+        indexes = [
+            # Catalogue: ?difficulty= filter, paginated by id
+            models.Index(fields=['difficulty', 'id'], name='problem_difficulty_idx'),
+        ]
+
     def __str__(self):
         return f"[{self.difficulty}] {self.title}"
 
+    def compute_content_hash(self):
+        content = {field: getattr(self, field) for field in self.CONTENT_FIELDS}
+        payload = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.compute_content_hash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content_hash' not in update_fields:
+            kwargs['update_fields'] = [*update_fields, 'content_hash']
+        super().save(*args, **kwargs)
+
+    @property
+    def sample_cases(self):
+        """Cases used by "Run samples" (mode=run); hidden ones are submit-only."""
+        cases = self.test_cases or []
+        if any(case.get('sample') for case in cases):
+            return [case for case in cases if case.get('sample')]
+        if any(case.get('hidden') for case in cases):
+            return [case for case in cases if not case.get('hidden')]
+        return cases[:self.DEFAULT_SAMPLE_COUNT]
+
+class CatalogueState(models.Model):
+    """
+    Single row holding the problem catalogue version. It is bumped whenever
+    problems change, so every worker can tell its cached snapshot is stale.
+    """
+    version = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Catalogue v{self.version}"
+
+class CodeBlob(models.Model):
+    """
+    Submitted source code, stored once per distinct text: keyed by the
+    SHA-256 of the exact source and zlib-compressed.
+    """
+    hash = models.CharField(max_length=64, primary_key=True)
+    data = models.BinaryField()
+    size = models.PositiveIntegerField()  # Uncompressed length in bytes
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @staticmethod
+    def hash_code(code):
+        return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def store(cls, code):
+        """Save ``code`` unless an identical blob exists; returns its hash."""
+        raw = code.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        # INSERT ... ON CONFLICT DO NOTHING: safe when workers race on the same code
+        cls.objects.bulk_create(
+            [cls(hash=digest, data=zlib.compress(raw, 6), size=len(raw))], ignore_conflicts=True
+        )
+        return digest
+
+    @property
+    def text(self):
+        return zlib.decompress(bytes(self.data)).decode('utf-8')
+
+    def __str__(self):
+        return f"{self.hash[:12]} ({self.size} bytes)"
+
 class Submission(models.Model):
     from django.contrib.auth.models import User
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
-    code = models.TextField()
+    # Source lives in CodeBlob; read and assign it through ``code``
+    code_blob = models.ForeignKey(CodeBlob, on_delete=models.PROTECT, db_column='code_hash', related_name='submissions')
     language = models.CharField(max_length=50)
     status = models.CharField(max_length=50)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'status'], name='submission_user_status_idx'),
+            models.Index(fields=['problem', 'status'], name='submission_problem_status_idx'),
+            # Only accepted solutions: per-user/problem history and progress backfills
+            models.Index(
+                fields=['user', 'problem', 'created_at'],
+                condition=models.Q(status='Passed'),
+                name='submission_passed_idx',
+            ),
+            models.Index(fields=['-created_at'], name='submission_created_idx'),
+        ]
+
+    @property
+    def code(self):
+        if getattr(self, '_pending_code', None) is not None:
+            return self._pending_code
+        return self.code_blob.text
+
+    @code.setter
+    def code(self, value):
+        # The blob is written on save(); identical code shares one blob
+        self._pending_code = value or ''
+        self.code_blob_id = CodeBlob.hash_code(self._pending_code)
+
+    def save(self, *args, **kwargs):
+        if getattr(self, '_pending_code', None) is not None:
+            CodeBlob.store(self._pending_code)
+        super().save(*args, **kwargs)
+
+class UserProblemProgress(models.Model):
+    """
+    One row per problem a user has solved, kept in step with their passed
+    submissions so progress lookups never scan the submission history.
+    """
+    from django.contrib.auth.models import User
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
+    first_solved_at = models.DateTimeField()
+    best_language = models.CharField(max_length=50)  # Language of the latest accepted solution
+    attempts = models.PositiveIntegerField(default=1)  # Accepted submissions so far
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'problem'], name='unique_user_problem_progress'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} solved {self.problem_id}"
+
+class UserProgressBlob(models.Model):
+    """
+    A user's solved problems as a bitset over problem ids (see
+    ``challenges.progress``), maintained alongside UserProblemProgress.
+    """
+    from django.contrib.auth.models import User
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    bits = models.BinaryField(default=b'')
+    solved_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user}: {self.solved_count} solved"
+
+class PointsLedgerEntry(models.Model):
+    """Points credited for a solved problem; at most once per (user, problem)."""
+    from django.contrib.auth.models import User
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
+    points = models.IntegerField()
+    awarded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'problem'], name='unique_user_problem_points'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} +{self.points} for {self.problem_id}"
+
+class UserScore(models.Model):
+    """Materialized ledger total per user, indexed for leaderboard ranks."""
+    from django.contrib.auth.models import User
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    score = models.IntegerField(default=0)
+    solved = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)  # When the score last changed (tie-breaker)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score', 'updated_at'], name='userscore_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user}: {self.score}"
+
+class VerdictCacheEntry(models.Model):
+    """Stored judge results for the 'database' verdict cache backend."""
+    key = models.CharField(max_length=64, unique=True)
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
+    test_set_hash = models.CharField(max_length=64)
+    language = models.CharField(max_length=50)
+    results = models.JSONField(default=list)
+    all_passed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['problem', 'test_set_hash']),
+            models.Index(fields=['created_at']),
+        ]
+
+
+class JudgeJob(models.Model):
+    """A submission waiting in (or drained from) the asynchronous judge queue."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    ERROR = 'error'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (ERROR, 'Error'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
+    owner = models.CharField(max_length=150)  # user-<pk>, or client IP for anonymous users
+    clerk_id = models.CharField(max_length=150, blank=True)
+    email = models.CharField(max_length=254, blank=True)
+    code = models.TextField()
+    language = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    verdict = models.CharField(max_length=20, blank=True)  # "Success" / "Failed"
+    results = models.JSONField(default=list)
+    points = models.IntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['owner', 'status']),
+        ]
+
+    def __str__(self):
+        return f"{self.id} [{self.status}] {self.problem_id}"
@@ -0,0 +1,146 @@
+"""
+Compact encodings of a user's solved problems.
+
+Every user with progress has a UserProgressBlob: a bitset over problem ids
+where problem ``n`` is bit ``n % 8`` (least significant first) of byte
+``n // 8``. ``save_pass()`` and the UserProblemProgress delete signal keep
+it in step with UserProblemProgress, so ``/api/progress/?encoding=`` can
+answer from one stored row instead of building the list of ids:
+
+* ``bitset``: the blob, base64-encoded;
+* ``ranges``: inclusive ``[first, last]`` runs of solved ids.
+
+Both carry the catalogue version they were produced against, so the
+client can match them with its copy of ``/api/problems/``.
+"""
+import base64
+from collections import defaultdict
+
+from django.utils import timezone
+
+from .catalogue import current_state
+from .conditional import make_etag
+from .models import UserProblemProgress, UserProgressBlob
+
+IDS = 'ids'
+BITSET = 'bitset'
+RANGES = 'ranges'
+ENCODINGS = (IDS, BITSET, RANGES)
+
+
+def set_bit(bits, n):
+    bits = bytearray(bits or b'')
+    if len(bits) <= n // 8:
+        bits.extend(bytes(n // 8 + 1 - len(bits)))
+    bits[n // 8] |= 1 << (n % 8)
+    return bytes(bits)
+
+
+def clear_bit(bits, n):
+    bits = bytearray(bits or b'')
+    if n // 8 < len(bits):
+        bits[n // 8] &= ~(1 << (n % 8)) & 0xFF
+    return bytes(bits.rstrip(b'\0'))
+
+
+def bits_from_ids(ids):
+    value = 0
+    for n in ids:
+        value |= 1 << n
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+
+def ids_from_bits(bits):
+    return [
+        index * 8 + bit
+        for index, byte in enumerate(bits or b'') if byte
+        for bit in range(8) if byte >> bit & 1
+    ]
+
+
+def count_bits(bits):
+    return int.from_bytes(bits or b'', 'little').bit_count()
+
+
+def ranges_from_bits(bits):
+    ranges = []
+    for n in ids_from_bits(bits):
+        if ranges and ranges[-1][1] == n - 1:
+            ranges[-1][1] = n
+        else:
+            ranges.append([n, n])
+    return ranges
+
+
+def encode(bits, encoding):
+    """``completed`` payload for the requested encoding."""
+    if encoding == BITSET:
+        return base64.b64encode(bits).decode('ascii')
+    if encoding == RANGES:
+        return ranges_from_bits(bits)
+    return ids_from_bits(bits)
+
+
+def mark_solved(user, problem_id):
+    """Set the problem's bit; call inside the transaction saving the pass."""
+    blob, _created = UserProgressBlob.objects.select_for_update().get_or_create(user=user)
+    blob.bits = set_bit(bytes(blob.bits), problem_id)
+    blob.solved_count = count_bits(blob.bits)
+    blob.save()
+
+
+def mark_unsolved(user_id, problem_id):
+    blob = UserProgressBlob.objects.select_for_update().filter(user_id=user_id).first()
+    if blob is not None:
+        bits = clear_bit(bytes(blob.bits), problem_id)
+        # update(), not save(): never re-create a blob a cascade just deleted
+        UserProgressBlob.objects.filter(pk=blob.pk).update(
+            bits=bits, solved_count=count_bits(bits), updated_at=timezone.now()
+        )
+
+
+def rebuild_blobs():
+    """Recompute every blob from UserProblemProgress. Returns the user count."""
+    solved = defaultdict(list)
+    for user_id, problem_id in UserProblemProgress.objects.values_list('user_id', 'problem_id').iterator():
+        solved[user_id].append(problem_id)
+
+    blobs = []
+    for user_id, problem_ids in solved.items():
+        bits = bits_from_ids(problem_ids)
+        blobs.append(UserProgressBlob(user_id=user_id, bits=bits, solved_count=count_bits(bits)))
+    UserProgressBlob.objects.exclude(user_id__in=solved.keys()).delete()
+    UserProgressBlob.objects.bulk_create(
+        blobs,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['bits', 'solved_count', 'updated_at'],
+    )
+    return len(blobs)
+
+
+def progress_blob(clerk_id):
+    """(bits, solved_count, updated_at) for the user; empty if none."""
+    blob = (
+        UserProgressBlob.objects.filter(user__username=clerk_id)
+        .values_list('bits', 'solved_count', 'updated_at')
+        .first()
+    )
+    if blob is None:
+        return b'', 0, None
+    return bytes(blob[0]), blob[1], blob[2]
+
+
+def compact_progress(clerk_id, encoding):
+    """(payload, etag, last_modified) of a ``bitset``/``ranges`` response."""
+    bits, count, updated_at = progress_blob(clerk_id) if clerk_id else (b'', 0, None)
+    catalogue_version = current_state()[0]
+    stamp = int(updated_at.timestamp() * 1000000) if updated_at else 0
+    payload = {
+        "encoding": encoding,
+        "catalogue_version": catalogue_version,
+        "count": count,
+        "completed": encode(bits, encoding),
+    }
+    return payload, make_etag('progress', encoding, count, stamp, catalogue_version), updated_at
@@ -0,0 +1,40 @@
+"""
+Fast JSON renderer and parser for DRF, backed by orjson.
+
+Enabled through ``REST_FRAMEWORK`` in settings (``FAST_JSON``). Both
+classes fall back to DRF's stdlib implementation when orjson is not
+installed, or when the browsable API asks for indented output.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Same output as JSONRenderer (compact, UTF-8), several times faster."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        # Decimals, lazy translations etc. go through DRF's encoder
+        return orjson.dumps(data, default=JSONEncoder().default)
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,139 @@
+"""
+Full-text problem search.
+
+The index covers title, tags, real-life context and description, and
+lives in the database next to the problems:
+
+* SQLite: the ``challenges_problem_fts`` FTS5 table (rowid = problem id),
+  ranked with bm25 and with prefix indexes for type-ahead queries.
+* PostgreSQL: a ``search_vector`` tsvector column on ``challenges_problem``
+  with a GIN index, ranked with ts_rank_cd.
+
+Both are created by migration 0006. ``Problem`` save/delete signals keep
+the index current; bulk writes that skip signals must call
+``index_problems()`` (or ``rebuild_index()``) themselves. Other database
+backends fall back to a plain ``icontains`` scan.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'challenges_problem_fts'
+
+# Relative weight of each FTS5 column, in table order
+FTS_WEIGHTS = (10.0, 5.0, 2.0, 1.0)  # title, tags, real_life_context, description
+
+FTS_COLUMNS = "rowid, title, tags, real_life_context, description"
+FTS_SOURCE = "id, title, tags, coalesce(real_life_context, ''), description"
+
+PG_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(tags::text, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(real_life_context, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+)
+
+MAX_TERMS = 10
+
+
+def search_terms(query):
+    """Lower-cased word tokens of a user query (punctuation dropped)."""
+    return re.findall(r'\w+', (query or '').lower())[:MAX_TERMS]
+
+
+def fts_query(terms):
+    """FTS5 MATCH expression: every term, each as a prefix."""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def pg_query(terms):
+    """to_tsquery expression: every term, each as a prefix."""
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _in_clause(ids):
+    return ', '.join(['%s'] * len(ids))
+
+
+def index_problems(ids):
+    """(Re)index the given problem ids."""
+    ids = list(ids)
+    if not ids:
+        return
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({_in_clause(ids)})", ids)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} ({FTS_COLUMNS}) "
+                f"SELECT {FTS_SOURCE} FROM challenges_problem WHERE id IN ({_in_clause(ids)})",
+                ids,
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute(
+                f"UPDATE challenges_problem SET search_vector = {PG_VECTOR} WHERE id IN ({_in_clause(ids)})",
+                ids,
+            )
+
+
+def remove_problems(ids):
+    """Drop deleted problems from the index (Postgres rows go with the problem)."""
+    ids = list(ids)
+    if ids and connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({_in_clause(ids)})", ids)
+
+
+def rebuild_index():
+    """Reindex every problem."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_COLUMNS}) SELECT {FTS_SOURCE} FROM challenges_problem")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"UPDATE challenges_problem SET search_vector = {PG_VECTOR}")
+
+
+def search_ids(query, difficulty=None, limit=20, offset=0):
+    """Ids of matching problems, best match first."""
+    from .models import Problem
+
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if connection.vendor == 'sqlite':
+        sql = (
+            f"SELECT p.id FROM {FTS_TABLE} f JOIN challenges_problem p ON p.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s"
+        )
+        params = [fts_query(terms)]
+        order = f"bm25({FTS_TABLE}, {', '.join(str(w) for w in FTS_WEIGHTS)}), p.id"
+    elif connection.vendor == 'postgresql':
+        sql = "SELECT p.id FROM challenges_problem p WHERE p.search_vector @@ to_tsquery('english', %s)"
+        params = [pg_query(terms)]
+        order = "ts_rank_cd(p.search_vector, to_tsquery('english', %s)) DESC, p.id"
+    else:
+        match = Q()
+        for term in terms:
+            match &= (Q(title__icontains=term) | Q(description__icontains=term)
+                      | Q(real_life_context__icontains=term) | Q(tags__icontains=term))
+        problems = Problem.objects.filter(match)
+        if difficulty:
+            problems = problems.filter(difficulty=difficulty)
+        problems = problems.order_by('id').values_list('id', flat=True)
+        return list(problems[offset:offset + limit] if limit else problems[offset:])
+
+    if difficulty:
+        sql += " AND p.difficulty = %s"
+        params.append(difficulty)
+    sql += f" ORDER BY {order}"
+    if connection.vendor == 'postgresql':
+        params.append(pg_query(terms))
+    if limit:
+        sql += " LIMIT %s OFFSET %s"
+        params += [limit, offset]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
@@ -5,9 +5,21 @@ class ProblemSerializer(serializers.ModelSerializer):
     class Meta:
         model = Problem
         # Include test_cases for showing expected output examples
-        fields = ['id', 'title', 'description', 'difficulty', 'starter_code', 'real_life_context', 'explanation', 'solutions', 'test_cases']
+        fields = ['id', 'title', 'description', 'difficulty', 'starter_code', 'real_life_context', 'explanation', 'solutions', 'test_cases', 'tags']
+
+class ProblemSummarySerializer(serializers.ModelSerializer):
+    """Slim catalogue entry; the heavy fields come from the detail endpoint."""
+    excerpt = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Problem
+        fields = ['id', 'title', 'difficulty', 'excerpt']
 
 class SubmissionSerializer(serializers.ModelSerializer):
+    # Source is stored in CodeBlob; exposed as plain text like before
+    code = serializers.CharField(allow_blank=True, trim_whitespace=False)
+    code_hash = serializers.CharField(source='code_blob_id', read_only=True)
+
     class Meta:
         model = Submission
-        fields = '__all__'
\ No newline at end of file
+        fields = ['id', 'user', 'problem', 'code', 'code_hash', 'language', 'status', 'created_at']
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""
+Model signal handlers for the challenges app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalogue import bump_version
+from .leaderboard import debit
+from .models import PointsLedgerEntry, Problem, UserProblemProgress
+from .progress import mark_unsolved
+from .search import index_problems, remove_problems
+from .verdicts import get_verdict_cache, test_set_hash
+
+
+@receiver(post_save, sender=Problem)
+def drop_stale_verdicts(sender, instance, **kwargs):
+    """Cached verdicts for old test cases can never be hit again; drop them."""
+    cache = get_verdict_cache()
+    if cache is not None:
+        cache.invalidate_problem(instance.pk, test_set_hash(instance.test_cases))
+
+
+@receiver(post_delete, sender=Problem)
+def drop_deleted_problem_verdicts(sender, instance, **kwargs):
+    cache = get_verdict_cache()
+    if cache is not None:
+        cache.invalidate_problem(instance.pk)
+
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+def invalidate_catalogue(sender, **kwargs):
+    """Catalogue snapshots in every worker are rebuilt on their next request."""
+    bump_version()
+
+
+@receiver(post_save, sender=Problem)
+def update_search_index(sender, instance, **kwargs):
+    index_problems([instance.pk])
+
+
+@receiver(post_delete, sender=Problem)
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_problems([instance.pk])
+
+
+@receiver(post_delete, sender=UserProblemProgress)
+def clear_progress_bit(sender, instance, **kwargs):
+    """Keep the user's progress bitset in step (e.g. when a problem is deleted)."""
+    mark_unsolved(instance.user_id, instance.problem_id)
+
+
+@receiver(post_delete, sender=PointsLedgerEntry)
+def take_back_points(sender, instance, **kwargs):
+    debit(instance)
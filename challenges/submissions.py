@@ -0,0 +1,97 @@
+"""
+Recording judged submissions: points and saved progress.
+
+Shared by the synchronous execute endpoint and the judge queue workers.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F, Max
+
+from .conditional import make_etag
+from .leaderboard import credit
+from .models import Submission, UserProblemProgress
+from .progress import mark_solved
+
+# Points awarded per difficulty level
+POINTS_MAP = {'BEG': 10, 'INT': 20, 'ADV': 35, 'PRO': 50}
+
+
+def points_for(problem):
+    return POINTS_MAP.get(problem.difficulty, 10)
+
+
+def solved_problems(clerk_id):
+    return UserProblemProgress.objects.filter(user__username=clerk_id)
+
+
+# Changes whenever the user's set of solved problems changes; see progress_etag()
+PROGRESS_VERSION = {'count': Count('id'), 'last_id': Max('id'), 'last_modified': Max('first_solved_at')}
+
+
+def progress_etag(version):
+    return make_etag('progress', version['count'], version['last_id'] or 0)
+
+
+def record_pass(problem, code, language, clerk_id=None, email=None):
+    """Save a passing submission for the Clerk user and return the points earned."""
+    # A. Calculate Points
+    earned_points = points_for(problem)
+
+    # B. FIND OR CREATE USER
+    user = None
+    if clerk_id:
+        # Magic Line: Get the user if they exist, OR create them if they don't!
+        user, created = User.objects.get_or_create(
+            username=clerk_id,  # We use Clerk ID as the unique username
+            defaults={'email': email or ''}
+        )
+
+    # C. Save Submission (and the user's progress with it)
+    if user:
+        save_pass(user, problem, code, language)
+
+    return earned_points
+
+
+@transaction.atomic
+def save_pass(user, problem, code, language):
+    """Store a passed submission and update progress and score together."""
+    submission = Submission.objects.create(
+        user=user,
+        problem=problem,
+        code=code,
+        language=language,
+        status="Passed"
+    )
+    progress, created = UserProblemProgress.objects.get_or_create(
+        user=user,
+        problem=problem,
+        defaults={'first_solved_at': submission.created_at, 'best_language': language},
+    )
+    if created:
+        mark_solved(user, problem.id)
+        credit(user, problem, points_for(problem))
+    else:
+        UserProblemProgress.objects.filter(pk=progress.pk).update(
+            attempts=F('attempts') + 1, best_language=language
+        )
+    return submission
+
+
+async def arecord_pass(problem, code, language, clerk_id=None, email=None):
+    """Async ``record_pass()`` using Django's async ORM."""
+    earned_points = points_for(problem)
+
+    user = None
+    if clerk_id:
+        user, created = await User.objects.aget_or_create(
+            username=clerk_id,
+            defaults={'email': email or ''}
+        )
+
+    # The async ORM has no transactions; save_pass() runs in a thread
+    if user:
+        await sync_to_async(save_pass)(user, problem, code, language)
+
+    return earned_points
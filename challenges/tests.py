@@ -1,3 +1,1694 @@
-from django.test import TestCase
+import base64
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import requests
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+
+from . import catalogue, ingest, jobs, judge, leaderboard, middleware, progress, verdicts
+from .async_views import AsyncExecuteCodeAPI, AsyncProblemListAPI, AsyncUserProgressAPI
+from .execution import ExecutionError
+from .execution import local
+from .execution.artifacts import ArtifactCache
+from .execution.local import LocalExecutor
+from .execution.piston import PistonClient
+from .execution.prefork import PreforkExecutor
+from .management.commands import check_query_plans
+from .models import (
+    CodeBlob, JudgeJob, PointsLedgerEntry, Problem, Submission,
+    UserProblemProgress, UserProgressBlob, UserScore,
+)
+from .serializers import SubmissionSerializer
+from .submissions import save_pass
+from .throttles import RUN, SUBMIT, ExecuteModeThrottle, execution_mode
+
+
+class FakeProgram:
+    """Stands in for a prepared program: echoes the input after a per-input delay."""
+
+    def __init__(self, delays=None, output=None):
+        self.delays = delays or {}
+        self.output = output
+        self.ran = []
+        self.lock = threading.Lock()
+
+    def run(self, stdin):
+        with self.lock:
+            self.ran.append(stdin)
+        time.sleep(self.delays.get(stdin, 0))
+        return {'run': {'stdout': stdin if self.output is None else self.output, 'code': 0}}
+
+    async def arun(self, stdin):
+        return self.run(stdin)
+
+    def close(self):
+        pass
+
+
+class FakeExecutor:
+    def __init__(self, program):
+        self.program = program
+        self.prepared = 0
+
+    def prepare(self, language, code):
+        self.prepared += 1
+        return self.program
+
+    async def aprepare(self, language, code):
+        return self.prepare(language, code)
+
+
+def fake_executor(program):
+    return mock.patch.object(judge, 'get_executor', return_value=FakeExecutor(program))
+
+
+class TempDirMixin:
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def write(self, name, text, mode='w'):
+        path = os.path.join(self.tmp, name)
+        with open(path, mode) as f:
+            f.write(text)
+        return path
+
+
+def problem_entry(title, **fields):
+    entry = {
+        'title': title,
+        'description': f'Solve {title}.',
+        'starter_code': {'python': ''},
+        'solutions': {'python': 'print(1)'},
+        'test_cases': [{'input': '1', 'output': '1'}],
+    }
+    entry.update(fields)
+    return entry
+
+
+class APITestCase(TestCase):
+    """Fresh throttle buckets and verdict cache for every test."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        patcher = mock.patch.object(verdicts, '_cache', verdicts.MemoryVerdictCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, url, data):
+        return self.client.post(url, data, content_type='application/json')
+
+
+class JudgeTests(SimpleTestCase):
+    def judge(self, program, test_cases, fail_fast):
+        with fake_executor(program):
+            return judge.judge('code', 'python', test_cases, fail_fast=fail_fast)
+
+    def test_results_are_in_test_case_order(self):
+        # later cases finish first
+        test_cases = [{'input': str(n), 'output': str(n)} for n in range(6)]
+        program = FakeProgram({str(n): (6 - n) * 0.01 for n in range(6)})
+
+        results, all_passed = self.judge(program, test_cases, fail_fast=False)
+
+        self.assertTrue(all_passed)
+        self.assertEqual([result['input'] for result in results], [case['input'] for case in test_cases])
+
+    def test_fail_fast_stops_at_the_first_failure(self):
+        test_cases = [{'input': str(n), 'output': str(n)} for n in range(40)]
+        test_cases[1]['output'] = 'wrong'
+        # case 1 fails at once, the others are slow
+        program = FakeProgram({str(n): 0.05 for n in range(40) if n != 1})
+
+        results, all_passed = self.judge(program, test_cases, fail_fast=True)
+
+        self.assertFalse(all_passed)
+        self.assertEqual([result['input'] for result in results], ['0', '1'])
+        self.assertFalse(results[1]['passed'])
+        # queued cases after the failure were cancelled, not run
+        self.assertLess(len(program.ran), len(test_cases))
+
+    def test_without_fail_fast_every_case_runs(self):
+        test_cases = [{'input': str(n), 'output': str(n)} for n in range(5)]
+        test_cases[0]['output'] = 'wrong'
+        program = FakeProgram()
+
+        results, all_passed = self.judge(program, test_cases, fail_fast=False)
+
+        self.assertFalse(all_passed)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(sorted(program.ran), [case['input'] for case in test_cases])
+
+    def test_hints(self):
+        self.assertEqual(judge.check_output('Yes', 'Yes'), (True, None))
+        self.assertIn('Case Mismatch', judge.check_output('yes', 'Yes')[1])
+        self.assertIn('Spacing Issue', judge.check_output('1  2', '1 2')[1])
+
+
+class ExecuteCodeAPITests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.problem = Problem.objects.create(
+            title='Echo', description='Echo the input.', difficulty='BEG',
+            test_cases=[{'input': str(n), 'output': str(n)} for n in range(4)],
+        )
+
+    def test_response_shape(self):
+        with fake_executor(FakeProgram({'0': 0.03})):
+            response = self.post('/api/execute/', {'problem_id': self.problem.id, 'code': 'print(input())'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['status'], 'Success')
+        self.assertEqual(data['points'], 10)
+        self.assertEqual([result['input'] for result in data['results']], ['0', '1', '2', '3'])
+        self.assertEqual(set(data['results'][0]), {'input', 'expected', 'actual', 'passed', 'feedback'})
+
+    def test_failed_submission(self):
+        with fake_executor(FakeProgram(output='nope')):
+            response = self.post('/api/execute/', {'problem_id': self.problem.id, 'code': 'print(0)'})
+
+        data = response.json()
+        self.assertEqual(data['status'], 'Failed')
+        self.assertNotIn('points', data)
+
+    def test_unknown_problem(self):
+        response = self.post('/api/execute/', {'problem_id': 0, 'code': ''})
+        self.assertEqual(response.status_code, 404)
+
+
+class FakePiston(BaseHTTPRequestHandler):
+    """Answers with the queued ``(status, body)`` responses, then echoes stdin."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.requests += 1
+            server.connections.add(self.client_address)
+            status, body = server.responses.pop(0) if server.responses else (200, None)
+        if body is None:
+            body = json.dumps({'run': {'stdout': payload['stdin'], 'code': 0}})
+        data = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class PistonClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakePiston)
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.connections = set()
+        self.server.responses = []
+        thread = threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = PistonClient(
+            url=f'http://127.0.0.1:{self.server.server_port}/execute',
+            connect_timeout=1, read_timeout=2, max_retries=2,
+            backoff_factor=0, backoff_jitter=0, pool_size=2,
+        )
+        self.addCleanup(self.client.close)
+
+    def test_connections_are_reused(self):
+        for n in range(5):
+            self.assertEqual(self.client.execute('python', 'print(input())', str(n))['run']['stdout'], str(n))
+        self.assertEqual(self.server.requests, 5)
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_retries_busy_responses(self):
+        self.server.responses = [(503, '{}'), (429, '{}')]
+        self.assertEqual(self.client.execute('python', '', 'ok')['run']['stdout'], 'ok')
+        self.assertEqual(self.server.requests, 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.server.responses = [(503, '{}')] * 3
+        with self.assertRaises(ExecutionError):
+            self.client.execute('python', '', '')
+        self.assertEqual(self.server.requests, 3)
+
+    def test_client_errors_are_returned(self):
+        self.server.responses = [(400, '{"message": "unknown language"}')]
+        self.assertEqual(self.client.execute('cobol', '', ''), {'message': 'unknown language'})
+
+    def test_invalid_json(self):
+        self.server.responses = [(200, 'not json')]
+        with self.assertRaises(ExecutionError):
+            self.client.execute('python', '', '')
+
+    def test_connection_errors(self):
+        with mock.patch.object(self.client.session, 'post', side_effect=requests.ConnectionError('refused')):
+            with self.assertRaises(ExecutionError):
+                self.client.execute('python', '', '')
+
+
+class LocalExecutorTests(TempDirMixin, SimpleTestCase):
+    def executor(self, **options):
+        options = dict(dict(cpu_time=1, wall_time=2, memory=128), **options)
+        return LocalExecutor(artifact_dir=os.path.join(self.tmp, 'artifacts'), scratch_dir=self.tmp, **options)
+
+    def test_python(self):
+        result = self.executor().execute('python3', 'print(input()[::-1])', 'abc')
+        self.assertEqual(result['run']['stdout'], 'cba\n')
+        self.assertEqual(result['run']['code'], 0)
+
+    def test_cpu_limit(self):
+        result = self.executor().execute('python', 'while True: pass')
+        self.assertIn(result['run']['signal'], ('SIGXCPU', 'SIGKILL'))
+
+    def test_wall_clock_limit(self):
+        result = self.executor(wall_time=1).execute('python', 'import time; time.sleep(30)')
+        self.assertEqual(result['run']['signal'], 'SIGKILL')
+        self.assertIn('Time Limit Exceeded', result['run']['stderr'])
+
+    def test_memory_limit(self):
+        result = self.executor().execute('python', 'x = bytearray(512 * 1024 * 1024)')
+        self.assertNotEqual(result['run']['code'], 0)
+        self.assertIn('MemoryError', result['run']['stderr'])
+
+    def test_output_limit(self):
+        result = self.executor(output=1000).execute('python', 'print("x" * 100000)')
+        self.assertLessEqual(len(result['run']['stdout']), 1000)
+
+    def test_limits_without_prlimit(self):
+        with mock.patch.object(local, 'PRLIMIT', None):
+            executor = self.executor()
+            self.assertEqual(executor.execute('python', 'print(42)')['run']['stdout'], '42\n')
+            self.assertIn(executor.execute('python', 'while True: pass')['run']['signal'], ('SIGXCPU', 'SIGKILL'))
+
+    def test_unsupported_language(self):
+        result = self.executor().execute('cobol', '')
+        self.assertIn('not supported', result['message'])
+
+    def test_missing_toolchain(self):
+        with mock.patch.dict(local.LANGUAGES, {'python': dict(local.LANGUAGES['python'], run=['no-such-python'])}):
+            with self.assertRaises(ExecutionError):
+                self.executor().execute('python', 'print(1)')
+
+    @skipUnless(shutil.which('gcc'), 'gcc is not installed')
+    def test_c(self):
+        code = '#include <stdio.h>\nint main() { int n; scanf("%d", &n); printf("%d\\n", n * 2); }\n'
+        result = self.executor().execute('c', code, '21')
+        self.assertEqual(result['compile']['code'], 0)
+        self.assertEqual(result['run']['stdout'], '42\n')
+
+    @skipUnless(shutil.which('gcc'), 'gcc is not installed')
+    def test_compile_error(self):
+        result = self.executor().execute('c', 'int main() { return }')
+        self.assertNotEqual(result['compile']['code'], 0)
+        self.assertNotIn('run', result)
+
+
+class ArtifactCacheTests(TempDirMixin, SimpleTestCase):
+    def build(self, result, size=10):
+        def build(workdir):
+            self.builds += 1
+            with open(os.path.join(workdir, 'main'), 'wb') as f:
+                f.write(b'x' * size)
+            return result
+        return build
+
+    def setUp(self):
+        super().setUp()
+        self.builds = 0
+        self.cache = ArtifactCache(os.path.join(self.tmp, 'artifacts'), max_bytes=1000)
+
+    def test_built_once(self):
+        compiled = {'stdout': '', 'stderr': '', 'output': '', 'code': 0, 'signal': None}
+        path, result, cached = self.cache.get_or_build('k', self.build(compiled))
+        self.assertFalse(cached)
+        self.assertTrue(os.path.exists(os.path.join(path, 'main')))
+
+        path, result, cached = self.cache.get_or_build('k', self.build(compiled))
+        self.assertTrue(cached)
+        self.assertEqual(result, compiled)
+        self.assertEqual(self.builds, 1)
+
+    def test_compile_errors_are_cached(self):
+        failed = {'stdout': '', 'stderr': 'error', 'output': 'error', 'code': 1, 'signal': None}
+        self.cache.get_or_build('k', self.build(failed))
+        self.assertTrue(self.cache.get_or_build('k', self.build(failed))[2])
+        self.assertEqual(self.builds, 1)
+
+    def test_killed_compiles_are_not_cached(self):
+        killed = {'stdout': '', 'stderr': '', 'output': '', 'code': None, 'signal': 'SIGKILL'}
+        path, _result, cached = self.cache.get_or_build('k', self.build(killed))
+        self.assertFalse(cached)
+        self.assertFalse(os.path.exists(path))
+        self.cache.get_or_build('k', self.build(killed))
+        self.assertEqual(self.builds, 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        compiled = {'stdout': '', 'stderr': '', 'output': '', 'code': 0, 'signal': None}
+        self.cache.get_or_build('old', self.build(compiled, 400))
+        self.cache.get_or_build('used', self.build(compiled, 400))
+        old = os.path.join(self.cache.path('old'), 'compile.json')
+        os.utime(old, (time.time() - 60, time.time() - 60))
+
+        self.cache.get_or_build('new', self.build(compiled, 400))
+
+        self.assertIsNone(self.cache.get('old'))
+        self.assertIsNotNone(self.cache.get('used'))
+        self.assertIsNotNone(self.cache.get('new'))
+
+    @skipUnless(shutil.which('gcc'), 'gcc is not installed')
+    def test_identical_submissions_compile_once(self):
+        executor = LocalExecutor(cpu_time=1, wall_time=2, artifact_dir=os.path.join(self.tmp, 'gcc'), scratch_dir=self.tmp)
+        code = '#include <stdio.h>\nint main() { int n; scanf("%d", &n); printf("%d", n + 1); }\n'
+        with mock.patch.object(executor, 'compile', wraps=executor.compile) as compile:
+            program = executor.prepare('c', code)
+            self.assertEqual([program.run(str(n))['run']['stdout'] for n in range(3)], ['1', '2', '3'])
+            self.assertEqual(executor.prepare('c', code).run('9')['run']['stdout'], '10')
+        self.assertEqual(compile.call_count, 1)
+
+
+class VerdictCacheTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.problem = Problem.objects.create(
+            title='Echo', description='Echo the input.', difficulty='BEG',
+            test_cases=[{'input': str(n), 'output': str(n)} for n in range(3)],
+        )
+
+    def judge(self, code, program=None):
+        executor = FakeExecutor(program or FakeProgram())
+        with mock.patch.object(judge, 'get_executor', return_value=executor):
+            results, all_passed, cached = verdicts.cached_judge(
+                self.problem.id, self.problem.test_cases, code, 'python'
+            )
+        return results, cached, executor.prepared
+
+    def test_identical_resubmission_is_a_hit(self):
+        first, cached, prepared = self.judge('print(input())')
+        self.assertEqual((cached, prepared), (False, 1))
+
+        second, cached, prepared = self.judge('print(input())')
+        self.assertEqual((cached, prepared), (True, 0))
+        self.assertEqual(second, first)
+
+    def test_different_code_is_judged(self):
+        self.judge('print(input())')
+        self.assertFalse(self.judge('print(input()) ')[1])
+        # a space after a line-continuation backslash changes the program
+        self.judge('x = 1 + \\\n2\n')
+        self.assertFalse(self.judge('x = 1 + \\ \n2\n')[1])
+
+    def test_crlf_line_endings_are_ignored(self):
+        self.judge('a = 1\nprint(a)\n')
+        self.assertTrue(self.judge('a = 1\r\nprint(a)\r\n')[1])
+
+    def test_changed_test_cases_invalidate(self):
+        self.judge('print(input())')
+        self.problem.test_cases = self.problem.test_cases + [{'input': '9', 'output': '9'}]
+        self.problem.save()
+
+        results, cached, _prepared = self.judge('print(input())')
+        self.assertFalse(cached)
+        self.assertEqual(len(results), 4)
+        self.assertEqual(len(verdicts._cache._entries), 1)
+
+    def test_transient_results_are_not_cached_or_returned(self):
+        class Killed(FakeProgram):
+            def run(self, stdin):
+                return {'run': {'stdout': stdin, 'code': None, 'signal': 'SIGKILL'}}
+
+        results, cached, _prepared = self.judge('print(input())', Killed())
+        self.assertNotIn('transient', results[0])
+        self.assertFalse(self.judge('print(input())')[1])
+
+    def test_disabled_cache(self):
+        with mock.patch.object(verdicts, 'get_verdict_cache', return_value=None):
+            self.judge('print(input())')
+            self.assertFalse(self.judge('print(input())')[1])
+
+    def test_database_backend(self):
+        backend = verdicts.DatabaseVerdictCache(cull_frequency=0)
+        with mock.patch.object(verdicts, '_cache', backend):
+            self.judge('print(input())')
+            self.assertTrue(self.judge('print(input())')[1])
+            self.problem.test_cases = [{'input': '1', 'output': '1'}]
+            self.problem.save()
+            self.assertFalse(self.judge('print(input())')[1])
+        self.assertEqual(backend.stats()['hits'], 1)
+
+    def test_memory_backend_is_bounded(self):
+        backend = verdicts.MemoryVerdictCache(max_entries=2)
+        for key in 'abc':
+            backend.set(key, {'results': [], 'all_passed': True}, 1, 'h', 'python')
+        self.assertIsNone(backend.get('a'))
+        self.assertIsNotNone(backend.get('c'))
+
+
+@override_settings(JUDGE_QUEUE=dict(settings.JUDGE_QUEUE, WORKERS=0, MAX_DEPTH=4, MAX_PER_OWNER=2, MAX_RUNNING_PER_OWNER=1))
+class JudgeQueueTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.problem = Problem.objects.create(
+            title='Echo', description='Echo the input.', difficulty='BEG',
+            test_cases=[{'input': str(n), 'output': str(n)} for n in range(3)],
+        )
+
+    def enqueue(self, owner):
+        return jobs.enqueue(self.problem, 'print(input())', 'python', owner)
+
+    def test_per_owner_limit(self):
+        self.enqueue('a')
+        self.enqueue('a')
+        with self.assertRaises(jobs.QueueFull):
+            self.enqueue('a')
+        self.enqueue('b')
+
+    def test_depth_limit(self):
+        for owner in 'abcd':
+            self.enqueue(owner)
+        with self.assertRaises(jobs.QueueFull):
+            self.enqueue('e')
+
+    def test_claims_the_oldest_job_of_the_least_busy_owner(self):
+        first = self.enqueue('a')
+        second = self.enqueue('a')
+        other = self.enqueue('b')
+
+        self.assertEqual(jobs.claim_next().id, first.id)
+        # 'a' already has a job running (MAX_RUNNING_PER_OWNER=1)
+        self.assertEqual(jobs.claim_next().id, other.id)
+        self.assertIsNone(jobs.claim_next())
+
+        JudgeJob.objects.filter(id=first.id).update(status=JudgeJob.DONE)
+        self.assertEqual(jobs.claim_next().id, second.id)
+
+    def test_work_once_runs_a_job(self):
+        job = self.enqueue('a')
+        with fake_executor(FakeProgram()):
+            self.assertTrue(jobs.work_once())
+        self.assertFalse(jobs.work_once())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JudgeJob.DONE)
+        self.assertEqual(job.verdict, 'Success')
+        self.assertEqual([result['index'] for result in job.results], [0, 1, 2])
+        self.assertNotIn('transient', job.results[0])
+
+    def test_stale_jobs_are_requeued(self):
+        job = self.enqueue('a')
+        jobs.claim_next()
+        JudgeJob.objects.filter(id=job.id).update(started_at=job.created_at.replace(year=2000))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        self.assertEqual(JudgeJob.objects.get(id=job.id).status, JudgeJob.QUEUED)
+
+    def test_worker_survives_maintenance_errors(self):
+        stop = threading.Event()
+
+        def work_once():
+            stop.set()
+            return True
+
+        with mock.patch.object(jobs, 'requeue_stale', side_effect=OperationalError('database is locked')), \
+                mock.patch.object(jobs, 'work_once', side_effect=work_once):
+            with self.assertLogs('challenges.jobs', 'ERROR'):
+                jobs.work_forever(stop)
+
+    def test_api(self):
+        response = self.post('/api/jobs/', {'problem_id': self.problem.id, 'code': 'print(input())'})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['job_id']
+        self.assertEqual(response.json()['position'], 0)
+
+        with fake_executor(FakeProgram()):
+            jobs.work_once()
+        data = self.client.get(f'/api/jobs/{job_id}/').json()
+        self.assertEqual(data['status'], JudgeJob.DONE)
+        self.assertEqual(data['verdict'], 'Success')
+
+    def test_api_requires_code(self):
+        response = self.post('/api/jobs/', {'problem_id': self.problem.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(JudgeJob.objects.exists())
+
+    def test_owner_is_not_taken_from_clerk_id(self):
+        for clerk_id in 'ab':
+            response = self.post('/api/jobs/', {'problem_id': self.problem.id, 'code': 'x', 'clerk_id': clerk_id})
+            self.assertEqual(response.status_code, 202)
+        response = self.post('/api/jobs/', {'problem_id': self.problem.id, 'code': 'x', 'clerk_id': 'c'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(set(JudgeJob.objects.values_list('owner', flat=True)), {'127.0.0.1'})
+
+    def test_api_is_throttled(self):
+        with mock.patch.dict(ExecuteModeThrottle.THROTTLE_RATES, {'execute-submit': '1/min'}):
+            self.assertEqual(self.post('/api/jobs/', {'problem_id': self.problem.id, 'code': 'x'}).status_code, 202)
+            response = self.post('/api/jobs/', {'problem_id': self.problem.id, 'code': 'x', 'mode': 'run'})
+            self.assertEqual(response.status_code, 429)
+
+
+class ExecuteStreamAPITests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.problem = Problem.objects.create(
+            title='Echo', description='Echo the input.', difficulty='BEG',
+            test_cases=[{'input': str(n), 'output': str(n)} for n in range(3)],
+        )
+
+    def events(self, **data):
+        response = self.post('/api/execute/stream/', dict({'problem_id': self.problem.id, 'code': 'x'}, **data))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        body = b''.join(response.streaming_content).decode()
+        events = []
+        for block in body.strip().split('\n\n'):
+            event, data = block.split('\n')
+            events.append((event.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+        return events
+
+    def test_events(self):
+        with fake_executor(FakeProgram({'0': 0.03})):
+            events = self.events(clerk_id='user-1')
+
+        self.assertEqual(events[0], ('start', {'total': 3, 'cached': False}))
+        cases = [data for event, data in events if event == 'case']
+        self.assertEqual(sorted(case['index'] for case in cases), [0, 1, 2])
+        self.assertEqual(set(cases[0]), {'input', 'expected', 'actual', 'passed', 'feedback', 'index'})
+        self.assertEqual(events[-1], ('verdict', {'status': 'Success', 'mode': 'submit', 'passed': 3, 'total': 3, 'points': 10}))
+
+    def test_cached_verdict_is_replayed(self):
+        with fake_executor(FakeProgram()):
+            self.events()
+        with fake_executor(FakeProgram(output='wrong')):
+            events = self.events()
+        self.assertTrue(events[0][1]['cached'])
+        self.assertEqual([data['index'] for event, data in events if event == 'case'], [0, 1, 2])
+        self.assertEqual(events[-1][1]['status'], 'Success')
+
+    def test_backend_unavailable(self):
+        with mock.patch.object(judge, 'get_executor', side_effect=ExecutionError('down')):
+            events = self.events()
+        self.assertEqual(events[-1], ('error', {'status': 'Error', 'message': 'Compiler Service Unavailable'}))
+
+    def test_unexpected_errors_end_the_stream_with_an_error_event(self):
+        with fake_executor(FakeProgram()), \
+                mock.patch('challenges.views.record_pass', side_effect=RuntimeError('boom')), \
+                self.assertLogs('challenges.views', 'ERROR'):
+            events = self.events(clerk_id='user-1')
+        self.assertEqual(events[-1], ('error', {'status': 'Error', 'message': 'Internal Server Error'}))
+
+
+class PreforkExecutorTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.executor = PreforkExecutor(
+            python_workers=1, cpu_time=1, wall_time=2, memory=128,
+            artifact_dir=os.path.join(self.tmp, 'artifacts'), scratch_dir=self.tmp,
+        )
+        self.addCleanup(self.executor.close)
+
+    def test_runs_through_a_warm_worker(self):
+        program = self.executor.prepare('python', 'import os\nprint(input(), os.getppid())')
+        first = program.run('a')['run']['stdout'].split()
+        second = program.run('b')['run']['stdout'].split()
+        self.assertEqual([first[0], second[0]], ['a', 'b'])
+        # both runs were forked by the same zygote
+        self.assertEqual(first[1], second[1])
+        self.assertEqual(int(first[1]), self.executor._all[0].proc.pid)
+
+    def test_runs_do_not_share_state(self):
+        code = 'import collections\nprint(getattr(collections, "seen", False))\ncollections.seen = True'
+        program = self.executor.prepare('python', code)
+        self.assertEqual([program.run()['run']['stdout'] for _ in range(2)], ['False\n', 'False\n'])
+
+    def test_limits(self):
+        self.assertIn(self.executor.execute('python', 'while True: pass')['run']['signal'], ('SIGXCPU', 'SIGKILL'))
+        result = self.executor.execute('python', 'import time; time.sleep(30)')
+        self.assertEqual(result['run']['signal'], 'SIGKILL')
+        self.assertIn('MemoryError', self.executor.execute('python', 'x = bytearray(1 << 30)')['run']['stderr'])
+
+    def test_dead_worker_is_replaced(self):
+        self.executor.execute('python', 'print(1)')
+        zygote = self.executor._all[0]
+        zygote.proc.kill()
+        zygote.proc.wait()
+
+        with self.assertRaises(ExecutionError):
+            self.executor.execute('python', 'print(1)')
+        self.assertEqual(self.executor.execute('python', 'print(2)')['run']['stdout'], '2\n')
+        self.assertIsNot(self.executor._all[0], zygote)
+
+    @skipUnless(shutil.which('gcc'), 'gcc is not installed')
+    def test_other_languages_run_as_subprocesses(self):
+        result = self.executor.execute('c', '#include <stdio.h>\nint main() { puts("c"); }\n')
+        self.assertEqual(result['run']['stdout'], 'c\n')
+
+
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = AsyncRequestFactory()
+        self.problem = Problem.objects.create(
+            title='Echo', description='Echo the input.', difficulty='BEG',
+            test_cases=[{'input': str(n), 'output': str(n)} for n in range(3)],
+        )
+
+    async def apost(self, data):
+        request = self.factory.post('/api/execute/', json.dumps(data), content_type='application/json')
+        return await AsyncExecuteCodeAPI.as_view()(request)
+
+    async def test_execute_matches_the_sync_view(self):
+        data = {'problem_id': self.problem.id, 'code': 'print(input())', 'clerk_id': 'user-1'}
+        with fake_executor(FakeProgram({'0': 0.03})):
+            response = await self.apost(data)
+        self.assertEqual(response.status_code, 200)
+        async_data = json.loads(response.content)
+
+        cache.clear()
+        with mock.patch.object(verdicts, '_cache', verdicts.MemoryVerdictCache()), fake_executor(FakeProgram()):
+            sync_data = (await sync_to_async(self.post)('/api/execute/', data)).json()
+        self.assertEqual(async_data, sync_data)
+        self.assertEqual(await User.objects.filter(username='user-1').acount(), 1)
+
+    async def test_execute_errors(self):
+        request = self.factory.post('/api/execute/', 'not json', content_type='application/json')
+        self.assertEqual((await AsyncExecuteCodeAPI.as_view()(request)).status_code, 400)
+        self.assertEqual((await self.apost({'problem_id': 0})).status_code, 404)
+        self.assertEqual((await self.apost({'problem_id': self.problem.id, 'mode': 'x'})).status_code, 400)
+        with mock.patch.object(judge, 'get_executor', side_effect=ExecutionError('down')):
+            self.assertEqual((await self.apost({'problem_id': self.problem.id, 'code': ''})).status_code, 503)
+
+    async def test_execute_is_throttled(self):
+        with mock.patch.dict(ExecuteModeThrottle.THROTTLE_RATES, {'execute-run': '1/min'}):
+            with fake_executor(FakeProgram()):
+                response = await self.apost({'problem_id': self.problem.id, 'code': '', 'mode': 'run'})
+                self.assertEqual(response.status_code, 200)
+                response = await self.apost({'problem_id': self.problem.id, 'code': '', 'mode': 'run'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    async def test_problem_list_matches_the_sync_view(self):
+        response = await AsyncProblemListAPI.as_view()(self.factory.get('/api/problems/'))
+        sync_response = await sync_to_async(self.client.get)('/api/problems/')
+        self.assertEqual(json.loads(response.content), sync_response.json())
+        self.assertEqual(response['ETag'], sync_response['ETag'])
+
+    async def test_progress_matches_the_sync_view(self):
+        user = await User.objects.acreate(username='user-1')
+        await sync_to_async(save_pass)(user, self.problem, 'x', 'python')
+
+        for query in ({'clerk_id': 'user-1'}, {'clerk_id': 'user-1', 'encoding': 'ranges'}, {}):
+            with self.subTest(query=query):
+                response = await AsyncUserProgressAPI.as_view()(self.factory.get('/api/progress/', query))
+                sync_response = await sync_to_async(self.client.get)('/api/progress/', query)
+                self.assertEqual(json.loads(response.content), sync_response.json())
+
+
+class ExecutionModeTests(SimpleTestCase):
+    def test_mode_parsing(self):
+        self.assertEqual(execution_mode({}), SUBMIT)
+        self.assertEqual(execution_mode({'mode': ''}), SUBMIT)
+        self.assertEqual(execution_mode({'mode': 'RUN'}), RUN)
+        self.assertEqual(execution_mode({'mode': 'submit'}), SUBMIT)
+        self.assertIsNone(execution_mode({'mode': 'judge'}))
+        self.assertIsNone(execution_mode({'mode': ['run']}))
+        self.assertIsNone(execution_mode({'mode': 1}))
+
+
+class ExecuteThrottleTests(TestCase):
+    url = '/api/execute/stream/'
+
+    def setUp(self):
+        cache.clear()
+        rates = mock.patch.dict(
+            ExecuteModeThrottle.THROTTLE_RATES, {'execute-run': '2/min', 'execute-submit': '1/min'}
+        )
+        rates.start()
+        self.addCleanup(rates.stop)
+
+    def post(self, **data):
+        # an unknown problem: a request that gets past the throttle answers 404
+        return self.client.post(self.url, dict({'problem_id': 0, 'code': ''}, **data), content_type='application/json')
+
+    def test_run_and_submit_buckets(self):
+        self.assertEqual(self.post(mode='run').status_code, 404)
+        self.assertEqual(self.post(mode='run').status_code, 404)
+        throttled = self.post(mode='run')
+        self.assertEqual(throttled.status_code, 429)
+        self.assertIn('Retry-After', throttled)
+
+        # submissions have their own bucket
+        self.assertEqual(self.post(mode='submit').status_code, 404)
+        self.assertEqual(self.post(mode='submit').status_code, 429)
+
+    def test_changing_clerk_id_does_not_reset_the_limit(self):
+        self.assertEqual(self.post(mode='submit', clerk_id='a').status_code, 404)
+        self.assertEqual(self.post(mode='submit', clerk_id='b').status_code, 429)
+
+    def test_invalid_mode_uses_the_submit_bucket(self):
+        self.assertEqual(self.post(mode=['run']).status_code, 400)
+        self.assertEqual(self.post(mode='submit').status_code, 429)
+
+
+class CatalogueAPITests(TestCase):
+    url = '/api/problems/catalogue/'
+
+    @classmethod
+    def setUpTestData(cls):
+        for n in range(5):
+            Problem.objects.create(
+                title=f'Problem {n}', description='x' * 500, difficulty='BEG' if n % 2 else 'ADV',
+                test_cases=[{'input': '', 'output': ''}],
+            )
+
+    def test_pages_follow_the_cursor(self):
+        titles = []
+        url = self.url + '?page_size=2'
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data['results']), 2)
+            titles += [entry['title'] for entry in data['results']]
+            url = data['next']
+        self.assertEqual(titles, [f'Problem {n}' for n in range(5)])
+
+    def test_entries_are_slim(self):
+        entry = self.client.get(self.url).json()['results'][0]
+        self.assertEqual(set(entry), {'id', 'title', 'difficulty', 'excerpt'})
+        self.assertEqual(len(entry['excerpt']), 160)
+
+        detail = self.client.get(f"/api/problems/{entry['id']}/").json()
+        self.assertEqual(detail['description'], 'x' * 500)
+        self.assertEqual(detail['test_cases'], [{'input': '', 'output': ''}])
+
+    def test_difficulty_filter(self):
+        for difficulty in ('BEG', 'beginner', 'Beginner'):
+            with self.subTest(difficulty=difficulty):
+                results = self.client.get(self.url, {'difficulty': difficulty}).json()['results']
+                self.assertEqual([entry['title'] for entry in results], ['Problem 1', 'Problem 3'])
+
+        self.assertEqual(self.client.get(self.url, {'difficulty': 'easy'}).status_code, 400)
+
+
+class CatalogueSnapshotTests(TestCase):
+    url = '/api/problems/'
+
+    def setUp(self):
+        cache.clear()
+        snapshots = mock.patch.dict(catalogue._snapshots, clear=True)
+        snapshots.start()
+        self.addCleanup(snapshots.stop)
+        self.problem = Problem.objects.create(
+            title='One', description='First.', difficulty='BEG', test_cases=[],
+        )
+
+    def titles(self, **params):
+        return [problem['title'] for problem in self.client.get(self.url, params).json()]
+
+    def test_snapshot_is_rendered_once_per_version(self):
+        with mock.patch.object(catalogue, 'render', wraps=catalogue.render) as render:
+            self.assertEqual(self.titles(), ['One'])
+            self.assertEqual(self.titles(), ['One'])
+            self.assertEqual(render.call_count, 1)
+
+            # another process: the shared cache already holds the body
+            catalogue._snapshots.clear()
+            self.assertEqual(self.titles(), ['One'])
+            self.assertEqual(render.call_count, 1)
+
+    def test_problem_changes_rebuild_the_snapshot(self):
+        self.assertEqual(self.titles(), ['One'])
+
+        Problem.objects.create(title='Two', description='Second.', difficulty='ADV', test_cases=[])
+        self.assertEqual(self.titles(), ['One', 'Two'])
+        self.assertEqual(self.titles(difficulty='ADV'), ['Two'])
+
+        self.problem.title = 'First'
+        self.problem.save()
+        self.assertEqual(self.titles(), ['First', 'Two'])
+
+        self.problem.delete()
+        self.assertEqual(self.titles(), ['Two'])
+
+        # bulk writes skip the signals and bump the version themselves
+        Problem.objects.update(title='Renamed')
+        self.assertEqual(self.titles(), ['Two'])
+        catalogue.bump_version()
+        self.assertEqual(self.titles(), ['Renamed'])
+
+    def test_summary_view(self):
+        entries = self.client.get(self.url, {'view': 'summary'}).json()
+        self.assertEqual(entries, [{'id': self.problem.id, 'title': 'One', 'difficulty': 'BEG', 'excerpt': 'First.'}])
+        self.assertEqual(self.client.get(self.url, {'view': 'everything'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'difficulty': 'easy'}).status_code, 400)
+
+    def test_gzip_negotiation(self):
+        gzipped = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(gzipped['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(gzipped.content)), self.client.get(self.url).json())
+
+        for accept in ('', 'identity', 'gzip;q=0', 'br;q=1, gzip;q=0'):
+            with self.subTest(accept=accept):
+                response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=accept)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertIn('Accept-Encoding', response['Vary'])
+                self.assertEqual(json.loads(response.content)[0]['title'], 'One')
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        snapshots = mock.patch.dict(catalogue._snapshots, clear=True)
+        snapshots.start()
+        self.addCleanup(snapshots.stop)
+        self.problem = Problem.objects.create(
+            title='One', description='First.', difficulty='BEG', test_cases=[],
+        )
+        self.user = User.objects.create(username='user-1')
+
+    def assertRevalidates(self, url, params, change):
+        first = self.client.get(url, params)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        cached = self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+        self.assertEqual(cached['ETag'], first['ETag'])
+
+        change()
+        changed = self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+        return first, changed
+
+    def test_problem_list(self):
+        def add_problem():
+            Problem.objects.create(title='Two', description='Second.', difficulty='BEG', test_cases=[])
+
+        first, changed = self.assertRevalidates('/api/problems/', {}, add_problem)
+        self.assertEqual(len(changed.json()), 2)
+
+        # the filtered and gzipped bodies have their own tags
+        self.assertNotEqual(self.client.get('/api/problems/', {'difficulty': 'BEG'})['ETag'], changed['ETag'])
+        gzipped = self.client.get('/api/problems/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotEqual(gzipped['ETag'], changed['ETag'])
+        self.assertEqual(
+            self.client.get('/api/problems/', HTTP_IF_NONE_MATCH=gzipped['ETag']).status_code, 200
+        )
+
+    def test_problem_list_last_modified(self):
+        response = self.client.get('/api/problems/')
+        self.assertEqual(
+            self.client.get('/api/problems/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+        )
+
+    def test_progress(self):
+        problems = iter([
+            Problem.objects.create(title=f'P{n}', description='', difficulty='BEG', test_cases=[])
+            for n in range(3)
+        ])
+        for encoding in ('ids', 'bitset', 'ranges'):
+            with self.subTest(encoding=encoding):
+                params = {'clerk_id': 'user-1', 'encoding': encoding}
+                first, changed = self.assertRevalidates(
+                    '/api/progress/', params, lambda: save_pass(self.user, next(problems), '', 'python')
+                )
+                self.assertIn('private', first['Cache-Control'])
+
+    def test_repeat_pass_keeps_the_progress_tag(self):
+        save_pass(self.user, self.problem, '', 'python')
+        etag = self.client.get('/api/progress/', {'clerk_id': 'user-1'})['ETag']
+        save_pass(self.user, self.problem, 'again', 'python')
+        response = self.client.get('/api/progress/', {'clerk_id': 'user-1'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(COMPRESSION={'MIN_SIZE': 100, 'ENCODINGS': ['zstd', 'br', 'gzip'], 'LEVELS': {'gzip': 6, 'br': 5, 'zstd': 3}})
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = b'{"title": "compress me"}' * 20
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        # a stand-in for brotli, which may not be installed
+        compressors = mock.patch.dict(middleware.COMPRESSORS, {'br': lambda data, level: b'br' + zlib.compress(data)})
+        compressors.start()
+        self.addCleanup(compressors.stop)
+
+    def process(self, accept, response=None, **headers):
+        if accept is not None:
+            headers['HTTP_ACCEPT_ENCODING'] = accept
+        response = response or HttpResponse(self.body, content_type='application/json')
+        return middleware.CompressionMiddleware(lambda request: response)(self.factory.get('/', **headers))
+
+    def test_negotiation(self):
+        for accept, expected in (
+            ('gzip', 'gzip'),
+            ('gzip, br', 'br'),
+            ('br;q=0.5, gzip', 'gzip'),
+            ('br;q=0, gzip;q=0.1', 'gzip'),
+            ('*', 'br'),
+            ('*;q=0.5, gzip', 'gzip'),
+            ('zstd', None),
+            ('gzip;q=0', None),
+            ('identity', None),
+            ('', None),
+            (None, None),
+        ):
+            with self.subTest(accept=accept):
+                response = self.process(accept)
+                self.assertEqual(response.get('Content-Encoding'), expected)
+                self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_gzip_body(self):
+        response = self.process('gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+
+    def test_strong_etag_becomes_weak(self):
+        response = HttpResponse(self.body, content_type='application/json')
+        response['ETag'] = '"v1"'
+        self.assertEqual(self.process('gzip', response)['ETag'], 'W/"v1"')
+
+    def test_responses_left_alone(self):
+        small = HttpResponse(b'{}', content_type='application/json')
+        events = HttpResponse(self.body, content_type='text/event-stream')
+        streaming = StreamingHttpResponse(iter([self.body]), content_type='application/json')
+        encoded = HttpResponse(self.body, content_type='application/json', headers={'Content-Encoding': 'gzip'})
+        no_transform = HttpResponse(self.body, content_type='application/json', headers={'Cache-Control': 'no-transform'})
+        for name, response in (
+            ('small', small), ('events', events), ('streaming', streaming),
+            ('encoded', encoded), ('no-transform', no_transform),
+        ):
+            with self.subTest(name):
+                headers = dict(response.items())
+                self.assertEqual(dict(self.process('gzip', response).items()), headers)
+
+    def test_incompressible_body_is_sent_as_is(self):
+        body = os.urandom(200)
+        response = self.process('gzip', HttpResponse(body, content_type='application/octet-stream'))
+        self.assertEqual(response.content, body)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class SearchTests(TestCase):
+    url = '/api/problems/search/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.in_description = Problem.objects.create(
+            title='Budget Tracker', difficulty='BEG', test_cases=[],
+            description='Walk the array of expenses and sum them.',
+        )
+        cls.in_title = Problem.objects.create(
+            title='Array Rotation', difficulty='ADV', test_cases=[],
+            description='Rotate the list by k places.',
+        )
+        cls.in_tags = Problem.objects.create(
+            title='Sliding Window', difficulty='BEG', test_cases=[], tags=['arrays', 'two-pointers'],
+            description='Find the longest run.',
+        )
+
+    def titles(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [problem['title'] for problem in response.json()['results']]
+
+    def test_ranking(self):
+        # title outranks tags, tags outrank the description; "arr" is a prefix
+        self.assertEqual(self.titles(q='arr'), ['Array Rotation', 'Sliding Window', 'Budget Tracker'])
+        self.assertEqual(self.titles(q='arrays'), ['Sliding Window'])
+        self.assertEqual(self.titles(q='ARRAY expenses!'), ['Budget Tracker'])
+        self.assertEqual(self.titles(q='nothing'), [])
+
+    def test_difficulty_filter_and_paging(self):
+        self.assertEqual(self.titles(q='arr', difficulty='beginner'), ['Sliding Window', 'Budget Tracker'])
+        self.assertEqual(self.titles(q='arr', limit=1, offset=1), ['Sliding Window'])
+
+    def test_index_follows_problem_changes(self):
+        self.in_title.title = 'Matrix Rotation'
+        self.in_title.save()
+        self.assertEqual(self.titles(q='matrix'), ['Matrix Rotation'])
+        self.assertEqual(self.titles(q='rotation'), ['Matrix Rotation'])
+        self.assertEqual(self.titles(q='array'), ['Sliding Window', 'Budget Tracker'])
+
+        self.in_description.delete()
+        self.assertEqual(self.titles(q='expenses'), [])
+
+    def test_bad_requests(self):
+        for params in ({}, {'q': '!!'}, {'q': 'arr', 'difficulty': 'easy'}, {'q': 'arr', 'limit': 'x'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+
+class ProgressTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.problem = Problem.objects.create(
+            title='Echo', description='Echo the input.', difficulty='BEG',
+            test_cases=[{'input': '1', 'output': '1'}],
+        )
+
+    def submit(self, program, language='python', code='print(input())'):
+        with fake_executor(program):
+            return self.post('/api/execute/', {
+                'problem_id': self.problem.id, 'code': code, 'language': language, 'clerk_id': 'user-1',
+            })
+
+    def test_passes_are_recorded_once_per_problem(self):
+        self.submit(FakeProgram(output='nope'), code='print(0)')
+        self.assertFalse(UserProblemProgress.objects.exists())
+
+        self.submit(FakeProgram())
+        progress = UserProblemProgress.objects.get()
+        self.assertEqual((progress.user.username, progress.problem, progress.attempts), ('user-1', self.problem, 1))
+        self.assertEqual(progress.best_language, 'python')
+        first_solved_at = progress.first_solved_at
+
+        self.submit(FakeProgram(), language='c', code='int main() {}')
+        progress.refresh_from_db()
+        self.assertEqual((progress.attempts, progress.best_language), (2, 'c'))
+        self.assertEqual(progress.first_solved_at, first_solved_at)
+
+        self.assertEqual(self.client.get('/api/progress/', {'clerk_id': 'user-1'}).json(), {'completed': [self.problem.id]})
+        self.assertEqual(self.client.get('/api/progress/', {'clerk_id': 'user-2'}).json(), {'completed': []})
+
+
+class MigrationTestCase(TransactionTestCase):
+    """Migrates to ``migrate_from`` and back to the latest state afterwards."""
+    migrate_from = None
+    migrate_to = None
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+
+class ProgressMigrationTests(MigrationTestCase):
+    migrate_from = [('challenges', '0006_problem_search')]
+    migrate_to = [('challenges', '0007_userproblemprogress')]
+
+    def test_passed_submissions_are_backfilled(self):
+        apps = self.migrate(self.migrate_from)
+        User = apps.get_model('auth', 'User')
+        Problem = apps.get_model('challenges', 'Problem')
+        Submission = apps.get_model('challenges', 'Submission')
+
+        ada, bob = User.objects.create(username='ada'), User.objects.create(username='bob')
+        first, second = (
+            Problem.objects.create(title=title, description='', difficulty='BEG', test_cases=[])
+            for title in ('First', 'Second')
+        )
+        for user, problem, language, status in (
+            (ada, first, 'python', 'Passed'),
+            (ada, first, 'c', 'Passed'),
+            (ada, second, 'python', 'Failed'),
+            (bob, second, 'java', 'Passed'),
+        ):
+            Submission.objects.create(user=user, problem=problem, code='', language=language, status=status)
+
+        apps = self.migrate(self.migrate_to)
+        UserProblemProgress = apps.get_model('challenges', 'UserProblemProgress')
+        self.assertEqual(
+            sorted(UserProblemProgress.objects.values_list('user__username', 'problem__title', 'attempts', 'best_language')),
+            [('ada', 'First', 2, 'c'), ('bob', 'Second', 1, 'java')],
+        )
+        first_pass = Submission.objects.filter(user=ada, problem=first).earliest('created_at', 'id')
+        self.assertEqual(UserProblemProgress.objects.get(user_id=ada.id).first_solved_at, first_pass.created_at)
+
+
+class BitsetTests(SimpleTestCase):
+    def test_round_trip(self):
+        ids = [0, 1, 7, 8, 9, 63, 64, 1000]
+        bits = progress.bits_from_ids(ids)
+        self.assertEqual(progress.ids_from_bits(bits), ids)
+        self.assertEqual(progress.count_bits(bits), len(ids))
+
+    def test_bit_layout(self):
+        # problem n is bit n % 8 of byte n // 8, least significant first
+        self.assertEqual(progress.bits_from_ids([0, 9]), b'\x01\x02')
+        self.assertEqual(progress.bits_from_ids([]), b'')
+
+    def test_set_and_clear(self):
+        bits = progress.set_bit(b'', 17)
+        bits = progress.set_bit(bits, 3)
+        self.assertEqual(progress.ids_from_bits(bits), [3, 17])
+        bits = progress.clear_bit(bits, 17)
+        self.assertEqual(bits, b'\x08')  # trailing zero bytes are dropped
+        self.assertEqual(progress.clear_bit(bits, 500), bits)
+
+    def test_encodings(self):
+        bits = progress.bits_from_ids([1, 2, 3, 7, 10, 11])
+        self.assertEqual(progress.encode(bits, progress.RANGES), [[1, 3], [7, 7], [10, 11]])
+        self.assertEqual(progress.encode(bits, progress.BITSET), 'jgw=')
+
+
+class ProgressBlobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='user-1')
+        self.problems = [
+            Problem.objects.create(title=f'P{n}', description='', difficulty='BEG', test_cases=[])
+            for n in range(3)
+        ]
+
+    def blob_ids(self):
+        return progress.ids_from_bits(progress.progress_blob('user-1')[0])
+
+    def test_blob_follows_progress(self):
+        for problem in self.problems:
+            save_pass(self.user, problem, '', 'python')
+        save_pass(self.user, self.problems[0], 'again', 'python')
+        ids = [problem.id for problem in self.problems]
+        self.assertEqual(self.blob_ids(), ids)
+        self.assertEqual(progress.progress_blob('user-1')[1], 3)
+
+        self.problems[1].delete()
+        self.assertEqual(self.blob_ids(), [ids[0], ids[2]])
+
+        response = self.client.get('/api/progress/', {'clerk_id': 'user-1', 'encoding': 'ranges'}).json()
+        self.assertEqual((response['count'], response['completed']), (2, [[ids[0], ids[0]], [ids[2], ids[2]]]))
+        response = self.client.get('/api/progress/', {'clerk_id': 'user-1', 'encoding': 'bitset'}).json()
+        self.assertEqual(
+            progress.ids_from_bits(base64.b64decode(response['completed'])), [ids[0], ids[2]]
+        )
+
+    def test_rebuild(self):
+        save_pass(self.user, self.problems[2], '', 'python')
+        UserProgressBlob.objects.update(bits=b'', solved_count=0)
+        self.assertEqual(progress.rebuild_blobs(), 1)
+        self.assertEqual(self.blob_ids(), [self.problems[2].id])
+
+        UserProblemProgress.objects.all().delete()
+        progress.rebuild_blobs()
+        self.assertFalse(UserProgressBlob.objects.exists())
+
+    def test_unknown_user_and_encoding(self):
+        response = self.client.get('/api/progress/', {'clerk_id': 'nobody', 'encoding': 'bitset'}).json()
+        self.assertEqual((response['count'], response['completed']), (0, ''))
+        self.assertEqual(self.client.get('/api/progress/', {'encoding': 'bits'}).status_code, 400)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.easy = Problem.objects.create(title='Easy', description='', difficulty='BEG', test_cases=[])
+        self.hard = Problem.objects.create(title='Hard', description='', difficulty='ADV', test_cases=[])
+        self.users = {name: User.objects.create(username=name) for name in ('ada', 'bob', 'cy', 'dee')}
+
+    def solve(self, name, *problems):
+        for problem in problems:
+            save_pass(self.users[name], problem, '', 'python')
+
+    def score(self, name):
+        return UserScore.objects.values_list('score', 'solved').get(user=self.users[name])
+
+    def test_points_are_credited_once(self):
+        self.solve('ada', self.easy, self.easy, self.hard, self.hard)
+        self.assertEqual(PointsLedgerEntry.objects.count(), 2)
+        self.assertEqual(self.score('ada'), (45, 2))
+
+        self.hard.delete()
+        self.assertEqual(self.score('ada'), (10, 1))
+
+    def test_ranks(self):
+        self.solve('ada', self.easy)
+        self.solve('bob', self.hard)
+        self.solve('cy', self.easy, self.hard)
+        self.solve('dee', self.easy)
+
+        data = self.client.get('/api/leaderboard/', {'clerk_id': 'dee'}).json()
+        self.assertEqual(
+            [(row['user'], row['score'], row['rank']) for row in data['top']],
+            [('cy', 45, 1), ('bob', 35, 2), ('ada', 10, 3), ('dee', 10, 3)],
+        )
+        self.assertEqual(data['me'], {'user': 'dee', 'score': 10, 'solved': 1, 'rank': 3})
+
+        data = self.client.get('/api/leaderboard/', {'limit': 1, 'clerk_id': 'nobody'}).json()
+        self.assertEqual([row['user'] for row in data['top']], ['cy'])
+        self.assertIsNone(data['me'])
+        self.assertEqual(self.client.get('/api/leaderboard/', {'limit': 'ten'}).status_code, 400)
+
+    def test_rebuild_matches_incremental_scores(self):
+        self.solve('ada', self.easy, self.hard)
+        self.solve('bob', self.hard)
+        expected = sorted(UserScore.objects.values_list('user__username', 'score', 'solved'))
+
+        PointsLedgerEntry.objects.filter(user=self.users['ada'], problem=self.easy).delete()
+        UserScore.objects.update(score=0, solved=0)
+        self.assertEqual(leaderboard.rebuild(), (1, 2))
+        self.assertEqual(sorted(UserScore.objects.values_list('user__username', 'score', 'solved')), expected)
+        self.assertEqual(leaderboard.rebuild(), (0, 2))
+
+
+@skipUnless(connection.vendor in ('sqlite', 'postgresql'), 'query plans are checked on SQLite and Postgres')
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('All hot queries use an index', out.getvalue())
+        self.assertNotIn('❌', out.getvalue())
+
+    def test_unindexed_query_fails_the_check(self):
+        queries = check_query_plans.HOT_QUERIES + [
+            ('submissions by language', lambda: Submission.objects.filter(language='c')),
+        ]
+        out = StringIO()
+        with mock.patch.object(check_query_plans, 'HOT_QUERIES', queries):
+            with self.assertRaisesMessage(CommandError, '1 hot queries regressed to a full scan: submissions by language'):
+                call_command('check_query_plans', stdout=out)
+        self.assertIn('❌ submissions by language: full scan', out.getvalue())
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite plan format')
+    def test_full_scan_detection(self):
+        plan = '\n'.join([
+            '2 0 0 SCAN challenges_submission',
+            '3 0 0 SCAN challenges_problem USING INDEX problem_difficulty_idx',
+            '4 0 0 SEARCH challenges_userscore USING INDEX userscore_rank_idx (score>?)',
+        ])
+        self.assertEqual(check_query_plans.full_scans(plan), ['SCAN challenges_submission'])
+
+
+class CodeBlobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ada')
+        self.problem = Problem.objects.create(title='One', description='', difficulty='BEG', test_cases=[])
+
+    def submit(self, code):
+        return Submission.objects.create(user=self.user, problem=self.problem, code=code, language='python')
+
+    def test_identical_code_is_stored_once(self):
+        code = 'print(input())\n' * 50
+        first, second = self.submit(code), self.submit(code)
+        self.submit(code.replace('\n', '\r\n'))
+        self.submit('')
+
+        self.assertEqual(first.code_blob_id, second.code_blob_id)
+        self.assertEqual(CodeBlob.objects.count(), 3)
+        blob = CodeBlob.objects.get(pk=first.code_blob_id)
+        self.assertEqual((blob.text, blob.size), (code, len(code)))
+        self.assertLess(len(bytes(blob.data)), blob.size)
+
+        self.assertEqual(Submission.objects.get(pk=second.pk).code, code)
+        self.assertEqual(Submission.objects.get(pk=first.pk).code_blob.submissions.count(), 2)
+
+    def test_reassigning_code(self):
+        submission = self.submit('a = 1')
+        submission.code = 'a = 2'
+        submission.save()
+        submission = Submission.objects.get(pk=submission.pk)
+        self.assertEqual(submission.code, 'a = 2')
+        self.assertEqual(submission.code_blob_id, CodeBlob.hash_code('a = 2'))
+
+    def test_serializer(self):
+        data = SubmissionSerializer(self.submit('  x = 1  ')).data
+        self.assertEqual(data['code'], '  x = 1  ')
+        self.assertEqual(data['code_hash'], CodeBlob.hash_code('  x = 1  '))
+
+
+class CodeBlobMigrationTests(MigrationTestCase):
+    migrate_from = [('challenges', '0011_codeblob')]
+    migrate_to = [('challenges', '0013_submission_code_blob_required')]
+
+    def test_code_moves_to_blobs_and_back(self):
+        apps = self.migrate(self.migrate_from)
+        user = apps.get_model('auth', 'User').objects.create(username='ada')
+        problem = apps.get_model('challenges', 'Problem').objects.create(
+            title='One', description='', difficulty='BEG', test_cases=[],
+        )
+        Submission = apps.get_model('challenges', 'Submission')
+        sources = ['print(1)', 'print(2)', 'print(1)', '', 'print(1)']
+        ids = [
+            Submission.objects.create(user=user, problem=problem, code=code, language='python', status='Passed').id
+            for code in sources
+        ]
+
+        apps = self.migrate(self.migrate_to)
+        CodeBlob = apps.get_model('challenges', 'CodeBlob')
+        Submission = apps.get_model('challenges', 'Submission')
+        self.assertEqual(CodeBlob.objects.count(), 3)
+        for pk, code in zip(ids, sources):
+            blob = Submission.objects.select_related('code_blob').get(pk=pk).code_blob
+            self.assertEqual(blob.hash, hashlib.sha256(code.encode()).hexdigest())
+            self.assertEqual(zlib.decompress(bytes(blob.data)).decode(), code)
+
+        apps = self.migrate(self.migrate_from)
+        Submission = apps.get_model('challenges', 'Submission')
+        self.assertEqual([Submission.objects.get(pk=pk).code for pk in ids], sources)
+
+
+class ImportProblemsTests(TempDirMixin, TestCase):
+    FIELDS = [
+        'title', 'description', 'difficulty', 'real_life_context', 'explanation',
+        'starter_code', 'solutions', 'test_cases', 'tags',
+    ]
+
+    def setUp(self):
+        super().setUp()
+        snapshots = mock.patch.dict(catalogue._snapshots, clear=True)
+        snapshots.start()
+        self.addCleanup(snapshots.stop)
+        self.write('problems_beginner.json', json.dumps([
+            problem_entry('Alpha', tags=['arrays'], real_life_context='Shop tills.'),
+            problem_entry('Beta', explanation='Because.'),
+            {'title': 'No description'},
+            problem_entry('Alpha'),
+            problem_entry('Gamma', difficulty='PRO'),
+        ]))
+        self.write('problems_pro.json', ''.join(
+            json.dumps(problem_entry(f'Pro {n}')) + '\n' for n in range(5)
+        ))
+
+    def run_import(self, *args):
+        out = StringIO()
+        with mock.patch('challenges.management.commands.import_problems.DATA_DIR', self.tmp):
+            call_command('import_problems', *args, stdout=out)
+        return out.getvalue()
+
+    def imported(self):
+        return list(Problem.objects.order_by('id').values_list(*self.FIELDS))
+
+    def test_bulk_matches_the_sequential_import(self):
+        output = self.run_import('all')
+        self.assertIn('7 problems imported', output)
+        expected = self.imported()
+        Problem.objects.all().delete()
+
+        output = self.run_import('all', '--bulk', '--batch-size', '2')
+        self.assertIn('7 problems imported', output)
+        self.assertIn('1 duplicates skipped', output)
+        self.assertIn('1 errors', output)
+        self.assertIn('Batch 4: 1 problems inserted', output)
+        self.assertEqual(self.imported(), expected)
+
+    def test_workers_match_the_sequential_import(self):
+        self.run_import('all')
+        expected = self.imported()
+        Problem.objects.all().delete()
+
+        output = self.run_import('all', '--workers', '2', '--batch-size', '2')
+        self.assertIn('7 problems imported', output)
+        self.assertIn('1 errors', output)
+        self.assertEqual(self.imported(), expected)
+
+    def test_bulk_refreshes_derived_data(self):
+        self.assertEqual(self.client.get('/api/problems/').json(), [])
+        self.run_import('pro', '--bulk')
+        self.assertEqual(len(self.client.get('/api/problems/').json()), 5)
+        results = self.client.get('/api/problems/search/', {'q': 'pro'}).json()['results']
+        self.assertEqual(len(results), 5)
+
+    def test_bulk_skips_existing_titles(self):
+        Problem.objects.create(title='Beta', description='Kept.', difficulty='BEG', test_cases=[])
+        output = self.run_import('beginner', '--bulk')
+        self.assertIn('📂 problems_beginner.json: 1 new, 2 duplicates, 1 invalid', output)
+        self.assertEqual(Problem.objects.get(title='Beta').description, 'Kept.')
+
+    def test_bulk_dry_run_writes_nothing(self):
+        output = self.run_import('all', '--bulk', '--dry-run')
+        self.assertIn('7 problems validated', output)
+        self.assertFalse(Problem.objects.exists())
+
+    def test_bulk_rolls_back_a_broken_file_only(self):
+        self.write('problems_beginner.json', json.dumps([problem_entry('Alpha')])[:-1] + ', {"title": ')
+        output = self.run_import('all', '--bulk', '--batch-size', '1')
+        self.assertIn('Invalid JSON in problems_beginner.json', output)
+        self.assertEqual(Problem.objects.count(), 5)
+        self.assertFalse(Problem.objects.filter(title='Alpha').exists())
+
+
+class SyncProblemsTests(TempDirMixin, TestCase):
+    def sync(self, entries, *args):
+        path = os.path.join(self.tmp, 'problems_beginner.json')
+        with open(path, 'w') as f:
+            json.dump(entries, f)
+        out = StringIO()
+        with mock.patch('challenges.management.commands.sync_problems.DATA_DIR', self.tmp):
+            call_command('sync_problems', 'beginner', *args, stdout=out)
+        return out.getvalue()
+
+    def test_added_updated_unchanged_and_pruned(self):
+        self.sync([problem_entry('A'), problem_entry('B'), problem_entry('C')])
+        self.assertEqual(set(Problem.objects.values_list('title', flat=True)), {'A', 'B', 'C'})
+        unchanged_hash = Problem.objects.get(title='A').content_hash
+
+        output = self.sync(
+            [problem_entry('A'), problem_entry('B', description='New text.'), problem_entry('D')],
+            '--prune',
+        )
+
+        self.assertIn('1 added', output)
+        self.assertIn('1 updated', output)
+        self.assertIn('1 unchanged', output)
+        self.assertIn('1 removed', output)
+        self.assertEqual(set(Problem.objects.values_list('title', flat=True)), {'A', 'B', 'D'})
+        self.assertEqual(Problem.objects.get(title='B').description, 'New text.')
+        self.assertEqual(Problem.objects.get(title='A').content_hash, unchanged_hash)
+        b = Problem.objects.get(title='B')
+        self.assertEqual(b.content_hash, b.compute_content_hash())
+
+    def test_unchanged_sync_does_not_write(self):
+        entries = [problem_entry('A'), problem_entry('B')]
+        self.sync(entries)
+        with self.assertNumQueries(1):
+            output = self.sync(entries)
+        self.assertIn('2 unchanged', output)
+
+    def test_dry_run_writes_nothing(self):
+        output = self.sync([problem_entry('A')], '--dry-run')
+        self.assertIn('1 added', output)
+        self.assertFalse(Problem.objects.exists())
+
+    def test_without_prune_nothing_is_removed(self):
+        self.sync([problem_entry('A'), problem_entry('B')])
+        self.sync([problem_entry('A')])
+        self.assertEqual(Problem.objects.count(), 2)
+
+    def test_updates_reach_search_and_the_catalogue(self):
+        snapshots = mock.patch.dict(catalogue._snapshots, clear=True)
+        snapshots.start()
+        self.addCleanup(snapshots.stop)
+        self.sync([problem_entry('A')])
+        self.assertEqual(self.client.get('/api/problems/').json()[0]['description'], 'Solve A.')
+
+        self.sync([problem_entry('A', description='Count the zebras.')])
+        self.assertEqual(self.client.get('/api/problems/').json()[0]['description'], 'Count the zebras.')
+        results = self.client.get('/api/problems/search/', {'q': 'zebra'}).json()['results']
+        self.assertEqual([problem['title'] for problem in results], ['A'])
+
+
+def tiny_reads(size):
+    """Make the streaming parser read ``size`` characters at a time."""
+    more = ingest._Stream.more
+    return mock.patch.object(ingest._Stream, 'more', lambda self, _size=None: more(self, size))
+
+
+class StreamingParserTests(TempDirMixin, SimpleTestCase):
+    def test_array_and_json_lines_give_the_same_entries(self):
+        entries = [problem_entry(f'P{n}', tags=['a', 'b'], explanation='x' * n) for n in range(20)]
+        array = self.write('array.json', json.dumps(entries, indent=2))
+        lines = self.write('lines.jsonl', ''.join(json.dumps(entry) + '\n' for entry in entries))
+
+        self.assertEqual(list(ingest.iter_problems(array)), entries)
+        self.assertEqual(list(ingest.iter_problems(lines)), entries)
+
+    def test_values_split_across_reads(self):
+        values = [-1.5e+10, 12345, 0.25, 'café \\"quoted\\"', '€', True, None, {'n': -7e-3}]
+        path = self.write('values.json', json.dumps(values, ensure_ascii=True))
+        for size in range(1, 8):
+            with self.subTest(read_size=size), tiny_reads(size):
+                self.assertEqual(list(ingest.iter_problems(path)), values)
+
+    def test_number_at_the_end_of_a_read(self):
+        path = self.write('numbers.jsonl', '-1.5e+10\n42\n')
+        with tiny_reads(5):
+            self.assertEqual(list(ingest.iter_problems(path)), [-1.5e10, 42])
+
+    def test_trailing_garbage_after_array(self):
+        path = self.write('garbage.json', json.dumps([problem_entry('A')]) + ' oops')
+        with self.assertRaises(ValueError):
+            list(ingest.iter_problems(path))
+
+    def test_missing_separator(self):
+        path = self.write('separator.json', '[{"title": "A"} {"title": "B"}]')
+        with self.assertRaises(ValueError):
+            list(ingest.iter_problems(path))
+
+    def test_syntax_error_fails_before_reading_the_rest(self):
+        # the error is in the first entry: the parser must not read to the end first
+        path = self.write('broken.jsonl', '{"title": tru}\n' + json.dumps(problem_entry('B')) * 1000)
+        reads = []
+        more = ingest._Stream.more
+
+        def counting_more(stream, size=None):
+            reads.append(size)
+            return more(stream, 64)
+
+        with mock.patch.object(ingest._Stream, 'more', counting_more):
+            with self.assertRaises(ValueError):
+                list(ingest.iter_problems(path))
+        self.assertLess(len(reads), 5)
+
+    def test_entries_before_an_error_are_yielded(self):
+        path = self.write('partial.jsonl', json.dumps(problem_entry('A')) + '\n{"title": \n')
+        seen = []
+        with self.assertRaises(ValueError):
+            for entry in ingest.iter_problems(path):
+                seen.append(entry['title'])
+        self.assertEqual(seen, ['A'])
+
+    def test_limit_stops_reading(self):
+        path = self.write('many.jsonl', ''.join(json.dumps(problem_entry(f'P{n}')) + '\n' for n in range(10)))
+        self.assertEqual([entry['title'] for entry in ingest.iter_problems(path, limit=3)], ['P0', 'P1', 'P2'])
+
+    def test_gzip_is_detected(self):
+        path = self.write('lines.jsonl.gz', gzip.compress(json.dumps(problem_entry('A')).encode()), 'wb')
+        self.assertEqual([entry['title'] for entry in ingest.iter_problems(path)], ['A'])
+
+    def test_difficulty_of_requested_file(self):
+        self.assertEqual(ingest.difficulty_of({}, 'BEG'), 'BEG')
+        self.assertEqual(ingest.difficulty_of({'difficulty': 'PRO'}, None), 'PRO')
+        self.assertIsNone(ingest.difficulty_of({}, None))
+        self.assertTrue(ingest.other_difficulty({'difficulty': 'PRO'}, 'BEG'))
+        self.assertFalse(ingest.other_difficulty({'difficulty': 'PRO'}, None))
+
+
+class ParallelIngestTests(TempDirMixin, SimpleTestCase):
+    def write_lines(self, name, entries):
+        return self.write(name, ''.join(json.dumps(entry) + '\n' for entry in entries))
+
+    def titles(self, chunks):
+        titles, invalid = [], 0
+        for problems, bad in chunks:
+            titles += [problem.title for problem in problems]
+            invalid += bad
+        return titles, invalid
+
+    def test_split_file_cuts_at_line_ends(self):
+        path = self.write_lines('lines.jsonl', [problem_entry(f'P{n}') for n in range(30)])
+        ranges = ingest.split_file(path, chunk_bytes=500)
+        self.assertGreater(len(ranges), 3)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], os.path.getsize(path))
+        with open(path, 'rb') as f:
+            data = f.read()
+        for (start, end), (next_start, _end) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(data[end - 1:end], b'\n')
+
+    def test_files_that_cannot_be_split(self):
+        entries = [problem_entry(f'P{n}') for n in range(30)]
+        array = self.write('array.json', json.dumps(entries))
+        gzipped = self.write('lines.jsonl.gz', gzip.compress(json.dumps(entries[0]).encode()), 'wb')
+        lines = self.write_lines('lines.jsonl', entries)
+
+        self.assertEqual(ingest.split_file(array, chunk_bytes=500), [(0, None)])
+        self.assertIsNone(ingest.pool_ranges(array, chunk_bytes=500))  # streamed by the writer
+        self.assertEqual(ingest.pool_ranges(array), [(0, None)])  # small enough for one worker
+        self.assertIsNone(ingest.pool_ranges(gzipped))
+        self.assertIsNone(ingest.pool_ranges(lines, limit=3, chunk_bytes=500))
+
+    def test_parallel_chunks_match_a_sequential_read(self):
+        entries = [problem_entry(f'P{n}') for n in range(40)]
+        entries[7] = {'title': 'No description'}
+        files = [
+            (self.write_lines('one.jsonl', entries), 'BEG'),
+            (self.write('two.json', json.dumps(entries[:5])), 'ADV'),
+            (self.write_lines('three.jsonl', [problem_entry(f'Q{n}') for n in range(25)]), 'PRO'),
+        ]
+        expected = [(path, self.titles(ingest.iter_chunks(path, difficulty, 4))) for path, difficulty in files]
+        self.assertEqual(
+            [(path, self.titles(chunks)) for path, chunks in ingest.parallel_chunks(files, 2, 4, chunk_bytes=500)],
+            expected,
+        )
+
+    def test_broken_part_fails_only_its_file(self):
+        entries = [json.dumps(problem_entry(f'P{n}')) for n in range(30)]
+        entries[20] = '{"title": tru}'
+        files = [
+            (self.write('broken.jsonl', '\n'.join(entries) + '\n'), 'BEG'),
+            (self.write_lines('fine.jsonl', [problem_entry(f'Q{n}') for n in range(30)]), 'BEG'),
+        ]
+        results = ingest.parallel_chunks(files, 2, 4, chunk_bytes=500)
+        _path, chunks = next(results)
+        with self.assertRaises(ValueError):
+            self.titles(chunks)
+        _path, chunks = next(results)
+        self.assertEqual(self.titles(chunks), ([f'Q{n}' for n in range(30)], 0))
+
+
+class ExportImportTests(TempDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        shared = {'python': 'def solve():\n    pass\n'}
+        Problem.objects.create(title='One', description='d1', difficulty='BEG', starter_code=shared,
+                               test_cases=[{'input': '1', 'output': '2'}], tags=['math'])
+        Problem.objects.create(title='Two', description='d2', difficulty='PRO', starter_code=shared,
+                               real_life_context='ctx', solutions={'python': 'print(2)'})
+        Problem.objects.create(title='Three', description='d3', difficulty='INT',
+                               starter_code={'c': 'int main() {}'}, explanation='why')
+
+    def hashes(self):
+        return dict(Problem.objects.values_list('title', 'content_hash'))
+
+    def export(self, name):
+        path = os.path.join(self.tmp, name)
+        call_command('export_problems', path, stdout=StringIO())
+        return path
+
+    def test_round_trip(self):
+        before = self.hashes()
+        for name, args in [
+            ('dump.jsonl', ['--bulk']), ('dump.jsonl.gz', ['--bulk']), ('dump.jsonl.gz', []),
+            ('dump.jsonl', ['--workers', '2']),
+        ]:
+            with self.subTest(name=name, args=args):
+                path = self.export(name)
+                Problem.objects.all().delete()
+                call_command('import_problems', '--file', path, *args, stdout=StringIO())
+                self.assertEqual(self.hashes(), before)
+
+    def test_starter_code_written_once(self):
+        path = self.export('dump.jsonl')
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[0]['format'], ingest.EXPORT_FORMAT)
+        self.assertEqual(sum(1 for record in records if 'template' in record), 2)
+
+    def test_single_difficulty_import_of_a_full_dump(self):
+        path = self.export('dump.jsonl')
+        Problem.objects.all().delete()
+        for args in (['--bulk'], []):
+            with self.subTest(args=args):
+                out = StringIO()
+                call_command('import_problems', 'beginner', '--file', path, *args, stdout=out)
+                self.assertEqual(list(Problem.objects.values_list('title', flat=True)), ['One'])
+                self.assertIn('0 errors', out.getvalue())
+                Problem.objects.all().delete()
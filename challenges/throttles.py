@@ -0,0 +1,68 @@
+import math
+
+from rest_framework.throttling import SimpleRateThrottle
+
+RUN = 'run'
+SUBMIT = 'submit'
+
+
+def execution_mode(data):
+    """'run' (samples only) or 'submit' (full judging); None if invalid."""
+    mode = data.get('mode') or SUBMIT
+    if not isinstance(mode, str):
+        return None
+    mode = mode.lower()
+    return mode if mode in (RUN, SUBMIT) else None
+
+
+class ExecuteModeThrottle(SimpleRateThrottle):
+    """
+    Rate-limits code execution per user, with a cheaper bucket for
+    "Run samples" (``execute-run``) than for submissions (``execute-submit``).
+    Rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'].
+
+    Clients are told apart by authenticated user, else by IP: never by a
+    body field such as ``clerk_id``, which a caller could change per request.
+    """
+    scope = 'execute-submit'
+
+    def allow_request(self, request, view):
+        return self.allow(request, execution_mode(request.data))
+
+    def allow(self, request, mode):
+        """
+        ``allow_request()`` for an already parsed mode. The async views are
+        not DRF views and call it directly, sharing the same buckets.
+        """
+        self.scope = 'execute-run' if mode == RUN else 'execute-submit'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, None)
+
+    def detail(self):
+        """The message DRF sends with a 429."""
+        wait = self.wait()
+        if wait is None:
+            return 'Request was throttled.'
+        return f'Request was throttled. Expected available in {math.ceil(wait)} seconds.'
+
+    def client_ident(self, request):
+        """``user-<pk>`` for an authenticated user, else the client IP."""
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'user-{user.pk}'
+        return self.get_ident(request)
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.client_ident(request)}
+
+
+class SubmitThrottle(ExecuteModeThrottle):
+    """
+    ExecuteModeThrottle for endpoints that always judge the full test set
+    (the judge queue): counted in the ``execute-submit`` bucket whatever
+    ``mode`` the body carries.
+    """
+
+    def allow_request(self, request, view):
+        return self.allow(request, SUBMIT)
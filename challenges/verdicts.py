@@ -0,0 +1,280 @@
+"""
+Verdict cache: skip re-judging byte-identical resubmissions.
+
+Keys are content hashes of (problem test set, language, code),
+so editing a problem's ``test_cases`` automatically makes old verdicts
+unreachable. Backends that can be enumerated also drop the stale entries
+when a ``Problem`` is saved or deleted (see ``challenges.signals``).
+
+Only deterministic verdicts are stored: results killed by the wall-clock
+limit or failed by the runner (marked ``"transient"`` by ``build_result``
+until ``store_verdict`` removes it) are judged again.
+
+Configured with ``settings.VERDICT_CACHE``::
+
+    VERDICT_CACHE = {'BACKEND': 'memory', 'OPTIONS': {'MAX_ENTRIES': 5000}}
+
+``BACKEND`` is ``'memory'`` (per-process LRU), ``'django'`` (a Django
+cache alias), ``'database'`` (the VerdictCacheEntry table), a dotted path
+to a ``BaseVerdictCache`` subclass, or ``None`` to disable caching.
+"""
+import hashlib
+import json
+import random
+import threading
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError
+from django.utils.module_loading import import_string
+
+from .judge import ajudge, judge
+
+
+def test_set_hash(test_cases):
+    """Stable content hash of a problem's test cases."""
+    payload = json.dumps(test_cases, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def normalize_code(code):
+    """
+    Ignore CRLF line endings only: any other whitespace can change what the
+    code does (a space after a line-continuation backslash, the contents
+    of a multi-line string).
+    """
+    return (code or '').replace('\r\n', '\n')
+
+
+def code_hash(code):
+    return hashlib.sha256(normalize_code(code).encode('utf-8')).hexdigest()
+
+
+# Bumped when the key derivation changes, so stored verdicts are not reused
+KEY_VERSION = 'v2'
+
+
+def verdict_key(test_hash, language, code, fail_fast):
+    parts = [KEY_VERSION, test_hash, (language or '').lower(), code_hash(code), 'ff' if fail_fast else 'all']
+    return hashlib.sha256(':'.join(parts).encode('utf-8')).hexdigest()
+
+
+class BaseVerdictCache:
+    """Backend interface plus thread-safe hit/miss counters."""
+
+    def __init__(self, **options):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, problem_id, test_hash, language):
+        raise NotImplementedError
+
+    def invalidate_problem(self, problem_id, current_hash=None):
+        """Drop entries for ``problem_id`` not matching ``current_hash``."""
+
+    def stats(self):
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def _get(self, key):
+        raise NotImplementedError
+
+
+class MemoryVerdictCache(BaseVerdictCache):
+    """Per-process LRU cache."""
+
+    def __init__(self, max_entries=5000, **options):
+        super().__init__(**options)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry['value']
+
+    def set(self, key, value, problem_id, test_hash, language):
+        with self._lock:
+            self._entries[key] = {"value": value, "problem_id": problem_id, "test_hash": test_hash}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_problem(self, problem_id, current_hash=None):
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry['problem_id'] == problem_id and entry['test_hash'] != current_hash
+            ]
+            for key in stale:
+                del self._entries[key]
+
+
+class DjangoVerdictCache(BaseVerdictCache):
+    """Stores verdicts in a configured Django cache (e.g. shared Redis/DB)."""
+
+    def __init__(self, alias='default', timeout=24 * 60 * 60, **options):
+        super().__init__(**options)
+        self.alias = alias
+        self.timeout = timeout
+
+    def _get(self, key):
+        return caches[self.alias].get(f'verdict:{key}')
+
+    def set(self, key, value, problem_id, test_hash, language):
+        caches[self.alias].set(f'verdict:{key}', value, self.timeout)
+
+
+class DatabaseVerdictCache(BaseVerdictCache):
+    """Stores verdicts in the VerdictCacheEntry table, shared by all workers."""
+
+    def __init__(self, max_entries=100000, cull_frequency=0.01, **options):
+        super().__init__(**options)
+        self.max_entries = max_entries
+        self.cull_frequency = cull_frequency
+
+    def _get(self, key):
+        from .models import VerdictCacheEntry
+        return VerdictCacheEntry.objects.filter(key=key).values('results', 'all_passed').first()
+
+    def set(self, key, value, problem_id, test_hash, language):
+        from .models import VerdictCacheEntry
+        try:
+            VerdictCacheEntry.objects.update_or_create(
+                key=key,
+                defaults={
+                    'problem_id': problem_id,
+                    'test_set_hash': test_hash,
+                    'language': language,
+                    'results': value['results'],
+                    'all_passed': value['all_passed'],
+                },
+            )
+        except IntegrityError:
+            # Another worker stored the same verdict concurrently
+            pass
+        if random.random() < self.cull_frequency:
+            self.cull()
+
+    def cull(self):
+        """Delete the oldest entries beyond ``max_entries``."""
+        from .models import VerdictCacheEntry
+        cutoff = list(
+            VerdictCacheEntry.objects.order_by('-created_at')
+            .values_list('created_at', flat=True)[self.max_entries:self.max_entries + 1]
+        )
+        if cutoff:
+            VerdictCacheEntry.objects.filter(created_at__lte=cutoff[0]).delete()
+
+    def invalidate_problem(self, problem_id, current_hash=None):
+        from .models import VerdictCacheEntry
+        VerdictCacheEntry.objects.filter(problem_id=problem_id).exclude(test_set_hash=current_hash).delete()
+
+
+BACKENDS = {
+    'memory': MemoryVerdictCache,
+    'django': DjangoVerdictCache,
+    'database': DatabaseVerdictCache,
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_verdict_cache():
+    """Return the configured verdict cache, or None when disabled."""
+    global _cache
+    config = settings.VERDICT_CACHE
+    if not config or not config.get('BACKEND'):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            backend = config['BACKEND']
+            cache_class = BACKENDS.get(backend) or import_string(backend)
+            options = {name.lower(): value for name, value in config.get('OPTIONS', {}).items()}
+            _cache = cache_class(**options)
+        return _cache
+
+
+def get_cached_verdict(test_cases, code, language, fail_fast):
+    """Return the stored {"results", "all_passed"} or None."""
+    cache = get_verdict_cache()
+    if cache is None:
+        return None
+    return cache.get(verdict_key(test_set_hash(test_cases), language, code, fail_fast))
+
+
+def store_verdict(problem_id, test_cases, code, language, fail_fast, results, all_passed):
+    """
+    Cache a verdict, unless a result was transient (a timeout or runner
+    error). Removes the internal ``transient`` markers from ``results``,
+    which are then ready to return to the client.
+    """
+    transient = False
+    for result in results:
+        transient = result.pop('transient', False) or transient
+    cache = get_verdict_cache()
+    if cache is None or transient:
+        return
+    test_hash = test_set_hash(test_cases)
+    key = verdict_key(test_hash, language, code, fail_fast)
+    cache.set(key, {"results": results, "all_passed": all_passed}, problem_id, test_hash, language)
+
+
+def cached_judge(problem_id, test_cases, code, language, fail_fast=None, on_result=None):
+    """
+    ``judge()`` with the verdict cache in front of it.
+
+    Returns (results, all_passed, cache_hit). On a hit, ``on_result`` is
+    called for every stored result in order.
+    """
+    if fail_fast is None:
+        fail_fast = settings.JUDGE_FAIL_FAST
+
+    cached = get_cached_verdict(test_cases, code, language, fail_fast)
+    if cached is not None:
+        if on_result is not None:
+            for idx, result in enumerate(cached['results']):
+                on_result(idx, result)
+        return cached['results'], cached['all_passed'], True
+
+    results, all_passed = judge(code, language, test_cases, fail_fast, on_result)
+    store_verdict(problem_id, test_cases, code, language, fail_fast, results, all_passed)
+    return results, all_passed, False
+
+
+async def acached_judge(problem_id, test_cases, code, language, fail_fast=None):
+    """Async ``cached_judge()`` for the ASGI views."""
+    if fail_fast is None:
+        fail_fast = settings.JUDGE_FAIL_FAST
+
+    # Cache backends may touch the database, so they run in a thread
+    cached = await sync_to_async(get_cached_verdict)(test_cases, code, language, fail_fast)
+    if cached is not None:
+        return cached['results'], cached['all_passed'], True
+
+    results, all_passed = await ajudge(code, language, test_cases, fail_fast)
+    await sync_to_async(store_verdict)(problem_id, test_cases, code, language, fail_fast, results, all_passed)
+    return results, all_passed, False
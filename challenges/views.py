@@ -1,51 +1,204 @@
-import requests
-from django.contrib.auth.models import User
+import json
+import logging
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.generics import ListAPIView, RetrieveAPIView
+from rest_framework.pagination import CursorPagination
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import Problem, Submission
-from .serializers import ProblemSerializer
+from . import leaderboard
+from .catalogue import (
+    FULL, SHAPES, accepts_gzip, current_state, get_snapshot, parse_difficulty,
+    snapshot_content, snapshot_etag, summary_queryset,
+)
+from .conditional import not_modified, set_validators
+from .execution import ExecutionError
+from .jobs import QueueFull, enqueue, queue_position, queue_stats
+from .judge import client_result, collect_results, iter_judge
+from .models import JudgeJob, Problem
+from .progress import ENCODINGS, IDS, compact_progress
+from .search import search_ids, search_terms
+from .serializers import ProblemSerializer, ProblemSummarySerializer
+from .submissions import PROGRESS_VERSION, progress_etag, record_pass, solved_problems
+from .throttles import RUN, SUBMIT, ExecuteModeThrottle, SubmitThrottle, execution_mode
+from .verdicts import cached_judge, get_cached_verdict, store_verdict
+
+logger = logging.getLogger(__name__)
 
 
 class UserProgressAPI(APIView):
     """
     API to fetch user's completed problem IDs.
+
+    ``?encoding=bitset`` or ``?encoding=ranges`` returns the compact forms
+    described in ``progress.py`` instead of a list of ids.
     """
     def get(self, request):
         clerk_id = request.query_params.get('clerk_id')
+        encoding = request.query_params.get('encoding', IDS)
+        if encoding not in ENCODINGS:
+            return Response({"error": "encoding must be 'ids', 'bitset' or 'ranges'"}, status=400)
+
+        if encoding != IDS:
+            payload, etag, last_modified = compact_progress(clerk_id, encoding)
+            response = not_modified(request, etag, last_modified, private=True)
+            if response is None:
+                response = set_validators(Response(payload), etag, last_modified, private=True)
+            return response
         
         if not clerk_id:
             return Response({"completed": []})
-        
+
+        # Cheap aggregate first: unchanged progress is answered with a 304
+        version = solved_problems(clerk_id).aggregate(**PROGRESS_VERSION)
+        etag = progress_etag(version)
+        response = not_modified(request, etag, version['last_modified'], private=True)
+        if response is not None:
+            return response
+
+        # One row per solved problem, no submission history scan
+        completed_ids = list(
+            solved_problems(clerk_id)
+            .values_list('problem_id', flat=True)
+        )
+        response = Response({"completed": completed_ids})
+        return set_validators(response, etag, version['last_modified'], private=True)
+
+class LeaderboardAPI(APIView):
+    """
+    Top scorers, plus the caller's own rank when ``?clerk_id=`` is given.
+
+    ``?limit=`` sets the size of the top list (default 10, max 100).
+    """
+    MAX_LIMIT = 100
+
+    def get(self, request):
         try:
-            user = User.objects.get(username=clerk_id)
-            # Get unique problem IDs that user has passed
-            completed_ids = list(
-                Submission.objects.filter(user=user, status="Passed")
-                .values_list('problem_id', flat=True)
-                .distinct()
-            )
-            return Response({"completed": completed_ids})
-        except User.DoesNotExist:
-            return Response({"completed": []})
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), self.MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=400)
+
+        clerk_id = request.query_params.get('clerk_id')
+        return Response({
+            "top": leaderboard.top(limit),
+            "me": leaderboard.rank_of(clerk_id) if clerk_id else None,
+        })
 
 class ProblemListAPI(APIView):
     """
     API to fetch the list of all problems for the frontend.
+
+    Served from a pre-serialized snapshot (see ``catalogue.py``);
+    ``?difficulty=`` filters by level and ``?view=summary`` returns the
+    slim catalogue entries instead of full problems.
     """
     def get(self, request):
-        problems = Problem.objects.all()
-        serializer = ProblemSerializer(problems, many=True)
-        return Response(serializer.data)
+        difficulty = request.query_params.get('difficulty')
+        if difficulty and parse_difficulty(difficulty) is None:
+            return Response({"error": "Unknown difficulty"}, status=400)
+        shape = request.query_params.get('view', FULL)
+        if shape not in SHAPES:
+            return Response({"error": "view must be 'full' or 'summary'"}, status=400)
+
+        # The version check is one primary-key lookup; a 304 skips the snapshot
+        state = current_state()
+        etag = snapshot_etag(state[0], parse_difficulty(difficulty), shape, accepts_gzip(request))
+        response = not_modified(request, etag, state[1])
+        if response is not None:
+            return response
+
+        snapshot = get_snapshot(parse_difficulty(difficulty), shape, state)
+        body, headers = snapshot_content(request, snapshot)
+        response = HttpResponse(body, content_type='application/json', headers=headers)
+        etag = snapshot_etag(snapshot.version, parse_difficulty(difficulty), shape, accepts_gzip(request))
+        return set_validators(response, etag, snapshot.updated_at)
+
+
+class CataloguePagination(CursorPagination):
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class ProblemCatalogueAPI(ListAPIView):
+    """
+    Lightweight, cursor-paginated problem catalogue.
+
+    Only id, title, difficulty and a short description excerpt are read
+    from the database; ``?difficulty=`` filters by level.
+    """
+    serializer_class = ProblemSummarySerializer
+    pagination_class = CataloguePagination
+
+    def list(self, request, *args, **kwargs):
+        difficulty = request.query_params.get('difficulty')
+        if difficulty and parse_difficulty(difficulty) is None:
+            return Response({"error": "Unknown difficulty"}, status=400)
+        return super().list(request, *args, **kwargs)
+
+    def get_queryset(self):
+        problems = summary_queryset()
+        difficulty = parse_difficulty(self.request.query_params.get('difficulty'))
+        if difficulty:
+            problems = problems.filter(difficulty=difficulty)
+        return problems
+
+
+class ProblemSearchAPI(APIView):
+    """
+    Full-text problem search (see ``search.py``).
+
+    ``?q=`` matches title, tags, real-life context and description, each
+    word as a prefix; results are ranked best first. Supports
+    ``?difficulty=``, ``?limit=`` (max 50) and ``?offset=``.
+    """
+    MAX_LIMIT = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        if not search_terms(query):
+            return Response({"error": "q is required"}, status=400)
+        difficulty = request.query_params.get('difficulty')
+        if difficulty and parse_difficulty(difficulty) is None:
+            return Response({"error": "Unknown difficulty"}, status=400)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.MAX_LIMIT)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+        except ValueError:
+            return Response({"error": "limit and offset must be integers"}, status=400)
+
+        ids = search_ids(query, parse_difficulty(difficulty), limit, offset)
+        problems = summary_queryset().in_bulk(ids)
+        serializer = ProblemSummarySerializer([problems[pk] for pk in ids if pk in problems], many=True)
+        return Response({"query": query, "results": serializer.data})
+
+
+class ProblemDetailAPI(RetrieveAPIView):
+    """
+    API to fetch one problem with all its heavy fields.
+    """
+    queryset = Problem.objects.all()
+    serializer_class = ProblemSerializer
 
 class ExecuteCodeAPI(APIView):
     """
     API to execute user code, provide smart hints, and SAVE progress.
+
+    ``mode=run`` only runs the sample cases and saves nothing;
+    ``mode=submit`` (the default) judges the full test set.
     """
+    throttle_classes = [ExecuteModeThrottle]
+
     def post(self, request):
         # 1. Get data from Frontend
         code = request.data.get('code')
         language = request.data.get('language', 'python')
         problem_id = request.data.get('problem_id')
+        mode = execution_mode(request.data)
+        if mode is None:
+            return Response({"error": "mode must be 'run' or 'submit'"}, status=400)
         
         # 2. Get the real problem from DB
         try:
@@ -53,85 +206,29 @@ class ExecuteCodeAPI(APIView):
         except Problem.DoesNotExist:
             return Response({"error": "Problem not found"}, status=404)
             
-        # 3. Loop through test cases
-        test_cases = problem.test_cases
-        results = []
-        all_passed = True
-        
-        for case in test_cases:
-            # Prepare payload for Piston API
-            payload = {
-                "language": language,
-                "version": "*",
-                "files": [{"content": code}],
-                "stdin": case['input']
-            }
-            
-            try:
-                # Send to Piston
-                response = requests.post('https://emkc.org/api/v2/piston/execute', json=payload)
-                data = response.json()
-            except Exception as e:
-                return Response({"status": "Error", "message": "Compiler Service Unavailable"}, status=503)
-            
-            # Clean outputs
-            user_output = data.get('run', {}).get('stdout', '').strip()
-            expected_output = case['output'].strip()
-            
-            passed = (user_output == expected_output)
-            feedback = None
-            
-            # --- SMART HINT LOGIC ---
-            if not passed:
-                all_passed = False
-                if user_output.lower() == expected_output.lower():
-                    feedback = "⚠️ Case Mismatch: Check your capitalization!"
-                elif user_output.replace(" ", "") == expected_output.replace(" ", ""):
-                    feedback = "⚠️ Spacing Issue: Check for extra spaces or newlines."
-            # ------------------------
-
-            results.append({
-                "input": case['input'],
-                "expected": expected_output,
-                "actual": user_output,
-                "passed": passed,
-                "feedback": feedback
+        # 3. Run test cases (in parallel, results keep test_cases order).
+        #    Identical resubmissions are answered from the verdict cache.
+        test_cases = problem.sample_cases if mode == RUN else problem.test_cases
+        try:
+            results, all_passed, _cached = cached_judge(problem.id, test_cases, code, language)
+        except ExecutionError:
+            return Response({"status": "Error", "message": "Compiler Service Unavailable"}, status=503)
+
+        # Sample runs are just a quick check: no points, nothing saved
+        if mode == RUN:
+            return Response({
+                "status": "Success" if all_passed else "Failed",
+                "mode": RUN,
+                "results": results
             })
-            
-            # Stop if failed (optional)
-            if not passed:
-                break
         
-        # ... (Previous code remains the same) ...
-
         # 4. FINAL VERDICT & SAVING
         if all_passed:
-            # A. Calculate Points
-            points_map = {'BEG': 10, 'INT': 20, 'ADV': 35, 'PRO': 50}
-            earned_points = points_map.get(problem.difficulty, 10)
-            
-            # B. FIND OR CREATE USER
-            clerk_id = request.data.get('clerk_id')
-            email = request.data.get('email')
-            user = None
-
-            if clerk_id:
-                # Magic Line: Get the user if they exist, OR create them if they don't!
-                user, created = User.objects.get_or_create(
-                    username=clerk_id,  # We use Clerk ID as the unique username
-                    defaults={'email': email}
-                )
-
-            # C. Save Submission
-            if user:
-                Submission.objects.create(
-                    user=user,
-                    problem=problem,
-                    code=code,
-                    language=language,
-                    status="Passed"
-                )
-            
+            earned_points = record_pass(
+                problem, code, language,
+                clerk_id=request.data.get('clerk_id'),
+                email=request.data.get('email'),
+            )
             return Response({
                 "status": "Success", 
                 "results": results, 
@@ -142,4 +239,153 @@ class ExecuteCodeAPI(APIView):
             return Response({
                 "status": "Failed",
                 "results": results
-            })
\ No newline at end of file
+            })
+
+
+
+def sse_event(event, data):
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class ExecuteStreamAPI(APIView):
+    """
+    Streaming variant of ExecuteCodeAPI (Server-Sent Events).
+
+    Emits a ``start`` event, one ``case`` event per test case as soon as it
+    finishes (with its ``index`` in ``test_cases``), then a ``verdict``
+    event with the status and points. Closing the connection early cancels
+    the remaining test cases. Supports the same ``mode`` as ExecuteCodeAPI.
+    """
+    throttle_classes = [ExecuteModeThrottle]
+
+    def post(self, request):
+        code = request.data.get('code')
+        language = request.data.get('language', 'python')
+        problem_id = request.data.get('problem_id')
+        clerk_id = request.data.get('clerk_id')
+        email = request.data.get('email')
+        mode = execution_mode(request.data)
+        if mode is None:
+            return Response({"error": "mode must be 'run' or 'submit'"}, status=400)
+
+        try:
+            problem = Problem.objects.get(id=problem_id)
+        except Problem.DoesNotExist:
+            return Response({"error": "Problem not found"}, status=404)
+
+        response = StreamingHttpResponse(
+            self.stream(problem, code, language, clerk_id, email, mode),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+        return response
+
+    def stream(self, problem, code, language, clerk_id, email, mode):
+        # the response has already started: report failures as a final event
+        try:
+            yield from self.events(problem, code, language, clerk_id, email, mode)
+        except Exception:
+            logger.exception("Streaming judge failed for problem %s", problem.id)
+            yield sse_event("error", {"status": "Error", "message": "Internal Server Error"})
+
+    def events(self, problem, code, language, clerk_id, email, mode):
+        test_cases = problem.sample_cases if mode == RUN else problem.test_cases
+        fail_fast = settings.JUDGE_FAIL_FAST
+        cached = get_cached_verdict(test_cases, code, language, fail_fast)
+        yield sse_event("start", {"total": len(test_cases), "cached": cached is not None})
+
+        if cached is not None:
+            results, all_passed = cached['results'], cached['all_passed']
+            for idx, result in enumerate(results):
+                yield sse_event("case", client_result(result, idx))
+        else:
+            finished = {}
+            try:
+                for idx, result in iter_judge(code, language, test_cases, fail_fast):
+                    finished[idx] = result
+                    yield sse_event("case", client_result(result, idx))
+            except ExecutionError:
+                yield sse_event("error", {"status": "Error", "message": "Compiler Service Unavailable"})
+                return
+            results, all_passed = collect_results(finished, len(test_cases), fail_fast)
+            store_verdict(problem.id, test_cases, code, language, fail_fast, results, all_passed)
+
+        verdict = {
+            "status": "Success" if all_passed else "Failed",
+            "mode": mode,
+            "passed": sum(1 for result in results if result['passed']),
+            "total": len(test_cases),
+        }
+        if all_passed and mode == SUBMIT:
+            verdict["points"] = record_pass(problem, code, language, clerk_id, email)
+        yield sse_event("verdict", verdict)
+
+
+class JudgeJobAPI(APIView):
+    """
+    Submit-and-poll judging: enqueue a submission and return its job ID.
+    """
+    throttle_classes = [SubmitThrottle]
+
+    def post(self, request):
+        code = request.data.get('code')
+        language = request.data.get('language', 'python')
+        problem_id = request.data.get('problem_id')
+        clerk_id = request.data.get('clerk_id')
+        if not isinstance(code, str):
+            return Response({"error": "code is required"}, status=400)
+
+        try:
+            problem = Problem.objects.get(id=problem_id)
+        except Problem.DoesNotExist:
+            return Response({"error": "Problem not found"}, status=404)
+
+        # Fairness is per authenticated user, else per client IP: never per
+        # clerk_id, which the caller could change on every request
+        owner = SubmitThrottle().client_ident(request)
+        try:
+            job = enqueue(problem, code, language, owner, clerk_id, request.data.get('email') or '')
+        except QueueFull as e:
+            return Response({"status": "Busy", "message": str(e)}, status=429)
+
+        return Response({
+            "job_id": str(job.id),
+            "status": job.status,
+            "position": queue_position(job),
+        }, status=202)
+
+
+class JudgeJobDetailAPI(APIView):
+    """
+    Poll a judge job: status plus the per-case results finished so far.
+    """
+    def get(self, request, job_id):
+        try:
+            job = JudgeJob.objects.get(id=job_id)
+        except JudgeJob.DoesNotExist:
+            return Response({"error": "Job not found"}, status=404)
+
+        data = {
+            "job_id": str(job.id),
+            "status": job.status,
+            "results": job.results,
+        }
+        if job.status == JudgeJob.QUEUED:
+            data["position"] = queue_position(job)
+        elif job.status == JudgeJob.DONE:
+            data["verdict"] = job.verdict
+            if job.points is not None:
+                data["points"] = job.points
+        elif job.status == JudgeJob.ERROR:
+            data["message"] = "Compiler Service Unavailable"
+        return Response(data)
+
+
+class JudgeQueueStatsAPI(APIView):
+    """
+    Judge queue length, wait times and verdict cache counters.
+    """
+    def get(self, request):
+        return Response(queue_stats())
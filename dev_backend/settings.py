@@ -59,6 +59,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'challenges.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -104,7 +105,8 @@ DATABASES = {
 if 'DATABASE_URL' in os.environ:
     DATABASES['default'] = dj_database_url.config(
         default=os.environ.get('DATABASE_URL'),
-        conn_max_age=600,
+        # Persistent connections are not supported under ASGI (ASYNC_API)
+        conn_max_age=0 if os.environ.get('ASYNC_API', 'false').lower() == 'true' else 600,
         conn_health_checks=True,
     )
 
@@ -157,4 +159,124 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 # Allow credentials (for Clerk auth)
-CORS_ALLOW_CREDENTIALS = True
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+# Code Judging
+# Test cases run in parallel on a bounded per-process thread pool
+JUDGE_MAX_WORKERS = int(os.environ.get('JUDGE_MAX_WORKERS', '8'))
+
+# Stop judging (and cancel remaining cases) at the first failing test case
+JUDGE_FAIL_FAST = os.environ.get('JUDGE_FAIL_FAST', 'true').lower() == 'true'
+
+
+# Code Execution Backend
+# 'piston' (public Piston API), 'local' (sandboxed subprocesses on this
+# machine), 'prefork' (local + warm pre-forked Python workers) or a dotted
+# path to a challenges.execution.BaseExecutor subclass
+EXECUTION_BACKEND = os.environ.get('EXECUTION_BACKEND', 'piston')
+
+# Limits for the 'local' backend (needs python3, gcc, g++ and a JDK on PATH)
+LOCAL_EXECUTOR = {
+    'CPU_TIME_LIMIT': int(os.environ.get('LOCAL_EXECUTOR_CPU_TIME', '2')),  # seconds
+    'WALL_TIME_LIMIT': int(os.environ.get('LOCAL_EXECUTOR_WALL_TIME', '5')),  # seconds
+    'MEMORY_LIMIT_MB': int(os.environ.get('LOCAL_EXECUTOR_MEMORY_MB', '256')),
+    'OUTPUT_LIMIT_BYTES': 1024 * 1024,
+    # RLIMIT_NPROC counts all processes of the uid: only set it (e.g. 64) when
+    # judging runs under a dedicated sandbox uid; 0 disables it
+    'PROCESS_LIMIT': int(os.environ.get('LOCAL_EXECUTOR_PROCESS_LIMIT', '0')),
+    'COMPILE_TIME_LIMIT': 10,  # seconds
+    'COMPILE_MEMORY_LIMIT_MB': 1024,
+    'SCRATCH_DIR': os.environ.get('LOCAL_EXECUTOR_SCRATCH_DIR') or None,  # system temp dir by default
+    # Compiled submissions are cached on disk (LRU) and reused across test cases
+    'ARTIFACT_DIR': os.environ.get('LOCAL_EXECUTOR_ARTIFACT_DIR') or None,  # <temp>/devsutra-artifacts
+    'ARTIFACT_CACHE_MB': int(os.environ.get('LOCAL_EXECUTOR_ARTIFACT_CACHE_MB', '256')),
+    # Warm Python sandbox workers per process for the 'prefork' backend
+    'PYTHON_WORKERS': int(os.environ.get('LOCAL_EXECUTOR_PYTHON_WORKERS', str(JUDGE_MAX_WORKERS))),
+}
+
+
+# Piston Code Execution API
+PISTON_URL = os.environ.get('PISTON_URL', 'https://emkc.org/api/v2/piston/execute')
+
+# Timeouts in seconds: (connect, read)
+PISTON_CONNECT_TIMEOUT = float(os.environ.get('PISTON_CONNECT_TIMEOUT', '3.05'))
+PISTON_READ_TIMEOUT = float(os.environ.get('PISTON_READ_TIMEOUT', '20'))
+
+# Retries on connection errors and 429/5xx, with exponential backoff + jitter
+PISTON_MAX_RETRIES = int(os.environ.get('PISTON_MAX_RETRIES', '2'))
+PISTON_BACKOFF_FACTOR = 0.3
+PISTON_BACKOFF_JITTER = 0.3
+
+# Keep-alive connections per process (one per judge thread is enough)
+PISTON_POOL_SIZE = JUDGE_MAX_WORKERS
+
+# Connection limit per event loop for the async views (ASYNC_API)
+PISTON_ASYNC_MAX_CONNECTIONS = int(os.environ.get('PISTON_ASYNC_MAX_CONNECTIONS', '100'))
+
+
+# Verdict Cache
+# Identical resubmissions (same test set, language and normalized code)
+# reuse the stored results. BACKEND: 'memory', 'django', 'database' or None.
+VERDICT_CACHE = {
+    'BACKEND': os.environ.get('VERDICT_CACHE_BACKEND', 'memory') or None,
+    'OPTIONS': {
+        'MAX_ENTRIES': 5000,
+    },
+}
+
+
+# Asynchronous Judge Queue (/api/jobs/)
+JUDGE_QUEUE = {
+    # Worker threads inside each web process. Set to 0 and run
+    # `python manage.py run_judge_workers` to judge in a separate process.
+    'WORKERS': int(os.environ.get('JUDGE_QUEUE_WORKERS', '2')),
+    'MAX_DEPTH': int(os.environ.get('JUDGE_QUEUE_MAX_DEPTH', '200')),  # queued jobs
+    'MAX_PER_OWNER': 3,  # queued + running jobs per user
+    'MAX_RUNNING_PER_OWNER': 1,
+    'POLL_INTERVAL': 1.0,  # seconds between checks for jobs from other processes
+    'STALE_AFTER': 300,  # seconds before a running job is assumed orphaned
+    'RETENTION': 24 * 60 * 60,  # seconds finished jobs are kept for polling
+}
+
+
+# Async API (ASGI)
+# Serve /api/problems/, /api/execute/ and /api/progress/ with native async
+# views. Only worth enabling when running under uvicorn (see DEPLOYMENT.md).
+ASYNC_API = os.environ.get('ASYNC_API', 'false').lower() == 'true'
+
+
+# Response compression (challenges.middleware.CompressionMiddleware)
+# Encodings in order of preference; 'br' and 'zstd' are only used when the
+# brotli / zstandard packages are installed. Bodies under MIN_SIZE bytes
+# are sent as-is.
+COMPRESSION = {
+    'MIN_SIZE': int(os.environ.get('COMPRESSION_MIN_SIZE', 1024)),
+    'ENCODINGS': ['zstd', 'br', 'gzip'],
+    'LEVELS': {'gzip': 6, 'br': 5, 'zstd': 3},
+}
+
+# Fast JSON rendering/parsing with orjson (falls back to the stdlib when
+# orjson is not installed)
+FAST_JSON = os.environ.get('FAST_JSON', 'true').lower() == 'true'
+
+
+# Django REST Framework
+REST_FRAMEWORK = {
+    # Execution rate limits per user (Clerk ID, or IP for anonymous runs).
+    # "Run samples" is cheap, so it gets a bigger bucket than full submits.
+    'DEFAULT_THROTTLE_RATES': {
+        'execute-run': os.environ.get('THROTTLE_EXECUTE_RUN', '60/min'),
+        'execute-submit': os.environ.get('THROTTLE_EXECUTE_SUBMIT', '15/min'),
+    },
+}
+
+if FAST_JSON:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'challenges.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = [
+        'challenges.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ]
@@ -1,17 +1,42 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
 
 # Import all API views
-from challenges.views import ProblemListAPI, ExecuteCodeAPI, UserProgressAPI
+from challenges.views import (
+    ProblemListAPI, ProblemCatalogueAPI, ProblemDetailAPI, ProblemSearchAPI,
+    ExecuteCodeAPI, ExecuteStreamAPI, UserProgressAPI,
+    JudgeJobAPI, JudgeJobDetailAPI, JudgeQueueStatsAPI, LeaderboardAPI,
+)
+
+# Under ASGI, serve the hot APIs with native async views
+if settings.ASYNC_API:
+    from challenges.async_views import AsyncExecuteCodeAPI, AsyncProblemListAPI, AsyncUserProgressAPI
+    problem_list_view = AsyncProblemListAPI.as_view()
+    execute_view = csrf_exempt(AsyncExecuteCodeAPI.as_view())
+    progress_view = AsyncUserProgressAPI.as_view()
+else:
+    problem_list_view = ProblemListAPI.as_view()
+    execute_view = ExecuteCodeAPI.as_view()
+    progress_view = UserProgressAPI.as_view()
 
 def home(request):
     return HttpResponse("Welcome to the DevSutra Backend!")
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/problems/', ProblemListAPI.as_view()),
-    path('api/execute/', ExecuteCodeAPI.as_view()),
-    path('api/progress/', UserProgressAPI.as_view()),  # User's completed problems
+    path('api/problems/', problem_list_view),
+    path('api/problems/catalogue/', ProblemCatalogueAPI.as_view()),  # Slim, paginated list
+    path('api/problems/search/', ProblemSearchAPI.as_view()),  # Full-text search
+    path('api/problems/<int:pk>/', ProblemDetailAPI.as_view()),  # Full problem on demand
+    path('api/execute/', execute_view),
+    path('api/execute/stream/', ExecuteStreamAPI.as_view()),  # Per-case results as SSE
+    path('api/progress/', progress_view),  # User's completed problems
+    path('api/leaderboard/', LeaderboardAPI.as_view()),  # Top scorers and my rank
+    path('api/jobs/', JudgeJobAPI.as_view()),  # Async judging: submit...
+    path('api/jobs/stats/', JudgeQueueStatsAPI.as_view()),
+    path('api/jobs/<uuid:job_id>/', JudgeJobDetailAPI.as_view()),  # ...and poll
     path('', home), 
 ]
\ No newline at end of file